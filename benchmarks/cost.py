@@ -0,0 +1,65 @@
+"""
+Benchmark the vectorized cost engine.
+
+    python benchmarks/cost.py [--count 10000]
+
+Estimates the charges of `count` random historical sessions (up to three days
+long), once from ParkingSession objects and once straight from datetime64 arrays.
+"""
+
+import argparse
+import time as clock
+from datetime import datetime
+
+import numpy as np
+
+from bezoekersparkeren.models import ParkingSession, ScheduleRule, Zone
+from bezoekersparkeren.utils.cost import estimate_sessions, session_costs, total
+
+ZONE = Zone(
+    name="Filmwijk",
+    code="36044",
+    hourly_rate=0.25,
+    max_daily_rate=1.00,
+    rules=[
+        ScheduleRule(days=[0, 1, 2], start_time="09:00", end_time="22:00"),
+        ScheduleRule(days=[3, 4, 5], start_time="09:00", end_time="24:00"),
+        ScheduleRule(days=[6], start_time="12:00", end_time="17:00"),
+    ],
+)
+
+
+def timed(label, func):
+    started = clock.perf_counter()
+    result = func()
+    print(f"{label:<28} {(clock.perf_counter() - started) * 1000:>9.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    starts = np.datetime64("2025-01-01T00:00", "m") + rng.integers(
+        0, 365 * 1440, args.count
+    ).astype("timedelta64[m]")
+    ends = starts + rng.integers(1, 3 * 1440, args.count).astype("timedelta64[m]")
+    sessions = [
+        ParkingSession(
+            plate="AB-123-CD",
+            active=False,
+            start_time=s.astype(datetime),
+            end_time=e.astype(datetime),
+        )
+        for s, e in zip(starts, ends)
+    ]
+
+    costs = timed("ParkingSession objects", lambda: estimate_sessions(ZONE, sessions))
+    timed("datetime64 arrays", lambda: session_costs(ZONE, starts, ends))
+    print(f"{args.count} sessions, total {total(costs):.2f} EUR")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark the dashboard HTML parser backends.
+
+    python benchmarks/parse_sessions.py [--rows 10 100 1000] [--repeat 5]
+
+Builds synthetic dashboards with the given number of session rows and reports the
+best time per parse for every installed backend (see utils/session_html.py).
+"""
+
+import argparse
+import random
+import timeit
+
+from bezoekersparkeren.utils.session_html import BACKENDS, available_backends, parse_session_rows
+
+MONTHS = ["jan", "feb", "mrt", "apr", "mei", "jun", "jul", "aug", "sep", "okt", "nov", "dec"]
+
+
+def synthetic_dashboard(rows: int, seed: int = 0) -> str:
+    """A page shaped like /app/park, with `rows` sessions and some surrounding markup."""
+    rnd = random.Random(seed)
+    items = []
+    for i in range(rows):
+        letters = "".join(rnd.choice("ABGHKNRSTXZ") for _ in range(2))
+        plate = f"{letters}-{rnd.randint(100, 999)}-{rnd.choice('BDFGHJ')}"
+        day = rnd.choice(["vandaag", "morgen", f"{rnd.randint(1, 28)} {rnd.choice(MONTHS)}."])
+        start = f"{rnd.randint(0, 23):02d}:{rnd.choice(['00', '15', '30', '45'])}"
+        items.append(
+            f'<div class="park-item-desktop row" data-index="{i}">'
+            f'<div class="col"><span class="plate">{plate}</span></div>'
+            '<div class="col end-time"><span class="label">Eindtijd</span> '
+            f"<span>{day} 22:00</span></div>"
+            f'<div class="col"><button class="stop-parking-action btn">Stoppen</button></div>'
+            f"</div>"
+            '<div class="start-time"><span class="label">Start tijd</span> '
+            f"<span>{day} {start}</span></div>"
+        )
+    nav = "".join(
+        f'<li><a href="/almere/app/{p}">{p}</a></li>' for p in ("park", "history", "user")
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Bezoekersparkeren</title>"
+        "<script>window.app = {};</script></head><body>"
+        f'<nav><ul>{nav}</ul></nav><main><div id="parkActions">{"".join(items)}</div></main>'
+        "<footer>Gemeente Almere</footer></body></html>"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = available_backends()
+    print(f"Backends: {', '.join(backends)} (auto picks {backends[0]})")
+    print(f"{'rows':>6} " + "".join(f"{name:>14}" for name in backends))
+
+    for rows in args.rows:
+        html = synthetic_dashboard(rows)
+        expected = parse_session_rows(html, "html.parser")
+        assert len(expected) == rows
+        timings = []
+        for name in backends:
+            assert BACKENDS[name](html) == expected, f"{name} disagrees with html.parser"
+            number = max(1, 1000 // rows)
+            best = min(
+                timeit.repeat(lambda: BACKENDS[name](html), number=number, repeat=args.repeat)
+            )
+            timings.append(best / number * 1000)
+        print(f"{rows:>6} " + "".join(f"{ms:>12.2f}ms" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
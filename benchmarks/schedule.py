@@ -0,0 +1,93 @@
+"""
+Benchmark the compiled weekly schedule against scanning the zone rules.
+
+    python benchmarks/schedule.py [--count 100000]
+
+Times "is paid at t" for `count` random timestamps three ways: the old rule scan
+with strptime per call, TimeUtils on top of the index, and the vectorized query.
+"""
+
+import argparse
+import random
+import time as clock
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from bezoekersparkeren.models import ScheduleRule, Zone
+from bezoekersparkeren.utils.schedule import WeeklySchedule
+from bezoekersparkeren.utils.time_utils import TimeUtils
+
+ZONE = Zone(
+    name="Filmwijk",
+    code="36044",
+    hourly_rate=0.25,
+    max_daily_rate=1.00,
+    rules=[
+        ScheduleRule(days=[0, 1, 2], start_time="09:00", end_time="22:00"),
+        ScheduleRule(days=[3, 4, 5], start_time="09:00", end_time="24:00"),
+        ScheduleRule(days=[6], start_time="12:00", end_time="17:00"),
+    ],
+)
+
+
+def rule_scan_is_paid(zone, dt):
+    """What TimeUtils.is_within_paid_hours did before the index."""
+    rule = None
+    for r in zone.rules:
+        if dt.weekday() in r.days:
+            rule = r
+            break
+    if not rule:
+        return False
+    start = datetime.strptime(rule.start_time, "%H:%M").time()
+    end = (
+        time(23, 59, 59)
+        if rule.end_time == "24:00"
+        else datetime.strptime(rule.end_time, "%H:%M").time()
+    )
+    return start <= dt.time() <= end
+
+
+def timed(label, func, count=None):
+    started = clock.perf_counter()
+    result = func()
+    elapsed = clock.perf_counter() - started
+    per_item = f"  ({elapsed / count * 1e9:>7.0f} ns/timestamp)" if count else ""
+    print(f"{label:<28} {elapsed * 1000:>9.1f} ms{per_item}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    base = datetime(2025, 1, 6)
+    times = [base + timedelta(seconds=rnd.randrange(365 * 86400)) for _ in range(args.count)]
+    array = np.array(times, dtype="datetime64[s]")
+
+    timed("compile index", lambda: WeeklySchedule(ZONE.rules))
+    expected = timed(
+        "rule scan + strptime", lambda: [rule_scan_is_paid(ZONE, t) for t in times], args.count
+    )
+    indexed = timed(
+        "TimeUtils (index)",
+        lambda: [TimeUtils.is_within_paid_hours(ZONE, t) for t in times],
+        args.count,
+    )
+    schedule = WeeklySchedule.for_zone(ZONE)
+    vectorized = timed(
+        "is_paid_many (vectorized)", lambda: schedule.is_paid_many(array), args.count
+    )
+    timed("next_paid_start_many", lambda: schedule.next_paid_start_many(array), args.count)
+    timed("paid_period_end_many", lambda: schedule.paid_period_end_many(array), args.count)
+
+    assert indexed == expected and vectorized.tolist() == expected
+
+
+if __name__ == "__main__":
+    main()
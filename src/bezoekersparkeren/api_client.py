@@ -0,0 +1,375 @@
+"""
+HTTP backend for bezoek.parkeer.nl.
+
+Talks directly to the XHR endpoints the portal SPA uses, with one pooled
+httpx.AsyncClient instead of a full Chromium. The endpoint paths live in the
+`api` config section so they can be corrected from the browser devtools when
+the portal changes. Any unexpected status or payload raises PortalApiError,
+which makes ParkeerClient fall back to the Playwright implementation.
+
+Writes are the exception: once a registration or stop may have reached the
+portal it is never handed to the browser again (that could pay for a visit
+twice). An accepted write with an odd answer counts as done; a write without
+any answer or with a server error (5xx) is checked against the session list,
+and PortalWriteUnconfirmed is raised when that can't settle it.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+from .config import Config
+from .models import Balance, ParkingSession, make_session_id
+from .utils.state_cache import StorageStateCache
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://bezoek.parkeer.nl"
+
+
+class PortalApiError(Exception):
+    """An endpoint failed or returned something we don't understand."""
+
+
+class PortalWriteUnconfirmed(PortalApiError):
+    """A write was sent but got no answer; it may have been processed, so don't repeat it."""
+
+
+def _first(item: dict, *keys):
+    for key in keys:
+        if item.get(key) not in (None, ""):
+            return item[key]
+    return None
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        # Local wall-clock time, like the times the browser path reads from the page
+        dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+    except ValueError:
+        raise PortalApiError(f"Unexpected datetime format: {value!r}")
+
+
+class ParkeerApiClient:
+    """Same operations as ParkeerClient, implemented as plain HTTP calls."""
+
+    def __init__(
+        self,
+        config: Config,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        state_cache: Optional[StorageStateCache] = None,
+    ):
+        self.config = config
+        self.api = config.api
+        self._state_cache = state_cache
+        self._logged_in = False
+        # Our session ID -> the portal's own ID, filled by get_active_sessions()
+        self._portal_ids: Dict[str, str] = {}
+        self._http = httpx.AsyncClient(
+            base_url=BASE_URL,
+            transport=transport,
+            timeout=self.api.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+            headers={"Accept": "application/json", "X-Requested-With": "XMLHttpRequest"},
+        )
+
+    def _url(self, template: str, **params) -> str:
+        return template.format(municipality=self.config.municipality, **params)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        try:
+            response = await self._http.request(method, url, **kwargs)
+        except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+            # Never reached the portal
+            raise PortalApiError(f"{method} {url} failed: {e}") from e
+        except httpx.HTTPError as e:
+            if method != "GET":
+                raise PortalWriteUnconfirmed(
+                    f"{method} {url}: no answer, it may have been processed: {e}"
+                ) from e
+            raise PortalApiError(f"{method} {url} failed: {e}") from e
+
+        if "/login" in str(response.url):
+            self._logged_in = False
+            raise PortalApiError(f"{method} {url}: not logged in")
+        if response.status_code >= 500 and method != "GET":
+            # A gateway error or crash may come after the portal already processed it
+            raise PortalWriteUnconfirmed(
+                f"{method} {url}: HTTP {response.status_code}, it may have been processed"
+            )
+        if response.status_code >= 400:
+            raise PortalApiError(f"{method} {url}: HTTP {response.status_code}")
+        return response
+
+    def _json(self, response: httpx.Response):
+        try:
+            return response.json()
+        except ValueError:
+            raise PortalApiError(f"{response.request.url}: response is not JSON")
+
+    # --- Authentication ---
+
+    def _load_cookies(self) -> bool:
+        """Reuse the browser's cached login cookies, if any."""
+        state = self._state_cache.load() if self._state_cache else None
+        if not state:
+            return False
+        for cookie in state.get("cookies", []):
+            if "parkeer.nl" in cookie.get("domain", ""):
+                self._http.cookies.set(
+                    cookie["name"],
+                    cookie["value"],
+                    domain=cookie["domain"],
+                    path=cookie.get("path", "/"),
+                )
+        return bool(self._http.cookies)
+
+    def _save_cookies(self):
+        """Store the session cookies in the shared cache, in Playwright storage-state format."""
+        if not self._state_cache:
+            return
+        cookies = [
+            {
+                "name": c.name,
+                "value": c.value,
+                "domain": c.domain,
+                "path": c.path or "/",
+                "expires": c.expires or -1,
+                "httpOnly": False,
+                "secure": bool(c.secure),
+                "sameSite": "Lax",
+            }
+            for c in self._http.cookies.jar
+        ]
+        # Keep the localStorage origins a browser session saved
+        state = self._state_cache.load() or {"origins": []}
+        self._state_cache.save({**state, "cookies": cookies})
+
+    async def login(self) -> bool:
+        """Authenticate once; cached cookies are tried before the login form."""
+        if self._logged_in:
+            return True
+
+        if self._load_cookies():
+            try:
+                await self._request("GET", self._url(self.api.balance_endpoint))
+                logger.info("HTTP API: cached login cookies accepted")
+                self._logged_in = True
+                return True
+            except PortalApiError:
+                self._http.cookies.clear()
+
+        login_url = f"/{self.config.municipality}/login"
+        try:
+            page = await self._http.get(login_url, headers={"Accept": "text/html"})
+        except httpx.HTTPError as e:
+            raise PortalApiError(f"Login page unreachable: {e}") from e
+
+        soup = BeautifulSoup(page.text, "html.parser")
+        username = soup.find("input", id="username")
+        password = soup.find("input", id="password")
+        form = username.find_parent("form") if username else None
+        if not form or not password:
+            raise PortalApiError("Login form not found")
+
+        # Hidden inputs carry the CSRF token
+        data = {i["name"]: i.get("value", "") for i in form.find_all("input") if i.get("name")}
+        data[username["name"]] = self.config.credentials.email
+        data[password["name"]] = self.config.credentials.password
+
+        action = form.get("action") or login_url
+        try:
+            response = await self._http.post(
+                str(page.url.join(action)), data=data, headers={"Accept": "text/html"}
+            )
+        except httpx.HTTPError as e:
+            raise PortalApiError(f"Login request failed: {e}") from e
+
+        if "/app/" not in str(response.url):
+            logger.error("HTTP API login failed")
+            return False
+
+        logger.info("HTTP API login successful")
+        self._logged_in = True
+        self._save_cookies()
+        return True
+
+    async def _ensure_logged_in(self):
+        if not self._logged_in and not await self.login():
+            raise PortalApiError("Login failed")
+
+    # --- Operations ---
+
+    def _session_from_json(self, item: dict) -> ParkingSession:
+        plate = _first(item, "licensePlate", "license_plate", "plate", "number")
+        if isinstance(plate, dict):
+            plate = _first(plate, "number", "licensePlate", "plate")
+        start_time = _parse_datetime(_first(item, "startTime", "start_time", "start", "startDate"))
+        if not plate or not start_time:
+            raise PortalApiError(f"Unexpected session payload: {sorted(item)}")
+        # The dashboard shows minutes only, keep IDs identical to the browser path
+        start_time = start_time.replace(second=0, microsecond=0)
+
+        end_time = _parse_datetime(_first(item, "endTime", "end_time", "end", "endDate"))
+        session = ParkingSession(
+            id=make_session_id(plate, start_time),
+            plate=plate,
+            active=True,
+            start_time=start_time,
+            end_time=end_time,
+        )
+        portal_id = _first(item, "id", "uuid", "parkingActionId")
+        if portal_id is not None:
+            self._portal_ids[session.id] = str(portal_id)
+        return session
+
+    async def get_active_sessions(self) -> List[ParkingSession]:
+        await self._ensure_logged_in()
+        data = self._json(await self._request("GET", self._url(self.api.sessions_endpoint)))
+        if isinstance(data, dict):
+            data = _first(data, "items", "data", "parkingActions", "results")
+        if not isinstance(data, list):
+            raise PortalApiError("Unexpected sessions payload")
+        return [self._session_from_json(item) for item in data]
+
+    async def register_visitor(
+        self,
+        plate: str,
+        start_date: str = None,
+        start_time: str = None,
+        end_date: str = None,
+        end_time: str = None,
+        minutes: int = None,
+        hours: int = None,
+    ) -> ParkingSession:
+        await self._ensure_logged_in()
+
+        # Minutes only, like the session list (see _session_from_json())
+        start = datetime.now().replace(second=0, microsecond=0)
+        if start_date and start_time:
+            start = datetime.strptime(f"{start_date} {start_time}", "%d-%m-%Y %H:%M")
+
+        end = None
+        if end_time:
+            end = datetime.strptime(
+                f"{end_date or start.strftime('%d-%m-%Y')} {end_time}", "%d-%m-%Y %H:%M"
+            )
+        elif hours or minutes:
+            end = start + timedelta(hours=hours or 0, minutes=minutes or 0)
+
+        payload = {"licensePlate": plate, "startTime": start.isoformat(timespec="minutes")}
+        if end:
+            payload["endTime"] = end.isoformat(timespec="minutes")
+        session = ParkingSession(
+            id=make_session_id(plate, start),
+            plate=plate,
+            active=True,
+            start_time=start,
+            end_time=end,
+        )
+
+        try:
+            response = await self._request(
+                "POST", self._url(self.api.register_endpoint), json=payload
+            )
+        except PortalWriteUnconfirmed:
+            listed = next((s for s in await self._list_after_write() if s.id == session.id), None)
+            if listed is None:
+                raise
+            logger.info(f"HTTP API: registration of {plate} confirmed from the session list")
+            return listed
+
+        try:
+            data = response.json() if response.content else {}
+            if isinstance(data, dict) and data:
+                return self._session_from_json(
+                    {
+                        "licensePlate": plate,
+                        "startTime": payload["startTime"],
+                        "endTime": payload.get("endTime"),
+                        **data,
+                    }
+                )
+        except (ValueError, PortalApiError) as e:
+            # The portal accepted the registration, only its answer is unexpected
+            logger.warning(
+                f"HTTP API: registration of {plate} accepted with an unexpected response: {e}"
+            )
+        return session
+
+    async def _list_after_write(self) -> List[ParkingSession]:
+        """The session list, to settle a write that got no answer."""
+        try:
+            return await self.get_active_sessions()
+        except PortalApiError as e:
+            raise PortalWriteUnconfirmed(
+                f"Could not check the session list after a write: {e}"
+            ) from e
+
+    async def stop_session(self, session: ParkingSession) -> bool:
+        await self._ensure_logged_in()
+        if session.id not in self._portal_ids:
+            await self.get_active_sessions()
+        return await self._stop_listed([session]) == 1
+
+    async def _stop_listed(self, sessions: List[ParkingSession]) -> int:
+        """Stop sessions whose portal IDs were just fetched by get_active_sessions()."""
+        stopped = 0
+        unanswered: List[ParkingSession] = []
+        for session in sessions:
+            portal_id = self._portal_ids.pop(session.id, None)
+            if portal_id is None:
+                logger.warning(f"HTTP API: session {session.id} not found")
+                continue
+            try:
+                await self._request("POST", self._url(self.api.stop_endpoint, id=portal_id))
+            except PortalWriteUnconfirmed:
+                unanswered.append(session)
+                continue
+            except PortalApiError as e:
+                if not (stopped or unanswered):
+                    raise
+                # Some stops went through already: don't hand the whole batch to the browser
+                logger.warning(f"HTTP API: stopping session {session.id} failed: {e}")
+                continue
+            stopped += 1
+
+        if unanswered:
+            remaining = {s.id for s in await self._list_after_write()}
+            for session in unanswered:
+                if session.id in remaining:
+                    logger.warning(f"HTTP API: session {session.id} still active after stopping")
+                else:
+                    stopped += 1
+        return stopped
+
+    async def stop_sessions(self, sessions: List[ParkingSession]) -> int:
+        await self.get_active_sessions()
+        return await self._stop_listed(sessions)
+
+    async def stop_all_sessions(self, plate: str) -> int:
+        sessions = [s for s in await self.get_active_sessions() if s.plate == plate]
+        return await self._stop_listed(sessions)
+
+    async def get_balance(self) -> Balance:
+        await self._ensure_logged_in()
+        data = self._json(await self._request("GET", self._url(self.api.balance_endpoint)))
+        value = _first(data, "balance", "saldo", "credit") if isinstance(data, dict) else None
+        if value is None:
+            raise PortalApiError("Unexpected balance payload")
+        if isinstance(value, str):
+            value = value.replace("€", "").replace(",", ".").strip()
+        try:
+            return Balance(amount=float(value))
+        except ValueError:
+            raise PortalApiError(f"Unexpected balance value: {value!r}")
+
+    async def close(self):
+        await self._http.aclose()
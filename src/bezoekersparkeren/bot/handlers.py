@@ -3,13 +3,17 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.error import BadRequest
 from telegram.ext import ContextTypes, ConversationHandler
-from bezoekersparkeren.client import ParkeerClient
+from bezoekersparkeren.client import ParkeerClient, RegistrationError
 from bezoekersparkeren.config import Config
+from bezoekersparkeren.models import ParkingSession
+from bezoekersparkeren.utils.image_prep import pick_photo, prepare_image_async
+from bezoekersparkeren.utils.recognition_cache import RecognitionCache, image_hash
+from bezoekersparkeren.utils.session_store import AsyncSessionStore
 import logging
 
-import logging
+import asyncio
 import io
-from bezoekersparkeren.license_plate_recognition import recognize_plate
+from bezoekersparkeren.license_plate_recognition import PlateRecognizer, recognize_plate
 
 logger = logging.getLogger(__name__)
 
@@ -21,32 +25,109 @@ CONFIRM_STOP = 3
 # Store client instance
 _client: ParkeerClient | None = None
 _config: Config | None = None
-
-def init_handlers(config: Config):
+# Concurrent updates must not start two browsers
+_client_lock = asyncio.Lock()
+# Lokale administratie van aangemelde sessies (gedeeld met de CLI)
+_store: AsyncSessionStore | None = None
+# Nummerplaatherkenning, van ParkeerBot (die hem ook weer sluit)
+_recognizer: PlateRecognizer | None = None
+# Herkende nummerplaten per foto
+_recognition_cache: RecognitionCache | None = None
+
+def init_handlers(config: Config, recognizer: PlateRecognizer | None = None):
     """Initialize handlers met config."""
-    global _config
+    global _config, _store, _recognizer, _recognition_cache
     _config = config
+    # Write-behind: bundelt de schrijfacties van gelijktijdige gebruikers
+    _store = AsyncSessionStore(flush_delay=0.2)
+    _recognizer = recognizer
+    settings = config.recognition
+    _recognition_cache = RecognitionCache(
+        max_entries=settings.cache_entries,
+        ttl=settings.cache_ttl_hours * 3600,
+        path=settings.cache_path,
+    ) if settings.cache_entries > 0 else None
+
+
+async def close_handlers():
+    """Schrijf openstaande sessies weg en sluit de browser (bij het stoppen van de bot)."""
+    global _store, _client
+    if _store is not None:
+        await _store.close()
+        _store = None
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def _record_sessions(sessions: list[ParkingSession]):
+    """Sla aangemelde sessies lokaal op; een fout hierin mag de gebruiker niet hinderen."""
+    if _store is None:
+        return
+    try:
+        await _store.add_sessions(sessions)
+    except Exception as e:
+        logger.error(f"Error recording sessions: {e}")
+
+
+async def _record_stopped(sessions: list[ParkingSession]):
+    """Markeer gestopte sessies lokaal als beëindigd (de geschiedenis blijft bewaard)."""
+    if _store is None or not sessions:
+        return
+    try:
+        await _store.end_sessions(sessions)
+    except Exception as e:
+        logger.error(f"Error recording stopped sessions: {e}")
+
+
+def _cost_preview(plate: str, days: int) -> str:
+    """Tekst met de verwachte kosten per dag van een meerdaagse aanmelding."""
+    from bezoekersparkeren.utils.cost import estimate_plan, format_euros, total
+    from bezoekersparkeren.utils.time_utils import TimeUtils
+
+    text = f"📅 *Meerdaags parkeren: {plate}*\n\n"
+    try:
+        zone = _config.zone_for(plate) if _config else None
+    except ValueError as e:
+        logger.error(f"Error resolving zone for {plate}: {e}")
+        zone = None
+    if zone is None:
+        return text + f"{days} dagen aanmelden?"
+    try:
+        plan = TimeUtils.plan_days(zone, days)
+        costs = estimate_plan(zone, plan)
+    except Exception as e:
+        logger.error(f"Error estimating costs: {e}")
+        return text + f"{days} dagen aanmelden? (kosten onbekend)"
+    for day, amount in zip(plan, costs):
+        period = f"{day['start_date']} {day['start_time']}-{day['end_time'] or '?'}"
+        text += f"• {period}: {format_euros(amount)}\n"
+    text += f"\n💶 Verwachte kosten ({zone.name}): *{format_euros(total(costs))}*\n\n"
+    text += f"{days} dagen aanmelden?"
+    return text
 
 
 async def get_client() -> ParkeerClient:
     """Get or create ParkeerClient instance, recreating if the browser has crashed."""
     global _client
-    if _client is not None:
-        # Verify the browser is still usable
-        try:
-            _ = _client.page.url  # Quick check if page is still accessible
-        except Exception:
-            logger.warning("Browser appears crashed, recreating client...")
+    async with _client_lock:
+        if _client is not None:
+            # Verify the browser is still usable
             try:
-                await _client.close()
+                if _client.page is not None:  # None when only the HTTP backend is in use
+                    _ = _client.page.url  # Quick check if page is still accessible
             except Exception:
-                pass
-            _client = None
-    if _client is None:
-        _client = ParkeerClient(_config)
-        await _client._init_browser()
-        await _client.login()
-    return _client
+                logger.warning("Browser appears crashed, recreating client...")
+                try:
+                    await _client.close()
+                except Exception:
+                    pass
+                _client = None
+        if _client is None:
+            _client = ParkeerClient(_config)
+            await _client.start()
+            await _client.login()
+        return _client
 
 
 async def _safe_edit_message(query, text: str, **kwargs):
@@ -144,6 +225,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             client = await get_client()
             # Gebruik register_multiple_days met 1 dag voor consistentie
             sessions = await client.register_multiple_days(plate, days=1)
+            await _record_sessions(sessions)
             session = sessions[0]
             
             end_str = ""
@@ -183,7 +265,24 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
 
     elif data.startswith("regmulti_"):
-        # regmulti_{days}_{plate}
+        # regmulti_{days}_{plate}: eerst de verwachte kosten tonen
+        parts = data.split("_")
+        days = int(parts[1])
+        plate = parts[2]
+
+        keyboard = [
+            [InlineKeyboardButton("✅ Aanmelden", callback_data=f"regmultiok_{days}_{plate}")],
+            [InlineKeyboardButton("⬅️ Terug", callback_data=f"register_multi_{plate}")],
+        ]
+        await _safe_edit_message(
+            query,
+            _cost_preview(plate, days),
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode="Markdown"
+        )
+
+    elif data.startswith("regmultiok_"):
+        # regmultiok_{days}_{plate}: bevestigd, nu echt aanmelden
         parts = data.split("_")
         days = int(parts[1])
         plate = parts[2]
@@ -193,6 +292,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         try:
             client = await get_client()
             sessions = await client.register_multiple_days(plate, days=days)
+            await _record_sessions(sessions)
             last_session = sessions[-1]
             
             until_date = last_session.end_time.strftime('%d-%m %H:%M') if last_session.end_time else "onbekend"
@@ -204,6 +304,14 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 f"⏰ Gepland tot: {until_date}, of meld je eerder af.",
                 parse_mode="Markdown"
             )
+        except RegistrationError as e:
+            # Sommige dagen gelukt, andere niet
+            logger.error(f"Error registering multi-day plate: {e}")
+            await _record_sessions(e.summary.sessions)
+            text = f"⚠️ {len(e.summary.sessions)} van {days} dagen aangemeld voor {plate}\n\n"
+            for failure in e.summary.failures:
+                text += f"❌ {failure.date}: {failure.error}\n"
+            await _safe_edit_message(query, text)
         except Exception as e:
             logger.error(f"Error registering multi-day plate: {e}")
             await _safe_edit_message(query, f"❌ Fout bij aanmelden: {str(e)}")
@@ -264,8 +372,15 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         
         try:
             client = await get_client()
-            count = await client.stop_all_sessions(plate)
-            
+            sessions = [s for s in await client.get_active_sessions() if s.plate == plate]
+            count = await client.stop_sessions(sessions) if sessions else 0
+            if count:
+                # Bij een deel gestopt: de portal vertelt welke nog lopen
+                still_active = set()
+                if count < len(sessions):
+                    still_active = {s.id for s in await client.get_active_sessions()}
+                await _record_stopped([s for s in sessions if s.id not in still_active])
+
             if count > 0:
                 await _safe_edit_message(query, f"✅ {count} sessie(s) voor `{plate}` zijn gestopt!", parse_mode="Markdown")
             else:
@@ -376,6 +491,7 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         try:
             client = await get_client()
             sessions = await client.register_multiple_days(plate, days=1)
+            await _record_sessions(sessions)
             session = sessions[0]
             
             end_str = ""
@@ -400,6 +516,57 @@ async def handle_text_message(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
 
+async def _recognize_photo(photos, context: ContextTypes.DEFAULT_TYPE) -> str | None:
+    """Nummerplaat op een foto: uit de cache, anders via de vision API."""
+    settings = _config.recognition
+    file_ids = [p.file_unique_id for p in photos]
+
+    # Dezelfde (doorgestuurde) foto: niets downloaden
+    if _recognition_cache is not None:
+        plate = _recognition_cache.get_by_file(file_ids)
+        if plate:
+            logger.info(f"Plate {plate} from cache (same photo)")
+            return plate
+
+    # Kleinste foto die nog scherp genoeg is (scheelt downloaden en uploaden)
+    photo = pick_photo(photos, settings.min_photo_side)
+    file = await context.bot.get_file(photo.file_id)
+
+    # Download naar memory
+    f = io.BytesIO()
+    await file.download_to_memory(out=f)
+    raw = f.getvalue()
+
+    # Dezelfde nummerplaat als nieuw bestand: geen API-aanroep
+    photo_hash = None
+    if _recognition_cache is not None:
+        photo_hash = await asyncio.to_thread(image_hash, raw)
+        plate = _recognition_cache.get_by_hash(photo_hash)
+        if plate:
+            logger.info(f"Plate {plate} from cache (same plate)")
+            _recognition_cache.put(plate, file_ids, photo_hash)
+            await _recognition_cache.save_async()
+            return plate
+
+    # Verkleinen en opnieuw comprimeren, in een thread
+    image_bytes, mime_type = await prepare_image_async(
+        raw,
+        max_side=settings.max_side,
+        max_bytes=settings.max_bytes,
+        image_format=settings.image_format,
+        quality=settings.quality,
+        crop_plate=settings.crop_plate,
+    )
+    logger.info(f"Photo {photo.width}x{photo.height}: {len(raw)} -> {len(image_bytes)} bytes")
+
+    # Roep vision API aan
+    plate = await recognize_plate(image_bytes, _config, recognizer=_recognizer, mime_type=mime_type)
+    if plate and _recognition_cache is not None:
+        _recognition_cache.put(plate, file_ids, photo_hash)
+        await _recognition_cache.save_async()
+    return plate
+
+
 async def handle_photo_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handler voor foto's (nummerplaatherkenning)."""
     if not update.message.photo:
@@ -409,21 +576,10 @@ async def handle_photo_message(update: Update, context: ContextTypes.DEFAULT_TYP
     status_msg = await update.message.reply_text("Even kijken naar de nummerplaat... 🔍")
     
     try:
-        # Pak de grootste foto
-        photo = update.message.photo[-1]
-        file = await context.bot.get_file(photo.file_id)
-        
-        # Download naar memory
-        f = io.BytesIO()
-        await file.download_to_memory(out=f)
-        image_bytes = f.getvalue()
-        
-        # Roep vision API aan
         if not _config:
             await status_msg.edit_text("❌ Interne fout: config niet geladen.")
             return
-
-        plate = await recognize_plate(image_bytes, _config)
+        plate = await _recognize_photo(update.message.photo, context)
         
         if plate:
             # Succes! Vraag om bevestiging via inline keyboard
@@ -496,7 +652,8 @@ async def quick_register(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         client = await get_client()
-        await client.register_visitor(plate)
+        session = await client.register_visitor(plate)
+        await _record_sessions([session])
         await update.message.reply_text(f"✅ `{plate}` aangemeld!", parse_mode="Markdown")
     except Exception as e:
         await update.message.reply_text(f"❌ Fout: {str(e)}")
@@ -520,8 +677,12 @@ async def quick_stop(update: Update, context: ContextTypes.DEFAULT_TYPE):
         session = next((s for s in sessions if s.plate == plate), None)
         
         if session:
-            await client.stop_session(session)
-            await update.message.reply_text(f"✅ `{plate}` gestopt!", parse_mode="Markdown")
+            if await client.stop_session(session):
+                await _record_stopped([session])
+                await update.message.reply_text(f"✅ `{plate}` gestopt!", parse_mode="Markdown")
+            else:
+                await update.message.reply_text(f"❌ Stoppen van `{plate}` is mislukt.",
+                                                parse_mode="Markdown")
         else:
             await update.message.reply_text(f"❌ Geen actieve sessie gevonden voor `{plate}`.")
     except Exception as e:
@@ -10,8 +10,10 @@ from telegram.ext import (
     filters,
 )
 from bezoekersparkeren.config import Config
+from bezoekersparkeren.license_plate_recognition import PlateRecognizer
 from bezoekersparkeren.bot.handlers import (
     init_handlers,
+    close_handlers,
     start,
     help_command,
     myid_command,
@@ -29,10 +31,12 @@ logger = logging.getLogger(__name__)
 class ParkeerBot:
     """Telegram bot voor bezoekersparkeren."""
     
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, recognizer: PlateRecognizer | None = None):
         self.config = config
         self.allowed_users = self._parse_allowed_users()
         self.application: Application | None = None
+        # Nummerplaatherkenning met één gedeelde HTTP-verbinding; wordt in start() gemaakt
+        self.recognizer = recognizer
     
     def _parse_allowed_users(self) -> list[int]:
         """Parse allowed users from config (comma-separated string to list of ints)."""
@@ -54,12 +58,16 @@ class ParkeerBot:
         logger.info(f"Starting Telegram bot with {len(self.allowed_users)} allowed users")
         
         # Initialize handlers met config
-        init_handlers(self.config)
+        if self.recognizer is None:
+            self.recognizer = PlateRecognizer(self.config)
+        init_handlers(self.config, recognizer=self.recognizer)
         
         # Build application
+        # With a page pool the client can serve several updates at the same time
         self.application = (
             Application.builder()
             .token(self.config.telegram.bot_token)
+            .concurrent_updates(self.config.browser.pool_size > 1)
             .build()
         )
         
@@ -129,6 +137,11 @@ class ParkeerBot:
             await self.application.updater.stop()
             await self.application.stop()
             await self.application.shutdown()
+        await close_handlers()
+        if self.recognizer is not None:
+            logger.info(f"Plate recognition connections: {self.recognizer.stats()}")
+            await self.recognizer.close()
+            self.recognizer = None
 
 
 async def run_bot():
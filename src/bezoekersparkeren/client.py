@@ -1,25 +1,288 @@
 import asyncio
 import logging
-from typing import List, Optional
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, List, Optional
 from datetime import datetime, timedelta
 
-from playwright.async_api import async_playwright, Page, Browser, Playwright
-from bs4 import BeautifulSoup
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Playwright
 from .config import Config
-from .models import ParkingSession, Balance
+from .models import ParkingSession, Balance, DayFailure, RegistrationSummary, make_session_id
+from .api_client import ParkeerApiClient, PortalApiError, PortalWriteUnconfirmed
+from .utils.state_cache import StorageStateCache
+from .utils.page_pool import PagePool, PooledPage
+from .utils.resource_blocker import NavigationStats, ResourceBlocker
+from .utils.session_html import parse_session_rows
+from .utils.dutch_time import parse_portal_time
+from .utils.ttl_cache import TTLCache
+from .utils.single_flight import SingleFlight
+from .utils.waits import WaitStrategy
 
 logger = logging.getLogger(__name__)
 
+RESUME_SELECTOR = (
+    'button:has-text("Start een nieuwe"), '
+    'a:has-text("Start een nieuwe"), '
+    'button:has-text("Hervatten vorige"), '
+    'a:has-text("Hervatten vorige")'
+)
+NEW_PLATE_SELECTOR = (
+    'button.add-license-plate, '
+    '[role="button"]:has-text("Nieuw kenteken"), '
+    'button:has-text("Nieuw kenteken"), '
+    'a:has-text("Nieuw kenteken"), '
+    'a:has-text("NIEUW KENTEKEN"), '
+    'button:has-text("NIEUW KENTEKEN")'
+)
+# Content signals: the page is usable once these show up (or the network goes idle)
+DASHBOARD_READY_SELECTOR = '#parkActions .park-item-desktop'
+SESSION_ROW_SELECTOR = '#parkActions .park-item-desktop'
+STOP_CONFIRM_SELECTOR = (
+    'button.confirm-stop, button.btn-primary, button:has-text("Stoppen"), button:has-text("Ja")'
+)
+BALANCE_READY_EXPRESSION = (
+    "() => { const el = document.querySelector('input[name=\"balance\"]');"
+    " return !!el && !!el.value; }"
+)
+
+# Collects the text of every session row in the page, in DOM order. Text nodes are
+# joined with a space, like BeautifulSoup's get_text(" ", strip=True).
+SESSION_ROWS_SCRIPT = """sel => {
+    const text = el => {
+        if (!el) return null;
+        const parts = [];
+        const walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+        while (walker.nextNode()) {
+            const t = walker.currentNode.nodeValue.trim();
+            if (t) parts.push(t);
+        }
+        return parts.join(' ');
+    };
+    return Array.from(document.querySelectorAll(sel)).map(row => {
+        let start = row.querySelector('div.start-time');
+        for (let sib = row.nextElementSibling; !start && sib; sib = sib.nextElementSibling) {
+            if (sib.matches('div.start-time')) start = sib;
+        }
+        const plate = row.querySelector('span.plate');
+        return {
+            plate: plate ? plate.textContent.trim() : null,
+            start: text(start),
+            end: text(row.querySelector('div.end-time')),
+        };
+    });
+}"""
+
+def _session_from_fields(plate: Optional[str], start_text: Optional[str],
+                         end_text: Optional[str]) -> Optional[ParkingSession]:
+    """Build a session from the text of a dashboard row."""
+    if not plate:
+        return None
+    start_time = parse_portal_time(start_text)
+    return ParkingSession(
+        # Without a start time the raw text keeps the ID stable (see parse_stats())
+        id=make_session_id(plate, start_time or start_text or ""),
+        plate=plate,
+        active=True,
+        start_time=start_time,
+        end_time=parse_portal_time(end_text),
+    )
+
+
+# Page checked out by the current task (see ParkeerClient.page)
+_current_slot: ContextVar[Optional[PooledPage]] = ContextVar("current_slot", default=None)
+
+
+def _uses_page(func=None, *, ensure_login: bool = True):
+    """Run the operation on a page checked out from the pool (if pooling is enabled)."""
+    if func is None:
+        return lambda f: _uses_page(f, ensure_login=ensure_login)
+
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        if self._pool is None or self._current_slot() is not None:
+            # No pool, or already running on a checked out page (nested call)
+            return await func(self, *args, **kwargs)
+
+        async with self._pool.checkout() as slot:
+            token = _current_slot.set(slot)
+            try:
+                # Every page has its own login state
+                if ensure_login and not slot.logged_in:
+                    if not await self.login():
+                        raise Exception("Login failed on pooled page")
+                return await func(self, *args, **kwargs)
+            finally:
+                _current_slot.reset(token)
+    return wrapper
+
+
+class RegistrationError(Exception):
+    """One or more days of a multi-day registration failed; `summary` has all outcomes."""
+
+    def __init__(self, summary: RegistrationSummary):
+        self.summary = summary
+        failed = ", ".join(f"{f.date} ({f.error})" for f in summary.failures)
+        total = len(summary.sessions) + len(summary.failures)
+        super().__init__(f"{len(summary.failures)} of {total} days failed: {failed}")
+
+
+class _Throttle:
+    """Spaces out operations so they start at least `interval` seconds apart."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._last = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._last + self.interval - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last = loop.time()
+
+
+def _api_first(func):
+    """
+    Try the operation on the HTTP backend first, fall back to the browser if it fails.
+
+    A write that may have reached the portal (PortalWriteUnconfirmed) is not
+    repeated in the browser, and the endpoint stays in use.
+    """
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        name = func.__name__
+        if self._api is not None and name not in self._api_failed:
+            try:
+                return await getattr(self._api, name)(*args, **kwargs)
+            except PortalWriteUnconfirmed:
+                raise
+            except PortalApiError as e:
+                # Endpoint broken or changed: use the browser for this operation from now on
+                logger.warning(f"HTTP API {name} failed, falling back to browser: {e}")
+                self._api_failed.add(name)
+        await self._ensure_browser()
+        return await func(self, *args, **kwargs)
+    return wrapper
+
+
+def _cached(resource: str):
+    """Serve the read from the TTL cache while it's fresh."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            found, value = self._cache.get(resource)
+            if found:
+                return list(value) if isinstance(value, list) else value
+            generation = self._cache.generation
+            value = await func(self, *args, **kwargs)
+            self._cache.set(resource, list(value) if isinstance(value, list) else value, generation)
+            return value
+        return wrapper
+    return decorator
+
+
+def _coalesced(func):
+    """Let concurrent callers of this read share one call (see utils/single_flight.py)."""
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        # Reads after a write don't join a call that started before it
+        return await self._single_flight.do(
+            func.__name__, lambda: func(self, *args, **kwargs), self._cache.generation
+        )
+    return wrapper
+
+
+def _invalidates_cache(func):
+    """Clear the cached reads after a write, also when it failed halfway."""
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await func(self, *args, **kwargs)
+        finally:
+            self._cache.invalidate()
+    return wrapper
+
+
 class ParkeerClient:
     def __init__(self, config: Config = None):
         self.config = config or Config.load()
         self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.context: Optional[BrowserContext] = None
+        self._page: Optional[Page] = None
         self._playwright: Optional[Playwright] = None
+        self._pool: Optional[PagePool] = None
+        self._blocker: Optional[ResourceBlocker] = None
+        # Per-step wait timings, see utils/waits.py
+        self.wait_timings = deque(maxlen=200)
+        self._state_cache = StorageStateCache.from_config(self.config)
+        self._state_restored = False
+        self._api: Optional[ParkeerApiClient] = None
+        self._api_failed: set = set()
+        self._cache = TTLCache({
+            "sessions": self.config.cache.sessions_ttl,
+            "balance": self.config.cache.balance_ttl,
+        })
+        self._single_flight = SingleFlight()
+        # Concurrent fallbacks to the browser must start only one
+        self._browser_lock = asyncio.Lock()
+
+    @property
+    def page(self) -> Optional[Page]:
+        """The page of the current operation: the checked out pool page, or the primary page."""
+        slot = self._current_slot()
+        return slot.page if slot else self._page
+
+    @page.setter
+    def page(self, page: Optional[Page]):
+        self._page = page
+
+    @property
+    def navigation_stats(self) -> Optional[NavigationStats]:
+        """Request/byte counts of the current page's navigation in progress."""
+        slot = self._current_slot()
+        blocker = slot.blocker if slot else self._blocker
+        return blocker.current if blocker else None
+
+    @property
+    def cache_stats(self) -> dict:
+        """Hit/miss counts of the read cache per resource."""
+        return self._cache.stats()
+
+    @property
+    def single_flight_stats(self) -> dict:
+        """Calls per read operation and how many of them shared an in-flight call."""
+        return self._single_flight.stats()
+
+    @property
+    def _waits(self) -> WaitStrategy:
+        return WaitStrategy(self.page, self.wait_timings)
+
+    def _current_slot(self) -> Optional[PooledPage]:
+        slot = _current_slot.get()
+        if slot is not None and slot.pool is self._pool:
+            return slot
+        return None
     
     async def __aenter__(self):
-        await self._init_browser()
+        await self.start()
         return self
+
+    async def start(self):
+        """Start the HTTP backend if enabled, otherwise the browser right away."""
+        if self.config.api.enabled:
+            self._api = ParkeerApiClient(self.config, state_cache=self._state_cache)
+        else:
+            await self._init_browser()
+
+    async def _ensure_browser(self):
+        """Start the browser on demand (only needed when the HTTP backend is in use)."""
+        async with self._browser_lock:
+            if self.page is None and self.browser is None:
+                logger.info("Starting browser for fallback")
+                await self._init_browser()
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         await self.close()
@@ -30,11 +293,103 @@ class ParkeerClient:
             headless=self.config.browser.headless,
             slow_mo=self.config.browser.slow_mo,
         )
-        self.page = await self.browser.new_page()
-        self.page.set_default_timeout(self.config.browser.timeout)
+        # Restore the cached login state (if any) so we can skip the login flow
+        storage_state = self._state_cache.load() if self._state_cache else None
+        self.context, self.page, self._blocker = await self._new_context(storage_state)
+        self._state_restored = storage_state is not None
+
+        if self.config.browser.pool_size > 1:
+            self._pool = PagePool(self.config.browser.pool_size, self._new_pooled_page)
+            self._pool.add(PooledPage(
+                context=self.context, page=self.page,
+                state_restored=self._state_restored, blocker=self._blocker,
+            ))
+
+    async def _new_context(self, storage_state: Optional[dict] = None):
+        """Open a browser context with one page, with request blocking installed."""
+        context = await self.browser.new_context(storage_state=storage_state)
+        page = await context.new_page()
+        page.set_default_timeout(self.config.browser.timeout)
+        blocker = ResourceBlocker.from_config(self.config.browser)
+        if blocker:
+            await blocker.attach(context, page)
+        return context, page, blocker
+
+    async def _new_pooled_page(self) -> PooledPage:
+        """Open an extra context for the pool, starting from the primary context's cookies."""
+        storage_state = await self.context.storage_state()
+        context, page, blocker = await self._new_context(storage_state)
+        # The copied cookies are verified by login() on first use, like a cached state
+        return PooledPage(
+            context=context, page=page, blocker=blocker,
+            state_restored=bool(storage_state.get("cookies")),
+        )
     
+    async def _restore_session(self) -> bool:
+        """Check whether the restored storage state is still accepted by the portal."""
+        dashboard_url = f"https://bezoek.parkeer.nl/{self.config.municipality}/app/park"
+        logger.info("Trying cached login state")
+        try:
+            await self.page.goto(dashboard_url)
+            await self.page.wait_for_load_state('domcontentloaded')
+            if await self._is_logged_in():
+                logger.info("Cached login state accepted, skipping login")
+                return True
+        except Exception as e:
+            logger.warning(f"Cached login state check failed: {e}")
+
+        # Only this page is re-logged in; the cache is cleared if that fails too (see login())
+        logger.info("Cached login state rejected, performing full login")
+        return False
+
+    async def _save_state(self):
+        """Persist the current storage state for the next run."""
+        slot = self._current_slot()
+        context = slot.context if slot else self.context
+        if not self._state_cache or not context:
+            return
+        try:
+            self._state_cache.save(await context.storage_state())
+        except Exception as e:
+            logger.warning(f"Could not store login state: {e}")
+
+    def _mark_logged_in(self):
+        slot = self._current_slot()
+        if slot:
+            slot.logged_in = True
+
+    @_uses_page(ensure_login=False)
     async def login(self) -> bool:
         """Login to bezoek.parkeer.nl"""
+        if self._api is not None and self.page is None:
+            # HTTP backend only; the browser is started if an operation needs it
+            try:
+                if await self._api.login():
+                    return True
+            except PortalApiError as e:
+                logger.warning(f"HTTP API login failed, falling back to browser: {e}")
+            self._api = None
+            await self._ensure_browser()
+
+        # Only try the cached state once, a re-login must do the real thing
+        slot = self._current_slot()
+        if slot.state_restored if slot else self._state_restored:
+            if slot:
+                slot.state_restored = False
+            self._state_restored = False
+            if await self._restore_session():
+                self._mark_logged_in()
+                return True
+
+        if await self._form_login():
+            return True
+        if self._state_cache:
+            # The credentials or the portal changed, the cached state is no use to any page
+            self._state_cache.clear()
+        return False
+
+    async def _form_login(self) -> bool:
+        """Log the current page in through the login form."""
         # Go directly to login page
         base_url = f"https://bezoek.parkeer.nl/{self.config.municipality}/login"
         logger.info(f"Navigating to {base_url}")
@@ -68,7 +423,7 @@ class ParkeerClient:
                 logger.error(f"Login failed with message: {error_text.strip()}")
                 return False
 
-        await self.page.wait_for_load_state('networkidle')
+        await self._waits.page_ready('login', selector='#parkActions, .user-menu')
         
         # Verify login success
         # Check for common post-login elements
@@ -77,6 +432,8 @@ class ParkeerClient:
            await self.page.query_selector('.user-menu') or \
            "app" in self.page.url:
              logger.info("Login successful")
+             self._mark_logged_in()
+             await self._save_state()
              return True
         
         # Final check for errors if verification failed but no timeout occurred (e.g. immediate reload)
@@ -108,6 +465,9 @@ class ParkeerClient:
             
         return False
     
+    @_invalidates_cache
+    @_api_first
+    @_uses_page
     async def register_visitor(self, plate: str, 
                              start_date: str = None, start_time: str = None,
                              end_date: str = None, end_time: str = None,
@@ -146,17 +506,15 @@ class ParkeerClient:
                 await self.page.goto(target_url)
             # Check for "Resume previous session" dialog which appears sometimes on Almere portal
             try:
-                # Wait a bit for the page to decide if it shows a dialog
-                await asyncio.sleep(1)
+                # Wait until the page shows either the resume prompt or the registration form
+                await self._waits.selector(
+                    'resume dialog check',
+                    f'{RESUME_SELECTOR}, input[name="number"], {NEW_PLATE_SELECTOR}',
+                    timeout=3000,
+                )
                 
                 # Check for buttons or text suggesting a resume prompt
-                # Use query_selector with multiple possibilities
-                resume_btn = await self.page.query_selector(
-                    'button:has-text("Start een nieuwe"), '
-                    'a:has-text("Start een nieuwe"), '
-                    'button:has-text("Hervatten vorige"), '
-                    'a:has-text("Hervatten vorige")'
-                )
+                resume_btn = await self.page.query_selector(RESUME_SELECTOR)
                 
                 if resume_btn:
                     logger.info("Handling 'Resume/Vorige parkeeractie' prompt...")
@@ -164,7 +522,10 @@ class ParkeerClient:
                     start_new_btn = await self.page.query_selector('text="Start een nieuwe"')
                     if start_new_btn:
                         await start_new_btn.click()
-                        await self.page.wait_for_load_state('networkidle')
+                        await self._waits.page_ready(
+                            'start new action',
+                            selector=f'input[name="number"], {NEW_PLATE_SELECTOR}',
+                        )
             except Exception as e:
                 logger.debug(f"Resume dialog check failed (ignoring): {e}")
 
@@ -185,15 +546,7 @@ class ParkeerClient:
                 logger.info("Clicking 'NIEUW KENTEKEN' button...")
                 try:
                     # Generic broad selector for anything that looks like the button
-                    await self.page.click(
-                        'button.add-license-plate, '
-                        '[role="button"]:has-text("Nieuw kenteken"), '
-                        'button:has-text("Nieuw kenteken"), '
-                        'a:has-text("Nieuw kenteken"), '
-                        'a:has-text("NIEUW KENTEKEN"), '
-                        'button:has-text("NIEUW KENTEKEN")',
-                        timeout=5000
-                    )
+                    await self.page.click(NEW_PLATE_SELECTOR, timeout=5000)
                 except Exception as e:
                     logger.warning(f"Warning clicking 'Nieuw Kenteken' button: {e}")
 
@@ -208,9 +561,14 @@ class ParkeerClient:
             # User says system checks plate and shows car brand in div.auto-brand
             logger.info("Waiting for vehicle verification...")
             try:
-                await self.page.wait_for_selector('.auto-brand', timeout=10000)
-                # Wait a bit for text to populate if it's async
-                await asyncio.sleep(1) 
+                # The brand is filled in asynchronously after the plate lookup
+                if not await self._waits.condition(
+                    'vehicle verification',
+                    "() => { const el = document.querySelector('.auto-brand');"
+                    " return !!el && el.textContent.trim().length > 0; }",
+                    timeout=10000,
+                ):
+                    raise Exception("no vehicle brand shown")
                 brand_element = await self.page.query_selector('.auto-brand')
                 brand_text = await brand_element.text_content()
                 brand_text = brand_text.strip()
@@ -301,25 +659,21 @@ class ParkeerClient:
 
             # Wait for the button to become enabled
             logger.info("Waiting for 'Parkeeractie starten' button to be enabled...")
-            try:
-                await self.page.wait_for_function(
-                    "() => !document.querySelector('button.confirmAction').disabled",
-                    timeout=5000
-                )
-            except Exception as e:
-                logger.warning(f"Button did not become enabled automatically: {e}")
+            if not await self._waits.enabled('confirm button enabled', 'button.confirmAction'):
+                logger.warning("Button did not become enabled automatically")
 
             # Start parking action (Confirm)
+            # The portal saves the action with a non-GET XHR, that is our signal it's done
             logger.info("Clicking 'Parkeeractie starten' (Confirm)...")
-            await self.page.click('button.confirmAction', timeout=5000)
-            
-            # ... rest of success handling
-            await self.page.wait_for_load_state('networkidle')
+            async with self._waits.response(
+                'registration confirmed',
+                lambda r: r.request.method != "GET" and "parkeer.nl" in r.url,
+                fallback=self._settle_after_registration,
+            ):
+                await self.page.click('button.confirmAction', timeout=5000)
             
             # Generate ID consistent with list parsing
-            import hashlib
-            id_base = f"{plate}-{parsed_start.isoformat()}"
-            session_id = hashlib.md5(id_base.encode()).hexdigest()[:8]
+            session_id = make_session_id(plate, parsed_start)
 
             return ParkingSession(
                 id=session_id,
@@ -346,146 +700,206 @@ class ParkeerClient:
                 pass
             raise e
 
-    async def register_multiple_days(self, plate: str, days: int, date: Optional[str] = None, start_time: Optional[str] = None, all_day: bool = True) -> List[ParkingSession]:
-        """Register a visitor for multiple consecutive days."""
+    async def _settle_after_registration(self):
+        """Fallback when the registration request wasn't seen: the old fixed wait."""
+        await self.page.wait_for_load_state('networkidle')
+        await asyncio.sleep(1)
+
+    def plan_days(self, days: int, date: Optional[str] = None, start_time: Optional[str] = None,
+                  all_day: bool = True, plate: Optional[str] = None,
+                  zone: Optional[str] = None) -> List[dict]:
+        """
+        Work out the register_visitor() arguments for each day of a multi-day registration.
+        The zone's hours are used, see Config.zone_for().
+        """
         from .utils.time_utils import TimeUtils
-        
-        sessions = []
-        base_date = datetime.now()
-        if date:
-            if date.lower() == 'tomorrow':
-                base_date = base_date + timedelta(days=1)
-            else:
+
+        return TimeUtils.plan_days(self.config.zone_for(plate, zone), days, date=date,
+                                   start_time=start_time, all_day=all_day)
+
+    def plan_visit(self, arrive: datetime, depart: datetime, plate: Optional[str] = None,
+                   zone: Optional[str] = None) -> List[dict]:
+        """The paid periods of a visit to register, see utils/planner.py."""
+        from .utils.planner import plan_visit
+
+        resolved = self.config.zone_for(plate, zone)
+        if resolved is None:
+            raise ValueError("No zones configured")
+        max_span = timedelta(hours=self.config.defaults.max_registration_hours)
+        return plan_visit(resolved, arrive, depart, max_span=max_span)
+
+    async def register_days(self, plate: str, days: int, date: Optional[str] = None,
+                            start_time: Optional[str] = None, all_day: bool = True,
+                            parallel: Optional[int] = None,
+                            zone: Optional[str] = None) -> RegistrationSummary:
+        """Register a visitor for multiple consecutive days, see register_plan()."""
+        plan = self.plan_days(days, date, start_time, all_day, plate=plate, zone=zone)
+        return await self.register_plan(plate, plan, parallel)
+
+    async def register_visit(self, plate: str, arrive: datetime, depart: datetime,
+                             parallel: Optional[int] = None,
+                             zone: Optional[str] = None) -> RegistrationSummary:
+        """Register only the paid periods between `arrive` and `depart`, see register_plan()."""
+        plan = self.plan_visit(arrive, depart, plate, zone)
+        return await self.register_plan(plate, plan, parallel)
+
+    async def register_plan(self, plate: str, plan: List[dict],
+                            parallel: Optional[int] = None) -> RegistrationSummary:
+        """
+        Make the registrations of a plan (register_visitor() arguments), several at a time.
+
+        Registrations run side by side on pooled pages (at most `parallel`, default
+        defaults.parallel_registrations) and are started at least
+        defaults.registration_interval seconds apart to go easy on the portal.
+        A failing one doesn't stop the others; every outcome ends up in the summary.
+        """
+        limit = parallel or self.config.defaults.parallel_registrations
+        # In the browser every registration needs a page of its own, and with the
+        # HTTP backend any registration can fall back to the browser
+        pages = self._pool.size if self._pool else max(1, self.config.browser.pool_size)
+        limit = min(limit, pages)
+        semaphore = asyncio.Semaphore(max(1, limit))
+        throttle = _Throttle(self.config.defaults.registration_interval)
+        days = len(plan)
+
+        async def register_day(i: int, day: dict):
+            async with semaphore:
+                await throttle.wait()
                 try:
-                    base_date = datetime.strptime(date, "%d-%m-%Y")
-                except ValueError:
-                    # If date is already in some other format or just today?
-                    pass
+                    session = await self.register_visitor(plate=plate, **day)
+                    logger.info(f"Registered {i+1}/{days} for {plate}: {session.start_time}")
+                    return session
+                except Exception as e:
+                    logger.error(
+                        f"Registering {i+1}/{days} ({day['start_date']}) for {plate} failed: {e}"
+                    )
+                    return DayFailure(date=day['start_date'], error=str(e))
 
-        for i in range(days):
-            current_date = base_date + timedelta(days=i)
-            current_date_str = current_date.strftime("%d-%m-%Y")
-            
-            zone = self.config.zones[0] if self.config.zones else None
-            
-            # Determine Start Time
-            s_time = start_time
-            if not s_time:
-                if i == 0 and not date: 
-                    # Today, starting now
-                    s_time = datetime.now().strftime("%H:%M")
-                else:
-                    # Future date, use zone start time
-                    if zone:
-                        rule = TimeUtils.get_rule_for_day(zone, current_date)
-                        s_time = rule.start_time if rule else "00:00"
-                    else:
-                        s_time = "00:00"
+        results = await asyncio.gather(*(register_day(i, day) for i, day in enumerate(plan)))
 
-            # Determine End Time
-            e_time = None
-            if all_day and zone:
-                e_time = TimeUtils.get_end_time_for_all_day(zone, current_date)
-            
-            session = await self.register_visitor(
-                plate=plate,
-                start_date=current_date_str,
-                start_time=s_time,
-                end_date=current_date_str,
-                end_time=e_time
-            )
-            sessions.append(session)
-            logger.info(f"Registered day {i+1}/{days} for {plate}: {session.start_time}")
-            
-            # Small delay between registration actions to avoid portal glitches
-            if i < days - 1:
-                await asyncio.sleep(2)
-            
-        return sessions
+        summary = RegistrationSummary()
+        for result in results:
+            if isinstance(result, DayFailure):
+                summary.failures.append(result)
+            else:
+                summary.sessions.append(result)
+        return summary
+
+    async def register_multiple_days(self, plate: str, days: int, date: Optional[str] = None,
+                                     start_time: Optional[str] = None, all_day: bool = True,
+                                     zone: Optional[str] = None) -> List[ParkingSession]:
+        """
+        Register a visitor for multiple consecutive days.
+        Raises RegistrationError if any day failed.
+        """
+        summary = await self.register_days(plate, days, date=date, start_time=start_time,
+                                           all_day=all_day, zone=zone)
+        if summary.failures:
+            raise RegistrationError(summary)
+        return summary.sessions
 
+    @_invalidates_cache
+    @_api_first
+    @_uses_page
     async def stop_session(self, session: ParkingSession) -> bool:
         """Stop a parking session for a given session object"""
         logger.info(f"Stopping session for {session.plate} (ID: {session.id})")
-        
-        # Navigate to Active Sessions page if needed
+
         # Navigate to Active Sessions page if needed
         await self._ensure_dashboard()
-        
-        # Get all session containers
-        elements = await self.page.query_selector_all('.park-item-desktop')
-        
-        for element in elements:
-            # Get HTML of this element AND its sibling if it looks like the start-time row
-            # This ensures we match exactly the same way we listed them, covering the sibling structure
-            html_data = await element.evaluate("""el => {
-                let html = el.outerHTML;
-                let sib = el.nextElementSibling;
-                if (sib && sib.classList.contains('start-time')) {
-                    html += sib.outerHTML;
-                }
-                return html;
-            }""")
-            
-            # Parse it
-            item_soup = BeautifulSoup(html_data, 'html.parser')
-            
-            # Find the root div in the fragment
-            root = item_soup.find('div', class_='park-item-desktop')
-            if not root:
+
+        # One read of all rows; the IDs are matched here, the row is clicked by position
+        rows = await self._read_session_rows()
+        index = next((i for i, s in enumerate(rows) if s and s.id == session.id), None)
+        if index is None:
+            logger.warning(f"Could not find session {session.id} in DOM to stop.")
+            return False
+
+        logger.info(f"Found matching session in DOM (row {index}), clicking stop...")
+        try:
+            row = self.page.locator(SESSION_ROW_SELECTOR).nth(index)
+            await row.locator('button.stop-parking-action').click(timeout=5000)
+        except Exception as e:
+            logger.warning(f"Could not click stop for session {session.id}: {e}")
+            return False
+
+        await self._confirm_stop()
+
+        # Wait for session to actually disappear from the DOM
+        await self._waits.condition(
+            'session stopped',
+            "([sel, n]) => document.querySelectorAll(sel).length < n",
+            arg=[SESSION_ROW_SELECTOR, len(rows)], timeout=5000,
+        )
+        return True
+
+    async def _confirm_stop(self):
+        """Confirm the stop dialog, if the portal shows one."""
+        try:
+            await self.page.wait_for_selector(STOP_CONFIRM_SELECTOR, timeout=2000)
+            await self.page.click(STOP_CONFIRM_SELECTOR)
+        except Exception:
+            logger.warning("No confirmation dialog appeared or could not be clicked automatically.")
+
+    async def _stop_matching(self, match: Callable[[ParkingSession], bool]) -> int:
+        """
+        Stop every listed session for which `match` is true.
+
+        The dashboard is read once to find the matching rows, which are then clicked
+        bottom-up so the positions of the rows still to be stopped don't shift.
+        A single reload at the end verifies which sessions are really gone.
+        """
+        await self._ensure_dashboard()
+        rows = await self._read_session_rows()
+        targets = [(i, s) for i, s in enumerate(rows) if s and match(s)]
+        if not targets:
+            return 0
+        logger.info(f"Stopping {len(targets)} session(s) in one pass")
+
+        row_count = len(rows)
+        row_locator = self.page.locator(SESSION_ROW_SELECTOR)
+        for index, session in reversed(targets):
+            try:
+                stop_button = row_locator.nth(index).locator('button.stop-parking-action')
+                await stop_button.click(timeout=5000)
+            except Exception as e:
+                logger.warning(f"Could not click stop for session {session.id}: {e}")
                 continue
-                
-            candidate_session = self._parse_single_session_from_soup(root)
-            
-            if candidate_session:
-                 logger.debug(f"Checked candidate session: {candidate_session.id} (Plate: {candidate_session.plate})")
-            
-            if candidate_session and candidate_session.id == session.id:
-                logger.info(f"Found matching session in DOM (ID: {candidate_session.id}), clicking stop...")
-                
-                # Find stop button within this specific element handle
-                btn = await element.query_selector('button.stop-parking-action')
-                if btn:
-                    await btn.click()
-                    
-                    # Confirm dialog
-                    try: 
-                        await self.page.wait_for_selector('button.confirm-stop, button.btn-primary, button:has-text("Stoppen"), button:has-text("Ja")', timeout=2000)
-                        await self.page.click('button.confirm-stop, button.btn-primary, button:has-text("Stoppen"), button:has-text("Ja")')
-                    except Exception:
-                        logger.warning("No confirmation dialog appeared or could not be clicked automatically.")
-                    
-                    # Wait for session to actually disappear from the DOM or for page change
-                    await self.page.wait_for_load_state('networkidle')
-                    await asyncio.sleep(1) 
-                    return True
-        
-        logger.warning(f"Could not find session {session.id} in DOM to stop.")
-        return False
+            await self._confirm_stop()
+            if await self._waits.condition(
+                'session stopped',
+                "([sel, n]) => document.querySelectorAll(sel).length < n",
+                arg=[SESSION_ROW_SELECTOR, row_count], timeout=5000,
+            ):
+                row_count -= 1
+
+        await self.page.reload()
+        await self._waits.page_ready('dashboard', selector=DASHBOARD_READY_SELECTOR)
+        remaining = {s.id for s in await self._read_session_rows() if s}
+        stopped = sum(1 for _, s in targets if s.id not in remaining)
+        if stopped < len(targets):
+            logger.warning(f"{len(targets) - stopped} session(s) still active after stopping")
+        return stopped
+
+    @_invalidates_cache
+    @_api_first
+    @_uses_page
+    async def stop_sessions(self, sessions: List[ParkingSession]) -> int:
+        """Stop several sessions in one pass. Returns the number actually stopped."""
+        ids = {s.id for s in sessions}
+        if not ids:
+            return 0
+        return await self._stop_matching(lambda s: s.id in ids)
 
+    @_invalidates_cache
+    @_api_first
+    @_uses_page
     async def stop_all_sessions(self, plate: str) -> int:
         """Stop all active parking sessions for a specific license plate."""
-        count = 0
         logger.info(f"Stopping all sessions for plate: {plate}")
-        
-        while True:
-            # Re-fetch sessions on every iteration because the page state changes
-            sessions = await self.get_active_sessions()
-            matching = [s for s in sessions if s.plate == plate]
-            
-            if not matching:
-                logger.info(f"No more sessions found for {plate}")
-                break
-            
-            session_to_stop = matching[0]
-            logger.info(f"Stopping session {count + 1} for {plate} (ID: {session_to_stop.id})")
-            
-            if await self.stop_session(session_to_stop):
-                count += 1
-            else:
-                # If we couldn't stop the session (e.g. button missing), avoid infinite loop
-                logger.warning(f"Failed to stop session {session_to_stop.id}, aborting loop.")
-                break
-                
+        count = await self._stop_matching(lambda s: s.plate == plate)
+        if not count:
+            logger.info(f"No sessions found for {plate}")
         return count
 
     async def _is_logged_in(self) -> bool:
@@ -533,14 +947,18 @@ class ParkeerClient:
         if should_navigate:
             logger.info(f"Navigating to dashboard (Current: {current_url})")
             await self.page.goto(dashboard_url)
-            await self.page.wait_for_load_state('networkidle')
+            await self._waits.page_ready('dashboard', selector=DASHBOARD_READY_SELECTOR)
             # Check if we got redirected to login page
             await self._ensure_logged_in()
             if should_navigate and "/app/park" not in self.page.url:
                 # After re-login we might not be on the dashboard yet
                 await self.page.goto(dashboard_url)
-                await self.page.wait_for_load_state('networkidle')
+                await self._waits.page_ready('dashboard', selector=DASHBOARD_READY_SELECTOR)
 
+    @_cached("sessions")
+    @_coalesced
+    @_api_first
+    @_uses_page
     async def get_active_sessions(self) -> List[ParkingSession]:
         """Get list of active parking sessions"""
         logger.info("Fetching active sessions")
@@ -550,131 +968,47 @@ class ParkeerClient:
         # Ensure we are logged in and on a page with session info
         await self._ensure_dashboard()
 
-        content = await self.page.content()
-        return self._parse_sessions_from_html(content)
-        
-    def _parse_sessions_from_html(self, html_content: str) -> List[ParkingSession]:
-        """Parse parking sessions from HTML content"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        sessions = []
-        
-        # Find the desktop container for parking actions
-        container = soup.find(id='parkActions')
-        if not container:
-            return []
-            
-        # Iterate over parking items
-        items = container.find_all('div', class_='park-item-desktop')
-        
-        logging.debug(f"Found {len(items)} session items")
-
-        for item in items:
-            session = self._parse_single_session_from_soup(item)
-            if session:
-                sessions.append(session)
-                
-        return sessions
+        return [s for s in await self._read_session_rows() if s]
 
-    def _parse_single_session_from_soup(self, item) -> Optional[ParkingSession]:
-        """Helper to parse a single session from a BeautifulSoup tag"""
-        try:
-            # Extract license plate
-            plate_elem = item.find('span', class_='plate')
-            if not plate_elem:
-                return None
-            plate = plate_elem.get_text(strip=True)
-            
-            # --- Helper for parsing times ---
-            def parse_time_element(element):
-                """Parses text from a time element into a datetime object"""
-                if not element:
-                    return None
-                    
-                # Use get_text() with separator to handle nested spans cleaner
-                full_text = element.get_text(" ", strip=True)
-                full_str = full_text.lower()
-                
-                # Remove known labels to clean up string
-                for label in ['eindtijd', 'start tijd', 'start actie', 'deze actie start', 'verstreken', 'product']:
-                    full_str = full_str.replace(label, "")
-                
-                # Logic for "morgen", "vandaag", "18 dec."
-                now = datetime.now()
-                today = now.date()
-                target_date = today
-                
-                # Date parsing
-                if "morgen" in full_str:
-                    target_date = today + timedelta(days=1)
-                    full_str = full_str.replace("morgen", "").strip()
-                elif "vandaag" in full_str:
-                    target_date = today
-                    full_str = full_str.replace("vandaag", "").strip()
-                elif any(m in full_str for m in ['jan', 'feb', 'mrt', 'apr', 'mei', 'jun', 'jul', 'aug', 'sep', 'okt', 'nov', 'dec']):
-                    months = {
-                        'jan': 1, 'feb': 2, 'mrt': 3, 'apr': 4, 'mei': 5, 'jun': 6,
-                        'jul': 7, 'aug': 8, 'sep': 9, 'okt': 10, 'nov': 11, 'dec': 12
-                    }
-                    
-                    import re
-                    date_match = re.search(r'(\d{1,2})\s+([a-z]{3})', full_str)
-                    if date_match:
-                        day = int(date_match.group(1))
-                        month_str = date_match.group(2)
-                        month = months.get(month_str)
-                        if month:
-                            year = now.year
-                            if now.month == 12 and month == 1:
-                                year += 1
-                            target_date = datetime(year, month, day).date()
-                            full_str = full_str.replace(date_match.group(0), "").replace(".", "").strip()
-
-                # Time parsing (HH:MM)
-                import re
-                time_match = re.search(r'(\d{1,2}:\d{2})', full_str)
-                parsed_dt = None
-                
-                if time_match:
-                    time_str = time_match.group(1)
-                    h, m = map(int, time_str.split(':'))
-                    parsed_dt = datetime.combine(target_date, datetime.min.time().replace(hour=h, minute=m))
-                
-                return parsed_dt
+    async def _read_session_rows(self) -> List[Optional[ParkingSession]]:
+        """
+        Read the session rows of the dashboard in DOM order (None for unparseable rows).
 
-            # --- Extract Start and End Times ---
-            end_time_div = item.find('div', class_='end-time')
-            end_time = parse_time_element(end_time_div)
-            
-            # Start time seems to be in a sibling div in some views
-            start_time_div = item.find('div', class_='start-time')
-            if not start_time_div:
-                 # check sibling
-                 start_time_div = item.find_next_sibling('div', class_='start-time')
-            
-            start_time = parse_time_element(start_time_div)
-            
-            # Fallback for start_time if not found (required for ID)
-            if not start_time:
-                start_time = datetime.now() # Should not verify happens if HTML is good
+        By default one in-page script returns just the text fields of each row; the
+        full-page HTML parse (utils/session_html.py) is used as a fallback.
+        """
+        if self.config.browser.session_extraction == "script":
+            try:
+                rows = await self.page.evaluate(SESSION_ROWS_SCRIPT, SESSION_ROW_SELECTOR)
+                if isinstance(rows, list):
+                    return [self._session_from_row(row) for row in rows]
+                logger.warning("Session extraction script returned no list, parsing HTML")
+            except Exception as e:
+                logger.warning(f"Session extraction script failed, parsing HTML: {e}")
 
-            # --- Generate Unique ID ---
-            # Hash of plate + start_time
-            import hashlib
-            id_base = f"{plate}-{start_time.isoformat()}"
-            session_id = hashlib.md5(id_base.encode()).hexdigest()[:8]
+        return self._parse_session_rows(await self.page.content())
 
-            return ParkingSession(
-                id=session_id,
-                plate=plate,
-                active=True,
-                start_time=start_time,
-                end_time=end_time
-            )
-            
+    def _session_from_row(self, row: dict) -> Optional[ParkingSession]:
+        try:
+            return _session_from_fields(row.get("plate"), row.get("start"), row.get("end"))
         except Exception as e:
-            logger.error(f"Error parsing session item: {e}")
+            logger.error(f"Error parsing session row {row!r}: {e}")
             return None
 
+    def _parse_sessions_from_html(self, html_content: str) -> List[ParkingSession]:
+        """Parse parking sessions from HTML content"""
+        return [s for s in self._parse_session_rows(html_content) if s]
+
+    def _parse_session_rows(self, html_content: str) -> List[Optional[ParkingSession]]:
+        """Parse every session row in DOM order; rows that can't be parsed are None."""
+        rows = parse_session_rows(html_content, self.config.browser.html_parser)
+        logger.debug(f"Found {len(rows)} session items")
+        return [self._session_from_row(row) for row in rows]
+
+    @_cached("balance")
+    @_coalesced
+    @_api_first
+    @_uses_page
     async def get_balance(self) -> Balance:
         """Get current balance"""
         logger.info("Fetching balance")
@@ -684,13 +1018,13 @@ class ParkeerClient:
         if self.page.url != user_page_url:
             logger.info(f"Navigating to {user_page_url}")
             await self.page.goto(user_page_url)
-            await self.page.wait_for_load_state('networkidle')
+            await self._waits.page_ready('user page', expression=BALANCE_READY_EXPRESSION)
             # Check if we got redirected to login page
             await self._ensure_logged_in()
             if "/app/user" not in self.page.url:
                 # After re-login, navigate again
                 await self.page.goto(user_page_url)
-                await self.page.wait_for_load_state('networkidle')
+                await self._waits.page_ready('user page', expression=BALANCE_READY_EXPRESSION)
         
         try:
             selector = 'input[name="balance"]'
@@ -708,6 +1042,13 @@ class ParkeerClient:
         return Balance(amount=0.0)
     
     async def close(self):
+        if self._api:
+            await self._api.close()
+        if self._blocker:
+            self._blocker.report()
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
         if self.browser:
             await self.browser.close()
         if self._playwright:
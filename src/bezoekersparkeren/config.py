@@ -1,8 +1,8 @@
 import os
 import re
 from pathlib import Path
-from typing import Optional, List
-from pydantic import BaseModel
+from typing import Dict, Optional, List
+from pydantic import BaseModel, Field, PrivateAttr
 from pydantic_settings import BaseSettings
 import yaml
 from dotenv import load_dotenv
@@ -16,9 +16,39 @@ class BrowserConfig(BaseModel):
     headless: bool = True
     slow_mo: int = 100
     timeout: int = 30000
+    # Directory for the encrypted login state cache, None disables it
+    storage_state_dir: Optional[str] = ".browser_state"
+    # Number of browser pages that can work on the portal at the same time
+    pool_size: int = 1
+    # Abort requests the automation doesn't need to speed up page loads
+    block_resources: bool = True
+    blocked_resource_types: List[str] = ["image", "font", "media"]
+    blocked_domains: List[str] = [
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "hotjar.com",
+        "clarity.ms",
+        "facebook.net",
+        "siteimprove.com",
+        "siteimproveanalytics.com",
+    ]
+    # URLs containing any of these strings are never blocked
+    allowed_urls: List[str] = []
+    # How the dashboard is read: "script" extracts the session fields in the page,
+    # "html" transfers the whole page and parses it with BeautifulSoup
+    session_extraction: str = "script"
+    # HTML parser for the "html" extraction: "auto" (fastest installed), "selectolax", "lxml"
+    # or "html.parser"
+    html_parser: str = "auto"
 
 class DefaultSettings(BaseModel):
     duration_hours: int = 3
+    # Multi-day registrations: days registered at the same time, and seconds between starts
+    parallel_registrations: int = 3
+    registration_interval: float = 1.0
+    # Longest single registration the visit planner makes by merging paid periods
+    max_registration_hours: float = 24.0
 
 class LoggingConfig(BaseModel):
     level: str = "INFO"
@@ -37,9 +67,64 @@ class NotificationConfig(BaseModel):
     session_expiry_warning: int = 30  # minuten
 
 
+class ApiConfig(BaseModel):
+    """Direct HTTP backend (see api_client.py); the browser is only used as fallback."""
+    enabled: bool = False
+    timeout: float = 10.0
+    # Paths of the XHR endpoints the portal SPA uses ({municipality}, {id} are filled in)
+    sessions_endpoint: str = "/{municipality}/api/park/actions"
+    register_endpoint: str = "/{municipality}/api/park/actions"
+    stop_endpoint: str = "/{municipality}/api/park/actions/{id}/stop"
+    balance_endpoint: str = "/{municipality}/api/user"
+
+
+class CacheConfig(BaseModel):
+    """Seconds a portal read stays valid; 0 disables caching. Registering or stopping clears it."""
+    sessions_ttl: float = 30.0
+    balance_ttl: float = 60.0
+
+
+class DaemonConfig(BaseModel):
+    enabled: bool = True  # let CLI commands use a running daemon
+    socket_path: str = ".bezoekersparkeren.sock"
+
+
+class RecognitionConfig(BaseModel):
+    # Smallest Telegram photo size whose short side is at least this many pixels
+    min_photo_side: int = 720
+    # Downscale and re-encode before upload (needs Pillow, pip install bezoekersparkeren[vision])
+    max_side: int = 1024
+    max_bytes: int = 150_000
+    image_format: str = "jpeg"  # jpeg or webp
+    quality: int = Field(85, ge=1, le=100)
+    # Crop to the yellow plate when one is found
+    crop_plate: bool = False
+    # Backends to try: remote, local, local_first or remote_first (see license_plate_recognition.py)
+    strategy: str = "local_first"
+    # Local backend: Tesseract binary (default: on PATH) and seconds it may take
+    tesseract_cmd: Optional[str] = None
+    local_timeout: float = 2.0
+    # Recognized plates by photo, see utils/recognition_cache.py; 0 entries disables it
+    cache_entries: int = 256
+    cache_ttl_hours: float = 168
+    cache_path: Optional[str] = None
+
 class OpenRouterConfig(BaseModel):
     api_key: Optional[str] = None
     model: str = "google/gemini-2.0-flash-001"
+    # Hedge models: when `model` hasn't answered within the hedge delay the next one is asked
+    # too, and the first Dutch-format plate wins (see license_plate_recognition.py)
+    models: List[str] = []
+    # Hedge after this percentile of the model's recent latency
+    # (hedge_delay until hedge_min_samples answers are in)
+    hedge_percentile: float = 90.0
+    hedge_delay: float = 3.0
+    hedge_min_samples: int = 10
+    # Give up on a photo after this many seconds, across all models
+    latency_budget: float = 12.0
+    timeout: float = 15.0
+    # Use HTTP/2 when the h2 package is installed (pip install bezoekersparkeren[http2])
+    http2: bool = True
 
 
 
@@ -54,11 +139,65 @@ class Config(BaseSettings):
     logging: LoggingConfig = LoggingConfig()
     telegram: Optional[TelegramConfig] = None
     openrouter: OpenRouterConfig = OpenRouterConfig()
+    recognition: RecognitionConfig = RecognitionConfig()
+    daemon: DaemonConfig = DaemonConfig()
+    api: ApiConfig = ApiConfig()
+    cache: CacheConfig = CacheConfig()
     favorites: List[Favorite] = []
     zones: List[Zone] = []
+    # Plate -> zone (code or name) for visitors without a favorite
+    plate_zones: Dict[str, str] = {}
+    # Lookup tables built on first use, see _indexes()
+    _index: Optional[tuple] = PrivateAttr(default=None)
     
     class Config:
         env_prefix = "PARKEER_"
+
+    @staticmethod
+    def plate_key(plate: str) -> str:
+        """Plate without dashes or spaces, in capitals."""
+        return re.sub(r'[^A-Z0-9]', '', plate.upper())
+
+    def _indexes(self) -> tuple:
+        """
+        (zone by code/name, zone key by plate), rebuilt when zones, favorites or
+        plate_zones are replaced.
+        """
+        sources = (self.zones, self.favorites, self.plate_zones)
+        cached = self.__pydantic_private__.get("_index")
+        if cached is None or any(a is not b for a, b in zip(cached[0], sources)):
+            zones = {}
+            for zone in self.zones:
+                # The first zone with a code or name wins, like the schedule rules
+                zones.setdefault(zone.code.strip().casefold(), zone)
+                zones.setdefault(zone.name.strip().casefold(), zone)
+            plates = {self.plate_key(plate): key for plate, key in self.plate_zones.items()}
+            # A favorite's zone beats the plate mapping
+            plates.update({self.plate_key(f.plate): f.zone for f in self.favorites if f.zone})
+            cached = (sources, zones, plates)
+            self.__pydantic_private__["_index"] = cached
+        return cached[1], cached[2]
+
+    def get_zone(self, key: str) -> Zone:
+        """Zone by code or name (case insensitive)."""
+        zone = self._indexes()[0].get(key.strip().casefold())
+        if zone is None:
+            known = ", ".join(f"{z.name} ({z.code})" for z in self.zones) or "none"
+            raise ValueError(f"Unknown zone '{key}', configured zones: {known}")
+        return zone
+
+    def zone_for(self, plate: Optional[str] = None, zone: Optional[str] = None) -> Optional[Zone]:
+        """
+        The zone to use for a registration: the explicit `zone`, else the plate's
+        favorite zone or plate_zones entry, else the first configured zone.
+        """
+        if zone:
+            return self.get_zone(zone)
+        if plate:
+            key = self._indexes()[1].get(self.plate_key(plate))
+            if key:
+                return self.get_zone(key)
+        return self.zones[0] if self.zones else None
     
     @classmethod
     def load(cls, config_path: Path = None) -> "Config":
@@ -0,0 +1,188 @@
+"""
+Warm-browser daemon.
+
+Keeps one logged-in ParkeerClient alive and serves CLI commands over a Unix domain
+socket, so a command doesn't have to pay for starting Chromium and logging in.
+
+Protocol: one JSON object per line.
+    request:  {"command": "list", "args": {}}
+    response: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+from pathlib import Path
+from typing import Any, Optional
+
+from .client import ParkeerClient
+from .config import Config
+from .models import ParkingSession
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket."""
+
+
+class DaemonError(Exception):
+    """The daemon received the command but it failed."""
+
+
+class ParkeerDaemon:
+    def __init__(self, config: Config, socket_path: Optional[Path] = None):
+        self.config = config
+        self.socket_path = Path(socket_path or config.daemon.socket_path)
+        self._client: Optional[ParkeerClient] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._client_lock = asyncio.Lock()
+        # Commands can only run side by side when the client has pages for them
+        self._slots = asyncio.Semaphore(max(1, config.browser.pool_size))
+
+    @staticmethod
+    def _browser_crashed(client: ParkeerClient) -> bool:
+        if client.page is None:  # None when only the HTTP backend is in use
+            return False
+        return client.page.is_closed() or (
+            client.browser is not None and not client.browser.is_connected()
+        )
+
+    async def _get_client(self) -> ParkeerClient:
+        """Get the warm client, recreating it if the browser has crashed."""
+        if self._client is not None and self._browser_crashed(self._client):
+            logger.warning("Browser appears crashed, recreating client...")
+            try:
+                await self._client.close()
+            except Exception:
+                pass
+            self._client = None
+        if self._client is None:
+            client = ParkeerClient(self.config)
+            await client.start()
+            if not await client.login():
+                await client.close()
+                raise DaemonError("Login failed")
+            self._client = client
+        return self._client
+
+    async def start(self):
+        """Start the browser and begin listening on the socket."""
+        if self.socket_path.exists():
+            if await is_running(self.socket_path):
+                raise RuntimeError(f"Daemon already running on {self.socket_path}")
+            # Left behind by a daemon that didn't shut down cleanly
+            self.socket_path.unlink()
+
+        await self._get_client()
+        # Created owner-only: a chmod after bind would leave it open to others for a moment
+        old_umask = os.umask(0o077)
+        try:
+            self._server = await asyncio.start_unix_server(
+                self._handle_connection, path=str(self.socket_path)
+            )
+        finally:
+            os.umask(old_umask)
+        logger.info(f"Daemon listening on {self.socket_path}")
+
+    async def stop(self):
+        """Stop listening and close the browser."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._client:
+            await self._client.close()
+            self._client = None
+        self.socket_path.unlink(missing_ok=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+                result = await self._dispatch(request.get("command"), request.get("args") or {})
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                logger.error(f"Daemon command failed: {e}")
+                response = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _dispatch(self, command: str, args: dict) -> Any:
+        logger.info(f"Daemon command: {command}")
+        async with self._client_lock:
+            client = await self._get_client()
+
+        async with self._slots:
+            if command == "register_plan":
+                summary = await client.register_plan(**args)
+                return summary.model_dump(mode="json")
+            if command == "list":
+                sessions = await client.get_active_sessions()
+                return [s.model_dump(mode="json") for s in sessions]
+            if command == "stop":
+                return await client.stop_session(ParkingSession(**args["session"]))
+            if command == "balance":
+                balance = await client.get_balance()
+                return balance.model_dump(mode="json")
+            if command == "ping":
+                return "pong"
+
+        raise DaemonError(f"Unknown command: {command}")
+
+
+async def send_command(socket_path: Path, command: str, **args) -> Any:
+    """
+    Send a command to a running daemon and return its result.
+
+    Raises DaemonUnavailable when nothing is listening, DaemonError when the command failed.
+    """
+    try:
+        reader, writer = await asyncio.open_unix_connection(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError, OSError) as e:
+        raise DaemonUnavailable(str(e)) from e
+
+    try:
+        writer.write(json.dumps({"command": command, "args": args}).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+
+    if not line:
+        raise DaemonError("Daemon closed the connection without a response")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "unknown error"))
+    return response.get("result")
+
+
+async def is_running(socket_path: Path) -> bool:
+    """Check whether a daemon is answering on the socket."""
+    try:
+        return await send_command(socket_path, "ping") == "pong"
+    except (DaemonUnavailable, DaemonError):
+        return False
+
+
+async def run_daemon(config: Config):
+    """Run the daemon until SIGINT/SIGTERM."""
+    daemon = ParkeerDaemon(config)
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await daemon.start()
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("Shutting down daemon...")
+        await daemon.stop()
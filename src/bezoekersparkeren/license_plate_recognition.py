@@ -1,95 +1,393 @@
+"""
+License plate recognition from photos.
+
+Backends implement the Recognizer interface: OpenRouterRecognizer asks a
+remote vision model, LocalRecognizer reads clear yellow plates with Tesseract
+on the CPU. PlateRecognizer combines them according to
+recognition.strategy, e.g. "local_first" tries the local backend and only
+calls the API when it can't read the plate with confidence.
+"""
+
+import asyncio
 import base64
-import re
+from abc import ABC, abstractmethod
+import importlib.util
 import logging
+import time
 import httpx
-from typing import Optional
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
 
 from bezoekersparkeren.config import Config
+from bezoekersparkeren.utils.dutch_plates import is_dutch_plate, normalize_plate
+from bezoekersparkeren.utils.latency import LatencyHistogram
 
 logger = logging.getLogger(__name__)
 
-async def recognize_plate(image_bytes: bytes, config: Config) -> Optional[str]:
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+
+SYSTEM_PROMPT = (
+    "You are a License Plate Recognition system. Analyze the image. "
+    "Return ONLY the license plate string. Remove all spaces and dashes. Convert to UPPERCASE. "
+    "If no plate is clearly visible, return strictly the string 'NONE'. "
+    "Do not add markdown formatting, do not add explanations. Example output: 'AB123CD'."
+)
+
+# HTTP/2 needs the optional h2 package (pip install bezoekersparkeren[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def parse_plate(content: str) -> Optional[str]:
+    """Normalize the model's answer to a plate, None if it isn't one."""
+    content = content.strip()
+
+    # Basic validation
+    if content == "NONE":
+        return None
+
+    # Remove any Markdown code blocks if the model hallucinates them (despite prompt)
+    content = content.replace("```", "").strip()
+
+    # Validate format (Dutch plates are roughly 6 chars alnum, but let's be slightly flexible 6-8)
+    # Remove any dashes/spaces just in case model forgot
+    clean_plate = normalize_plate(content)
+
+    if not (6 <= len(clean_plate) <= 8):
+        logger.warning(f"Invalid plate length recognized: {clean_plate} (original: {content})")
+        return None
+
+    return clean_plate
+
+
+class Recognizer(ABC):
+    """Interface of the recognition backends."""
+
+    name = "recognizer"
+
+    @property
+    def available(self) -> bool:
+        """Whether the backend can be used (dependencies installed, API key set, ...)."""
+        return True
+
+    @abstractmethod
+    async def recognize(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> Optional[str]:
+        """The normalized plate on the image, None if none could be read."""
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+
+class OpenRouterRecognizer(Recognizer):
     """
-    Recognize license plate from image bytes using OpenRouter Vision API.
-    
-    Args:
-        image_bytes: Raw bytes of the image
-        config: Application configuration
-        
-    Returns:
-        Recognized license plate string (normalized) or None if failed/invalid
+    License plate recognition with the OpenRouter Vision API.
+
+    Owns one pooled httpx.AsyncClient (HTTP/2 when h2 is installed), so the
+    TCP and TLS handshakes to OpenRouter are paid once instead of per photo.
+    Pass `transport` to test without network.
     """
-    if not config.openrouter.api_key:
-        logger.error("No OpenRouter API key configured")
-        return None
 
-    # Encode image to base64
-    base64_image = base64.b64encode(image_bytes).decode('utf-8')
-    
-    headers = {
-        "Authorization": f"Bearer {config.openrouter.api_key}",
-        "Content-Type": "application/json",
-        "HTTP-Referer": "https://github.com/DanielTromp/bezoekersparkeren",
-        "X-Title": "Bezoekersparkeren Almere Bot"
-    }
-
-    payload = {
-        "model": config.openrouter.model,
-        "messages": [
-            {
-                "role": "system",
-                "content": "You are a License Plate Recognition system. Analyze the image. Return ONLY the license plate string. Remove all spaces and dashes. Convert to UPPERCASE. If no plate is clearly visible, return strictly the string 'NONE'. Do not add markdown formatting, do not add explanations. Example output: 'AB123CD'."
+    name = "remote"
+
+    def __init__(self, config: Config, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.config = config
+        settings = config.openrouter
+        self._http = httpx.AsyncClient(
+            base_url=OPENROUTER_URL,
+            transport=transport,
+            http2=settings.http2 and HTTP2_AVAILABLE,
+            timeout=settings.timeout,
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4,
+                                keepalive_expiry=120),
+            headers={
+                "HTTP-Referer": "https://github.com/DanielTromp/bezoekersparkeren",
+                "X-Title": "Bezoekersparkeren Almere Bot",
             },
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{base64_image}"
+        )
+        # Connection reuse: requests sent vs. new connections and TLS handshakes they needed
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        # Response times per model, they set the hedge delay
+        self.latency: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        # Hedge requests sent, and how often one of them gave the plate
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def available(self) -> bool:
+        return bool(self.config.openrouter.api_key)
+
+    async def close(self):
+        await self._http.aclose()
+
+    async def _trace(self, event: str, info: dict):
+        # httpcore reports these only when it has to open a new connection
+        if event == "connection.connect_tcp.complete":
+            self.connections += 1
+        elif event == "connection.start_tls.complete":
+            self.tls_handshakes += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "tls_handshakes": self.tls_handshakes,
+            "reused": max(0, self.requests - self.connections),
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait for `model` before asking the next one as well."""
+        settings = self.config.openrouter
+        histogram = self.latency[model]
+        if len(histogram) < settings.hedge_min_samples:
+            return settings.hedge_delay
+        return histogram.percentile(settings.hedge_percentile)
+
+    async def recognize(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> Optional[str]:
+        """
+        Recognize license plate from image bytes.
+
+        Asks openrouter.model first; each further model in openrouter.models is
+        asked as well when no Dutch-format plate has come back within the
+        hedge delay of the previous one (or right away when it failed). The
+        first Dutch-format plate wins and the other requests are cancelled.
+        Without one, the first other plate an answer contained is returned.
+
+        Args:
+            image_bytes: Raw bytes of the image
+            mime_type: Format of the image, see utils/image_prep.py
+
+        Returns:
+            Recognized license plate string (normalized) or None if failed/invalid
+        """
+        settings = self.config.openrouter
+        if not settings.api_key:
+            logger.error("No OpenRouter API key configured")
+            return None
+
+        # Encode image to base64
+        image_url = f"data:{mime_type};base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+        models = [settings.model] + [m for m in settings.models if m != settings.model]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.latency_budget
+        pending: Dict[asyncio.Task, str] = {}
+        asked: List[str] = []
+        fallback = None
+
+        def launch():
+            model = models[len(asked)]
+            asked.append(model)
+            if len(asked) > 1:
+                self.hedges += 1
+                logger.info(f"No plate from {asked[-2]} yet, also asking {model}")
+            pending[asyncio.create_task(self._ask(model, image_url))] = model
+            return loop.time() + self.hedge_delay(model)
+
+        hedge_at = launch()
+        try:
+            while pending:
+                now = loop.time()
+                if now >= deadline:
+                    logger.warning(f"No plate within the {settings.latency_budget}s latency budget")
+                    break
+                can_hedge = len(asked) < len(models)
+                wake = min(deadline, hedge_at) if can_hedge else deadline
+                done, _ = await asyncio.wait(pending, timeout=max(0.0, wake - now),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    model = pending.pop(task)
+                    plate = task.result()
+                    if plate and is_dutch_plate(plate):
+                        if model != models[0]:
+                            self.hedge_wins += 1
+                        return plate
+                    fallback = fallback or plate
+                # A failed or non-Dutch answer is a reason to hedge right away
+                if can_hedge and (done or loop.time() >= hedge_at):
+                    hedge_at = launch()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return fallback
+
+    async def _ask(self, model: str, image_url: str) -> Optional[str]:
+        """One chat completion with `model`; its latency goes into the model's histogram."""
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": image_url
+                            }
                         }
-                    }
-                ]
-            }
-        ]
-    }
-
-    try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json=payload
+                    ]
+                }
+            ]
+        }
+
+        started = time.monotonic()
+        try:
+            self.requests += 1
+            response = await self._http.post(
+                "/chat/completions",
+                headers={"Authorization": f"Bearer {self.config.openrouter.api_key}"},
+                json=payload,
+                extensions={"trace": self._trace},
             )
-            
+
             if response.status_code != 200:
-                logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
+                logger.error(
+                    f"OpenRouter API error ({model}): {response.status_code} - {response.text}"
+                )
                 return None
-                
+            # Cancelled (hedged) requests never get here, their latency is unknown
+            self.latency[model].add(time.monotonic() - started)
+
             data = response.json()
             if not data.get("choices"):
-                logger.error("No choices in OpenRouter response")
-                return None
-                
-            content = data["choices"][0]["message"]["content"].strip()
-            
-            # Basic validation
-            if content == "NONE":
+                logger.error(f"No choices in OpenRouter response ({model})")
                 return None
-                
-            # Remove any Markdown code blocks if the model hallucinates them (despite prompt)
-            content = content.replace("```", "").strip()
-            
-            # Validate format (Dutch plates are roughly 6 chars alnum, but let's be slightly flexible 6-8)
-            # Remove any dashes/spaces just in case model forgot
-            clean_plate = re.sub(r'[^A-Z0-9]', '', content.upper())
-            
-            if not (6 <= len(clean_plate) <= 8):
-                logger.warning(f"Invalid plate length recognized: {clean_plate} (original: {content})")
-                return None
-                
-            return clean_plate
 
-    except Exception as e:
-        logger.exception(f"Error calling OpenRouter API: {e}")
+            return parse_plate(data["choices"][0]["message"]["content"])
+
+        except httpx.TimeoutException:
+            self.latency[model].add(time.monotonic() - started)
+            logger.error(f"OpenRouter API timeout ({model})")
+            return None
+        except Exception as e:
+            logger.exception(f"Error calling OpenRouter API ({model}): {e}")
+            return None
+
+
+class LocalRecognizer(Recognizer):
+    """Offline recognition with Tesseract, see utils/plate_ocr.py. Only returns Dutch plates."""
+
+    name = "local"
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.attempts = 0
+        self.recognized = 0
+
+    @property
+    def available(self) -> bool:
+        from bezoekersparkeren.utils.plate_ocr import tesseract_available
+        return tesseract_available(self.config.recognition.tesseract_cmd)
+
+    async def recognize(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> Optional[str]:
+        from bezoekersparkeren.utils.plate_ocr import read_plate
+
+        settings = self.config.recognition
+        self.attempts += 1
+        try:
+            plate = await asyncio.to_thread(read_plate, image_bytes, settings.tesseract_cmd,
+                                            settings.local_timeout)
+        except Exception as e:
+            logger.warning(f"Local plate recognition failed: {e}")
+            return None
+        if plate:
+            self.recognized += 1
+        return plate
+
+    def stats(self) -> Dict[str, int]:
+        return {"attempts": self.attempts, "recognized": self.recognized}
+
+
+# Backends tried, in order, per recognition.strategy
+STRATEGIES = {
+    "remote": ["remote"],
+    "local": ["local"],
+    "local_first": ["local", "remote"],
+    "remote_first": ["remote", "local"],
+}
+
+
+class PlateRecognizer(Recognizer):
+    """
+    The recognizer the bot uses: tries the backends in the order of
+    recognition.strategy and returns the first plate found. Backends that
+    aren't available (no API key, Tesseract not installed) are skipped.
+
+    Create it once (the bot does so in ParkeerBot.start()) and `close()` it on
+    shutdown. Pass `transport` for the remote backend, or `backends` to
+    replace them, to test without network.
+    """
+
+    name = "strategy"
+
+    def __init__(self, config: Config, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 backends: Optional[Dict[str, Recognizer]] = None):
+        self.config = config
+        strategy = config.recognition.strategy
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown recognition strategy '{strategy}', use one of: {', '.join(STRATEGIES)}"
+            )
+        self.backends = backends if backends is not None else {
+            "remote": OpenRouterRecognizer(config, transport=transport),
+            "local": LocalRecognizer(config),
+        }
+        self.order: List[str] = [name for name in STRATEGIES[strategy] if name in self.backends]
+        # Which backend found the plate, or "none"
+        self.answers: Counter = Counter()
+
+    @property
+    def available(self) -> bool:
+        return any(self.backends[name].available for name in self.order)
+
+    async def recognize(self, image_bytes: bytes, mime_type: str = "image/jpeg") -> Optional[str]:
+        if not self.available:
+            logger.error(f"No plate recognition backend available ({', '.join(self.order)})")
+        for name in self.order:
+            backend = self.backends[name]
+            if not backend.available:
+                continue
+            plate = await backend.recognize(image_bytes, mime_type)
+            if plate:
+                self.answers[name] += 1
+                logger.info(f"Plate {plate} recognized by the {name} backend")
+                return plate
+        self.answers["none"] += 1
         return None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        stats = {name: backend.stats() for name, backend in self.backends.items()}
+        stats["answers"] = dict(self.answers)
+        return stats
+
+    async def close(self):
+        for backend in self.backends.values():
+            await backend.close()
+
+
+async def recognize_plate(image_bytes: bytes, config: Config,
+                          recognizer: Optional[Recognizer] = None,
+                          mime_type: str = "image/jpeg") -> Optional[str]:
+    """
+    Recognize license plate from image bytes, with the backends of recognition.strategy.
+
+    Uses `recognizer` and its pooled connections when given; otherwise a
+    one-off recognizer (and connection) is made for this photo.
+    """
+    if recognizer is not None:
+        return await recognizer.recognize(image_bytes, mime_type)
+    async with PlateRecognizer(config) as one_off:
+        return await one_off.recognize(image_bytes, mime_type)
@@ -2,8 +2,11 @@ import asyncio
 import click
 import logging
 import sys
+from pathlib import Path
 from .client import ParkeerClient
 from .config import Config
+from .daemon import DaemonError, DaemonUnavailable, send_command
+from .models import ParkingSession, Balance, RegistrationSummary
 
 # Helper for unified logging and console output
 def log_echo(message, nl=True):
@@ -46,11 +49,14 @@ def run_async(func):
 
 @click.group()
 @click.option('--visible', is_flag=True, help='Run browser in visible mode (not headless)')
+@click.option('--no-daemon', is_flag=True,
+              help='Do not use a running daemon, always start a browser')
 @click.pass_context
-def cli(ctx, visible):
+def cli(ctx, visible, no_daemon):
     """Bezoekersparkeren automation tool"""
     ctx.ensure_object(dict)
     ctx.obj['visible'] = visible
+    ctx.obj['no_daemon'] = no_daemon
     
     # Load config and setup logging early
     config = Config.load()
@@ -66,9 +72,44 @@ def get_client(ctx):
         config.browser.headless = False
     return ParkeerClient(config)
 
-from datetime import datetime, timedelta
+async def call_daemon(ctx, command, **args):
+    """
+    Run a command on the warm daemon if one is running.
+    Returns None when the command has to run in-process instead.
+    """
+    # A visible browser only makes sense in-process
+    if ctx.obj.get('visible') or ctx.obj.get('no_daemon'):
+        return None
+    config = Config.load()
+    if not config.daemon.enabled:
+        return None
+    try:
+        result = await send_command(Path(config.daemon.socket_path), command, **args)
+    except DaemonUnavailable:
+        return None
+    except DaemonError as e:
+        raise click.ClickException(f"Daemon: {e}")
+    logging.info(f"Command '{command}' handled by daemon")
+    return result
+
+from datetime import datetime
 from .utils.time_utils import TimeUtils
 
+def _print_plan(zone, plan):
+    """Print the registrations of a plan with their expected costs in `zone`."""
+    from .utils.cost import estimate_plan, format_euros, total
+
+    costs = estimate_plan(zone, plan) if zone else None
+    log_echo(f"{'START':<18} {'END':<18} {'COST':>10}")
+    log_echo("-" * 48)
+    for i, day in enumerate(plan):
+        cost = format_euros(costs[i]) if costs is not None else "?"
+        log_echo(f"{day['start_date'] + ' ' + day['start_time']:<18} "
+                 f"{day['end_date'] + ' ' + (day['end_time'] or '?'):<18} {cost:>10}")
+    if costs is not None:
+        log_echo(f"{len(plan)} registration(s) in {zone.name}, "
+                 f"expected costs {format_euros(total(costs))}")
+
 @cli.command()
 @click.option('--plate', required=True, help='License plate number')
 @click.option('--hours', type=int, help='Duration in hours')
@@ -78,41 +119,70 @@ from .utils.time_utils import TimeUtils
 @click.option('--date', help='Date to park (DD-MM-YYYY) or "tomorrow"')
 @click.option('--days', type=int, default=1, help='Number of consecutive days')
 @click.option('--start-time', help='Start time (HH:MM)')
+@click.option('--arrive',
+              help='Arrival (DD-MM-YYYY HH:MM): register only the paid periods of the visit')
+@click.option('--depart', help='Departure (DD-MM-YYYY HH:MM), used with --arrive')
+@click.option('--dry-run', is_flag=True,
+              help='Show the registrations and their costs without registering')
+@click.option('--zone', help='Zone code or name (default: the plate\'s zone, else the first zone)')
 @click.pass_context
-def register(ctx, plate, hours, minutes, until, all_day, date, days, start_time):
+def register(ctx, plate, hours, minutes, until, all_day, date, days, start_time,
+             arrive, depart, dry_run, zone):
     """Register a visitor with advanced scheduling"""
     async def _register():
-        async with get_client(ctx) as client:
-            if not await client.login():
-                log_echo("Login failed")
+        # Validate start date
+        if date and date.lower() != 'tomorrow':
+            try:
+                datetime.strptime(date, "%d-%m-%Y")
+            except ValueError:
+                log_echo("Invalid date format. Use DD-MM-YYYY")
                 return
 
-            # Determine start date
-            base_date = datetime.now()
-            if date:
-                if date.lower() == 'tomorrow':
-                    base_date = base_date + timedelta(days=1)
-                else:
-                    try:
-                        base_date = datetime.strptime(date, "%d-%m-%Y")
-                    except ValueError:
-                        log_echo("Invalid date format. Use DD-MM-YYYY")
-                        return
+        planner = get_client(ctx)
+        try:
+            visit_zone = planner.config.zone_for(plate, zone)
+        except ValueError as e:
+            log_echo(str(e))
+            return
+        if arrive or depart:
+            try:
+                visit = [datetime.strptime(value or "", "%d-%m-%Y %H:%M")
+                         for value in (arrive, depart)]
+            except ValueError:
+                log_echo("Use --arrive and --depart together, as DD-MM-YYYY HH:MM")
+                return
+            plan = planner.plan_visit(*visit, plate=plate, zone=zone)
+            if not plan:
+                log_echo("Nothing to register: the visit falls entirely in free hours")
+                return
+        else:
+            plan = planner.plan_days(days, date, start_time, all_day, plate=plate, zone=zone)
+
+        if dry_run:
+            _print_plan(visit_zone, plan)
+            return
 
-            # Use the new multi-day registration method
-            sessions = await client.register_multiple_days(
-                plate=plate,
-                days=days,
-                date=date,
-                start_time=start_time,
-                all_day=all_day
-            )
+        result = await call_daemon(ctx, "register_plan", plate=plate, plan=plan)
+        if result is not None:
+            summary = RegistrationSummary(**result)
+        else:
+            async with get_client(ctx) as client:
+                if not await client.login():
+                    log_echo("Login failed")
+                    return
+
+                # Registers the days in parallel where possible, failures are collected
+                summary = await client.register_plan(plate, plan)
             
-            from .utils.session_manager import SessionManager
-            manager = SessionManager()
-            for session in sessions:
-                manager.add_session(session)
-                log_echo(f"  Success: {session.plate} (ID: {session.id or '?'}) Gepland tot: {session.end_time.strftime('%d-%m %H:%M') if session.end_time else '?'}")
+        from .utils.session_store import AsyncSessionStore
+        async with AsyncSessionStore() as store:
+            await store.add_sessions(summary.sessions)
+        for session in summary.sessions:
+            until_str = session.end_time.strftime('%d-%m %H:%M') if session.end_time else '?'
+            log_echo(f"  Success: {session.plate} (ID: {session.id or '?'}) "
+                     f"Gepland tot: {until_str}")
+        for failure in summary.failures:
+            log_echo(f"  Failed: {failure.date}: {failure.error}")
 
     asyncio.run(_register())
 
@@ -122,27 +192,32 @@ def register(ctx, plate, hours, minutes, until, all_day, date, days, start_time)
 def stop(ctx, session_id):
     """Stop a parking session by ID"""
     
-    from .utils.session_manager import SessionManager
+    from .utils.session_store import AsyncSessionStore
     
     async def _stop():
-        # Load session from local state
-        manager = SessionManager()
-        session = manager.get_session(session_id)
-        
-        if not session:
-            log_echo(f"Session with ID {session_id} not found in local history. Run 'list' to refresh.")
-            return
+        async with AsyncSessionStore() as store:
+            # Load session from local state
+            session = await store.get_session(session_id)
+
+            if not session:
+                log_echo(f"Session with ID {session_id} not found in local history. "
+                         "Run 'list' to refresh.")
+                return
 
-        async with get_client(ctx) as client:
-            if await client.login():
-                if await client.stop_session(session):
-                    # Remove from local state
-                    manager.remove_session(session_id)
-                    log_echo(f"Stopped session {session_id} ({session.plate})")
-                else:
-                    log_echo(f"Failed to stop session {session_id}")
+            stopped = await call_daemon(ctx, "stop", session=session.model_dump(mode='json'))
+            if stopped is None:
+                async with get_client(ctx) as client:
+                    if not await client.login():
+                        log_echo("Login failed")
+                        return
+                    stopped = await client.stop_session(session)
+
+            if stopped:
+                # Keep it in the local history, for `cost`
+                await store.end_sessions([session])
+                log_echo(f"Stopped session {session_id} ({session.plate})")
             else:
-                log_echo("Login failed")
+                log_echo(f"Failed to stop session {session_id}")
 
     asyncio.run(_stop())
 
@@ -151,31 +226,35 @@ def stop(ctx, session_id):
 def list(ctx):
     """List active sessions"""
     async def _list():
-        from .utils.session_manager import SessionManager
+        from .utils.session_store import AsyncSessionStore
         
-        async with get_client(ctx) as client:
-            if await client.login():
-                sessions = await client.get_active_sessions()
-                
-                # Save to local state
-                manager = SessionManager()
-                manager.save_sessions(sessions)
-                
-                if not sessions:
-                    log_echo("No active sessions")
+        result = await call_daemon(ctx, "list")
+        if result is not None:
+            sessions = [ParkingSession(**s) for s in result]
+        else:
+            async with get_client(ctx) as client:
+                if not await client.login():
+                    log_echo("Login failed")
                     return
+                sessions = await client.get_active_sessions()
                 
-                # Print table
-                # Header
-                log_echo(f"{'ID':<10} {'PLATE':<10} {'START':<20} {'END':<20}")
-                log_echo("-" * 60)
-                
-                for s in sessions:
-                    start_str = s.start_time.strftime("%d-%m %H:%M") if s.start_time else "?"
-                    end_str = s.end_time.strftime("%d-%m %H:%M") if s.end_time else "?"
-                    log_echo(f"{s.id or '?':<10} {s.plate:<10} {start_str:<20} {end_str:<20}")
-            else:
-                log_echo("Login failed")
+        # Save to local state; ended sessions stay for `cost`
+        async with AsyncSessionStore() as store:
+            await store.sync_active(sessions)
+
+        if not sessions:
+            log_echo("No active sessions")
+            return
+
+        # Print table
+        # Header
+        log_echo(f"{'ID':<10} {'PLATE':<10} {'START':<20} {'END':<20}")
+        log_echo("-" * 60)
+
+        for s in sessions:
+            start_str = s.start_time.strftime("%d-%m %H:%M") if s.start_time else "?"
+            end_str = s.end_time.strftime("%d-%m %H:%M") if s.end_time else "?"
+            log_echo(f"{s.id or '?':<10} {s.plate:<10} {start_str:<20} {end_str:<20}")
 
     asyncio.run(_list())
 
@@ -184,15 +263,103 @@ def list(ctx):
 def balance(ctx):
     """Check balance"""
     async def _balance():
-        async with get_client(ctx) as client:
-            if await client.login():
+        result = await call_daemon(ctx, "balance")
+        if result is not None:
+            bal = Balance(**result)
+        else:
+            async with get_client(ctx) as client:
+                if not await client.login():
+                    log_echo("Login failed")
+                    return
                 bal = await client.get_balance()
-                log_echo(f"Balance: {bal.amount} {bal.currency}")
-            else:
-                log_echo("Login failed")
+        log_echo(f"Balance: {bal.amount} {bal.currency}")
 
     asyncio.run(_balance())
 
+@cli.command()
+@click.option('--since', help='Only stored sessions starting on or after this date (DD-MM-YYYY)')
+@click.option('--plate', help='Only this plate; for a preview: use the plate\'s zone')
+@click.option('--zone', help='Zone code or name (default: each plate\'s zone, else the first zone)')
+@click.option('--days', type=int, help='Preview a registration of this many days instead')
+@click.option('--date', help='First day of the preview (DD-MM-YYYY) or "tomorrow"')
+@click.option('--start-time', help='Start time of the preview (HH:MM)')
+@click.option('--until', help='End time of each previewed day (HH:MM), default: end of paid period')
+def cost(since, plate, zone, days, date, start_time, until):
+    """Expected parking charges of stored sessions, or of a planned registration"""
+    from .utils.cost import (
+        estimate_plan, estimate_sessions_by_zone, format_euros, total, unknown_count,
+    )
+
+    config = Config.load()
+    if not config.zones:
+        log_echo("No zones configured")
+        return
+    try:
+        preview_zone = config.zone_for(plate, zone)
+    except ValueError as e:
+        log_echo(str(e))
+        return
+
+    if days:
+        plan = TimeUtils.plan_days(preview_zone, days, date=date, start_time=start_time,
+                                   all_day=not until)
+        for day in plan:
+            day["end_time"] = until or day["end_time"]
+        costs = estimate_plan(preview_zone, plan)
+        log_echo(f"{'DATE':<12} {'START':<7} {'END':<7} {'COST':>10}")
+        log_echo("-" * 39)
+        for day, amount in zip(plan, costs):
+            end_str = day['end_time'] or '?'
+            log_echo(f"{day['start_date']:<12} {day['start_time']:<7} {end_str:<7} "
+                     f"{format_euros(amount):>10}")
+        label = f"Total ({preview_zone.name})"
+    else:
+        async def _load():
+            from .utils.session_store import AsyncSessionStore
+            async with AsyncSessionStore() as store:
+                return await store.load_sessions()
+
+        sessions = asyncio.run(_load())
+        if since:
+            try:
+                cutoff = datetime.strptime(since, "%d-%m-%Y")
+            except ValueError:
+                log_echo("Invalid date format. Use DD-MM-YYYY")
+                return
+            sessions = [s for s in sessions if s.start_time and s.start_time >= cutoff]
+        if plate:
+            sessions = [s for s in sessions if Config.plate_key(s.plate) == Config.plate_key(plate)]
+        if not sessions:
+            log_echo("No stored sessions")
+            return
+        try:
+            zones = [config.zone_for(s.plate, zone) for s in sessions]
+        except ValueError as e:
+            # E.g. a favorite whose zone was removed from config.yaml
+            log_echo(str(e))
+            return
+        costs = estimate_sessions_by_zone(sessions, zones)
+        log_echo(f"{'PLATE':<10} {'ZONE':<12} {'START':<12} {'END':<12} {'COST':>10}")
+        log_echo("-" * 60)
+        for s, z, amount in zip(sessions, zones, costs):
+            start_str = s.start_time.strftime("%d-%m %H:%M") if s.start_time else "?"
+            end_str = s.end_time.strftime("%d-%m %H:%M") if s.end_time else "?"
+            log_echo(f"{s.plate:<10} {z.name:<12} {start_str:<12} {end_str:<12} "
+                     f"{format_euros(amount):>10}")
+        label = "Total"
+
+    unknown = unknown_count(costs)
+    log_echo(f"{label}: {format_euros(total(costs))}"
+             + (f" ({unknown} without a known start or end left out)" if unknown else ""))
+
+@cli.command()
+def daemon():
+    """Keep a logged-in browser running to serve CLI commands quickly."""
+    from .daemon import run_daemon
+    config = Config.load()
+    log_echo(f"Starting daemon on {config.daemon.socket_path}")
+    asyncio.run(run_daemon(config))
+
 @cli.command()
 def bot():
     """Start de Telegram bot."""
@@ -1,9 +1,16 @@
-from pydantic import BaseModel
+import hashlib
+from pydantic import BaseModel, PrivateAttr
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 
 from typing import List
 
+def make_session_id(plate: str, start_time: Union[datetime, str]) -> str:
+    """Stable local session ID: hash of plate + start time (the portal shows no IDs)."""
+    start = start_time.isoformat() if isinstance(start_time, datetime) else start_time
+    id_base = f"{plate}-{start}"
+    return hashlib.md5(id_base.encode()).hexdigest()[:8]
+
 class ParkingSession(BaseModel):
     id: Optional[str] = None
     plate: str
@@ -11,6 +18,15 @@ class ParkingSession(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
 
+class DayFailure(BaseModel):
+    date: str # DD-MM-YYYY
+    error: str
+
+class RegistrationSummary(BaseModel):
+    """Outcome of a multi-day registration: registered sessions and failed days."""
+    sessions: List[ParkingSession] = []
+    failures: List[DayFailure] = []
+
 class ScheduleRule(BaseModel):
     # Days of week: 0=Mon, 6=Sun
     days: List[int] 
@@ -23,6 +39,8 @@ class Zone(BaseModel):
     rules: List[ScheduleRule]
     hourly_rate: float
     max_daily_rate: float
+    # Compiled WeeklySchedule (utils/schedule.py), built on first use
+    _schedule: Optional[tuple] = PrivateAttr(default=None)
 
 class Balance(BaseModel):
     amount: float
@@ -31,3 +49,5 @@ class Balance(BaseModel):
 class Favorite(BaseModel):
     plate: str
     name: Optional[str] = None
+    # Zone (code or name) this visitor parks in, if not the first configured zone
+    zone: Optional[str] = None
@@ -0,0 +1,110 @@
+"""
+Expected parking charges.
+
+A session is charged `hourly_rate` for every minute it overlaps the zone's paid
+hours, with at most `max_daily_rate` per calendar day. Sessions are processed as
+numpy arrays: each session is split into its calendar days, the paid minutes of
+every (session, day) piece come from the zone's WeeklySchedule, and the capped
+day charges are summed back per session.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from ..models import ParkingSession, Zone
+from .schedule import WeeklySchedule
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+def session_costs(zone: Zone, starts, ends) -> np.ndarray:
+    """
+    Charge in euros for each [start, end) pair (datetime64 arrays, minute resolution).
+    Pairs with a missing (NaT) start or end cost NaN.
+    """
+    starts = np.asarray(starts, dtype="datetime64[m]")
+    ends = np.asarray(ends, dtype="datetime64[m]")
+    costs = np.full(starts.shape, np.nan)
+    known = ~(np.isnat(starts) | np.isnat(ends))
+    if not known.any():
+        return costs
+    s, e = starts[known], ends[known]
+    e = np.maximum(e, s)
+
+    # One piece per calendar day a session touches
+    first_day = s.astype("datetime64[D]")
+    last_day = (e - np.timedelta64(1, "m")).astype("datetime64[D]")
+    n_days = np.maximum((last_day - first_day).astype(np.int64) + 1, 1)
+    session = np.repeat(np.arange(s.size), n_days)
+    day_offset = np.arange(n_days.sum()) - np.repeat(np.cumsum(n_days) - n_days, n_days)
+    day = first_day[session] + day_offset
+    piece_start = np.maximum(s[session], day.astype("datetime64[m]"))
+    piece_end = np.minimum(e[session], (day + ONE_DAY).astype("datetime64[m]"))
+
+    minutes = WeeklySchedule.for_zone(zone).paid_minutes_many(piece_start, piece_end)
+    day_costs = np.minimum(minutes * (zone.hourly_rate / 60), zone.max_daily_rate)
+    costs[known] = np.bincount(session, weights=day_costs, minlength=s.size)
+    return costs
+
+
+def _datetime64(values: Iterable[Optional[datetime]]) -> np.ndarray:
+    # None becomes NaT
+    return np.array(list(values), dtype="datetime64[m]")
+
+
+def estimate_sessions(zone: Zone, sessions: Sequence[ParkingSession]) -> np.ndarray:
+    """Charge per session; NaN for sessions without a start or end time."""
+    return session_costs(
+        zone, _datetime64(s.start_time for s in sessions), _datetime64(s.end_time for s in sessions)
+    )
+
+
+def estimate_sessions_by_zone(
+    sessions: Sequence[ParkingSession], zones: Sequence[Optional[Zone]]
+) -> np.ndarray:
+    """Charge per session, each in its own zone (NaN where the zone is None)."""
+    groups: Dict[int, List[int]] = {}
+    by_id: Dict[int, Zone] = {}
+    for i, zone in enumerate(zones):
+        if zone is not None:
+            groups.setdefault(id(zone), []).append(i)
+            by_id[id(zone)] = zone
+    costs = np.full(len(sessions), np.nan)
+    # One batch per zone
+    for key, indexes in groups.items():
+        costs[indexes] = estimate_sessions(by_id[key], [sessions[i] for i in indexes])
+    return costs
+
+
+def estimate_plan(zone: Zone, plan: Sequence[dict]) -> np.ndarray:
+    """Charge per planned registration (the dicts of ParkeerClient.plan_days())."""
+
+    def parse(date: Optional[str], hhmm: Optional[str]) -> Optional[datetime]:
+        if not date or not hhmm:
+            return None
+        return datetime.strptime(f"{date} {hhmm}", "%d-%m-%Y %H:%M")
+
+    return session_costs(
+        zone,
+        _datetime64(parse(d["start_date"], d["start_time"]) for d in plan),
+        _datetime64(parse(d["end_date"], d["end_time"]) for d in plan),
+    )
+
+
+def format_euros(amount: float) -> str:
+    """€ 1,25 style, '?' when unknown."""
+    if np.isnan(amount):
+        return "?"
+    return f"€ {amount:.2f}".replace(".", ",")
+
+
+def total(costs: np.ndarray) -> float:
+    """Sum of the known charges."""
+    return float(np.nansum(costs))
+
+
+def unknown_count(costs: np.ndarray) -> int:
+    """Number of charges that couldn't be worked out."""
+    return int(np.isnan(costs).sum())
@@ -0,0 +1,51 @@
+"""
+Dutch license plate formats.
+
+Dutch plates follow one of a fixed set of "sidecodes": groups of letters (L) and
+digits (D), e.g. sidecode 4 is LL-DD-LL (AB-12-CD). Checking a recognized string
+against them catches most misreads that a plain length check lets through.
+"""
+
+import re
+from typing import Optional
+
+SIDECODES = {
+    1: "LLDDDD",
+    2: "DDDDLL",
+    3: "DDLLDD",
+    4: "LLDDLL",
+    5: "LLLLDD",
+    6: "DDLLLL",
+    7: "DDLLLD",
+    8: "DLLLDD",
+    9: "LLDDDL",
+    10: "LDDDLL",
+    11: "LLLDDL",
+    12: "LDDLLL",
+    13: "DLLDDD",
+    14: "DDDLLD",
+}
+
+# Only the shape is checked, not which letters a series actually uses
+_PATTERNS = {
+    code: re.compile("".join("[A-Z]" if c == "L" else "[0-9]" for c in shape))
+    for code, shape in SIDECODES.items()
+}
+
+
+def normalize_plate(text: str) -> str:
+    """Uppercase, without dashes, spaces or anything else that isn't a letter or digit."""
+    return re.sub(r"[^A-Z0-9]", "", text.upper())
+
+
+def sidecode(plate: str) -> Optional[int]:
+    """The sidecode `plate` matches, None if it isn't a Dutch plate."""
+    plate = normalize_plate(plate)
+    for code, pattern in _PATTERNS.items():
+        if pattern.fullmatch(plate):
+            return code
+    return None
+
+
+def is_dutch_plate(plate: str) -> bool:
+    return sidecode(plate) is not None
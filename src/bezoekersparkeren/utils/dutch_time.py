@@ -0,0 +1,98 @@
+"""
+Parser for the Dutch timestamps the portal shows on the dashboard.
+
+    "Eindtijd morgen 22:00"        -> tomorrow 22:00
+    "Start tijd vandaag 09:00"     -> today 09:00
+    "Start tijd 18 dec. 14:30"     -> 18 December 14:30 (next year when it's January in December)
+
+One compiled regex finds the date and time tokens; results are cached per
+(text, today). Texts that can't be parsed are counted in `parse_stats()`
+instead of silently becoming "now".
+"""
+
+import logging
+import re
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MONTHS = {
+    "jan": 1,
+    "feb": 2,
+    "mrt": 3,
+    "apr": 4,
+    "mei": 5,
+    "jun": 6,
+    "jul": 7,
+    "aug": 8,
+    "sep": 9,
+    "okt": 10,
+    "nov": 11,
+    "dec": 12,
+}
+
+_TOKENS = re.compile(
+    r"(?P<relative>morgen|vandaag)"
+    r"|(?P<day>\d{1,2})\s+(?P<month>" + "|".join(MONTHS) + r")"
+    r"|(?P<hour>\d{1,2}):(?P<minute>\d{2})"
+)
+
+# Outcome counters: "ok", "empty", "no_time", "invalid"
+_stats: Counter = Counter()
+
+
+@lru_cache(maxsize=1024)
+def _parse(text: str, today: date) -> Tuple[Optional[datetime], str]:
+    target_date = today
+    relative = day = clock = None
+    for match in _TOKENS.finditer(text.lower()):
+        if match["relative"]:
+            # "morgen" wins over "vandaag", wherever it appears
+            if relative != "morgen":
+                relative = match["relative"]
+        elif match["month"]:
+            if day is None:
+                day = (int(match["day"]), MONTHS[match["month"]])
+        elif clock is None:
+            clock = (int(match["hour"]), int(match["minute"]))
+
+    if clock is None:
+        return None, "no_time"
+
+    try:
+        if relative == "morgen":
+            target_date = today + timedelta(days=1)
+        elif relative is None and day is not None:
+            day_of_month, month = day
+            # A January date seen in December is next year's
+            year = today.year + 1 if today.month == 12 and month == 1 else today.year
+            target_date = date(year, month, day_of_month)
+        return datetime.combine(target_date, time(*clock)), "ok"
+    except ValueError:
+        return None, "invalid"
+
+
+def parse_portal_time(text: Optional[str], today: Optional[date] = None) -> Optional[datetime]:
+    """Parse a dashboard time text; None (and a counted failure) if it has no valid time."""
+    if not text:
+        _stats["empty"] += 1
+        return None
+    result, outcome = _parse(text, today or date.today())
+    _stats[outcome] += 1
+    if result is None:
+        logger.warning(f"Could not parse portal time {text!r} ({outcome})")
+    return result
+
+
+def parse_stats() -> Dict[str, int]:
+    """Counts of parse outcomes since start (or the last reset), plus cache hits."""
+    info = _parse.cache_info()
+    return {**_stats, "cache_hits": info.hits, "cache_misses": info.misses}
+
+
+def reset_parse_stats():
+    _stats.clear()
+    _parse.cache_clear()
@@ -0,0 +1,140 @@
+"""
+Photo preprocessing before plate recognition.
+
+Phones send photos of several megabytes, while the vision model reads a plate
+just as well from a downscaled JPEG of a fraction of that. This module picks the
+smallest Telegram PhotoSize that is still sharp enough, downscales and
+re-encodes it to a byte budget and can crop it to the (yellow, Dutch) plate.
+
+Pillow is optional (pip install bezoekersparkeren[vision]); without it photos
+are sent as they are. The image work is CPU bound, so use
+`prepare_image_async()` from the event loop.
+"""
+
+import asyncio
+import importlib.util
+import io
+import logging
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PIL_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+# Side of the thumbnail the plate is searched in
+_DETECT_SIDE = 320
+
+
+def pick_photo(photos: Sequence, min_side: int):
+    """
+    The smallest PhotoSize (anything with width and height) whose short side is
+    at least `min_side`; the largest one if none is.
+    """
+    if not photos:
+        return None
+    by_size = sorted(photos, key=lambda p: p.width * p.height)
+    for photo in by_size:
+        if min(photo.width, photo.height) >= min_side:
+            return photo
+    return by_size[-1]
+
+
+def find_plate(image) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Box (left, top, right, bottom) around a yellow Dutch plate in a Pillow image,
+    or None when there's no plausible one.
+    """
+    small = image.copy()
+    small.thumbnail((_DETECT_SIDE, _DETECT_SIDE))
+    hsv = np.asarray(small.convert("HSV"), dtype=np.int16)
+    hue, saturation, value = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    # Plate yellow is around 50 degrees, Pillow scales hue to 0-255
+    mask = (hue >= 25) & (hue <= 45) & (saturation >= 110) & (value >= 110)
+    if mask.sum() < 0.003 * mask.size:
+        return None
+
+    def densest_run(counts: np.ndarray) -> Tuple[int, int]:
+        # Longest stretch of rows/columns with a good share of yellow pixels
+        dense = counts >= 0.3 * counts.max()
+        best, start = (0, 0), None
+        for i, flag in enumerate(np.append(dense, False)):
+            if flag and start is None:
+                start = i
+            elif not flag and start is not None:
+                if i - start > best[1] - best[0]:
+                    best = (start, i)
+                start = None
+        return best
+
+    top, bottom = densest_run(mask.sum(axis=1))
+    left, right = densest_run(mask[top:bottom].sum(axis=0))
+    width, height = right - left, bottom - top
+    if height == 0 or not 2 <= width / height <= 7:
+        return None
+
+    # Some margin, in full resolution coordinates
+    scale = image.width / small.width
+    pad_x, pad_y = width * 0.15, height * 0.4
+    return (
+        max(0, int((left - pad_x) * scale)),
+        max(0, int((top - pad_y) * scale)),
+        min(image.width, int((right + pad_x) * scale)),
+        min(image.height, int((bottom + pad_y) * scale)),
+    )
+
+
+def prepare_image(
+    data: bytes,
+    max_side: int = 1024,
+    max_bytes: int = 150_000,
+    image_format: str = "jpeg",
+    quality: int = 85,
+    crop_plate: bool = False,
+) -> Tuple[bytes, str]:
+    """
+    Downscale and re-encode a photo to at most `max_bytes`.
+    Returns (image bytes, MIME type); the original when Pillow is missing or the
+    image can't be read.
+    """
+    if not PIL_AVAILABLE:
+        return data, "image/jpeg"
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        # JPEG can decode at 1/2, 1/4 or 1/8 scale right away, much cheaper than a full decode
+        image.draft("RGB", (max_side * 2, max_side * 2))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    except Exception as e:
+        logger.warning(f"Could not read photo, sending it as is: {e}")
+        return data, "image/jpeg"
+
+    if crop_plate:
+        box = find_plate(image)
+        if box:
+            logger.debug(f"Cropped photo to plate at {box}")
+            image = image.crop(box)
+
+    image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    # Lower the quality, then the size, until it fits the budget
+    fmt = "webp" if image_format.lower() == "webp" else "jpeg"
+    while True:
+        # The requested quality first, even when it's already below the floor of 40
+        for q in [quality, *range(quality - 15, 39, -15)]:
+            out = io.BytesIO()
+            image.save(out, format=fmt.upper(), quality=q, optimize=fmt == "jpeg")
+            if out.tell() <= max_bytes:
+                return out.getvalue(), MIME_TYPES[fmt]
+        if max(image.size) <= 256:
+            return out.getvalue(), MIME_TYPES[fmt]
+        image = image.resize((image.width * 3 // 4, image.height * 3 // 4), Image.LANCZOS)
+
+
+async def prepare_image_async(data: bytes, **options) -> Tuple[bytes, str]:
+    """prepare_image() on a worker thread."""
+    return await asyncio.to_thread(prepare_image, data, **options)
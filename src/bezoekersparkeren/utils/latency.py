@@ -0,0 +1,36 @@
+"""
+Latency histogram with fixed, geometrically spaced buckets.
+
+Cheap to update and to query for a percentile, and it follows the recent
+behaviour of an API: once `max_count` samples are in, all counts are halved.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# 0.1s .. ~31s, each bucket 20% wider than the previous one
+BOUNDS = 0.1 * 1.2 ** np.arange(32)
+
+
+class LatencyHistogram:
+    def __init__(self, max_count: int = 1000):
+        self.max_count = max_count
+        # One bucket per bound plus one for anything slower than the last bound
+        self.counts = np.zeros(len(BOUNDS) + 1, dtype=np.float64)
+
+    def __len__(self):
+        return int(round(self.counts.sum()))
+
+    def add(self, seconds: float):
+        self.counts[np.searchsorted(BOUNDS, seconds)] += 1
+        if self.counts.sum() > self.max_count:
+            self.counts /= 2
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound of the bucket holding the p-th percentile, None without samples."""
+        total = self.counts.sum()
+        if total == 0:
+            return None
+        index = int(np.searchsorted(np.cumsum(self.counts), total * p / 100))
+        return float(BOUNDS[min(index, len(BOUNDS) - 1)])
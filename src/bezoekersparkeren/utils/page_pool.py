@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from playwright.async_api import BrowserContext, Page
+
+from .resource_blocker import ResourceBlocker
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledPage:
+    """A browser context + page pair with its own login state."""
+
+    context: BrowserContext
+    page: Page
+    logged_in: bool = False
+    # Page started from saved cookies that still have to be verified
+    state_restored: bool = False
+    blocker: Optional[ResourceBlocker] = None
+    pool: Optional["PagePool"] = field(default=None, repr=False)
+
+
+class PagePool:
+    """
+    Fixed-size pool of browser pages with checkout/checkin semantics.
+
+    Pages are created lazily through `factory` up to `size`; when all of them are
+    checked out, callers wait until one is returned.
+    """
+
+    def __init__(self, size: int, factory: Callable[[], Awaitable[PooledPage]]):
+        self.size = max(1, size)
+        self._factory = factory
+        self._idle: asyncio.Queue[PooledPage] = asyncio.Queue()
+        self._slots: List[PooledPage] = []
+        self._create_lock = asyncio.Lock()
+
+    def add(self, slot: PooledPage):
+        """Register an existing page (e.g. the client's primary page) as an idle slot."""
+        slot.pool = self
+        self._slots.append(slot)
+        self._idle.put_nowait(slot)
+
+    @property
+    def in_use(self) -> int:
+        return len(self._slots) - self._idle.qsize()
+
+    async def _acquire(self) -> PooledPage:
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        async with self._create_lock:
+            if len(self._slots) < self.size:
+                slot = await self._factory()
+                slot.pool = self
+                self._slots.append(slot)
+                logger.info(f"Opened pooled page {len(self._slots)}/{self.size}")
+                return slot
+
+        return await self._idle.get()
+
+    async def _release(self, slot: PooledPage):
+        if slot.page.is_closed():
+            # Don't hand out dead pages, a new one is created on demand
+            logger.warning("Dropping closed page from pool")
+            self._slots.remove(slot)
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled context: {e}")
+            return
+        self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def checkout(self):
+        """Borrow a page for the duration of the `async with` block."""
+        slot = await self._acquire()
+        try:
+            yield slot
+        finally:
+            await self._release(slot)
+
+    async def close(self):
+        """Close every context owned by the pool."""
+        for slot in self._slots:
+            try:
+                await slot.context.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled context: {e}")
+        self._slots = []
+        self._idle = asyncio.Queue()
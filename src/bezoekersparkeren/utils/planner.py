@@ -0,0 +1,80 @@
+"""
+Registration planner for a visit.
+
+Instead of registering every calendar day from the zone's start time until the
+end of the day, only the paid periods that overlap the visit are registered.
+Consecutive periods are merged into one registration (free time in between costs
+nothing) as long as the result stays within the longest registration the portal
+accepts, so a visit needs as few slow registration flows as possible.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from ..models import Zone
+from .schedule import WeeklySchedule
+
+Interval = Tuple[datetime, datetime]
+
+
+def paid_intervals(zone: Zone, arrive: datetime, depart: datetime) -> List[Interval]:
+    """The parts of [arrive, depart) that fall in the zone's paid hours, in order."""
+    schedule = WeeklySchedule.for_zone(zone)
+    intervals: List[Interval] = []
+    t = arrive
+    while t < depart:
+        start = t if schedule.is_paid(t) else schedule.next_paid_start(t)
+        if start is None or start >= depart:
+            break
+        end = schedule.paid_period_end(start)
+        if end is None:
+            # Paid around the clock
+            end = depart
+        if end <= start:
+            # The inclusive end instant of a period (e.g. exactly 22:00), nothing to pay
+            t = start + timedelta(minutes=1)
+            continue
+        intervals.append((start, min(end, depart)))
+        t = end
+    return intervals
+
+
+def merge_intervals(
+    intervals: List[Interval], max_span: Optional[timedelta] = None
+) -> List[Interval]:
+    """Merge consecutive intervals while the merged one spans at most `max_span`."""
+    merged: List[Interval] = []
+    for start, end in intervals:
+        if merged and (max_span is None or end - merged[-1][0] <= max_span):
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def to_registration(start: datetime, end: datetime) -> dict:
+    """register_visitor() arguments for [start, end)."""
+    if end.time() == datetime.min.time() and end > start:
+        # Midnight is 24:00 of the previous day, which the portal doesn't accept
+        end -= timedelta(minutes=1)
+    return dict(
+        start_date=start.strftime("%d-%m-%Y"),
+        start_time=start.strftime("%H:%M"),
+        end_date=end.strftime("%d-%m-%Y"),
+        end_time=end.strftime("%H:%M"),
+    )
+
+
+def plan_visit(
+    zone: Zone,
+    arrive: datetime,
+    depart: datetime,
+    max_span: Optional[timedelta] = timedelta(hours=24),
+) -> List[dict]:
+    """
+    The fewest registrations that cover every paid minute of a visit from
+    `arrive` to `depart`, as register_visitor() arguments. Empty when the whole
+    visit falls in free hours.
+    """
+    intervals = merge_intervals(paid_intervals(zone, arrive, depart), max_span)
+    return [to_registration(start, end) for start, end in intervals]
@@ -0,0 +1,93 @@
+"""
+Local, CPU-only plate reading with Tesseract.
+
+Finds the yellow plate on the photo (see image_prep.find_plate), binarizes the
+crop and reads it as a single line of capitals and digits. Only results that
+match a Dutch sidecode are returned, so anything unclear is left to the remote
+vision model. Needs Pillow, pytesseract and the tesseract binary
+(pip install bezoekersparkeren[ocr], apt install tesseract-ocr).
+"""
+
+import importlib.util
+import io
+import logging
+import shutil
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from .dutch_plates import is_dutch_plate, normalize_plate
+from .image_prep import PIL_AVAILABLE, find_plate
+
+logger = logging.getLogger(__name__)
+
+PYTESSERACT_AVAILABLE = importlib.util.find_spec("pytesseract") is not None
+
+# One line of text, plate characters only
+TESSERACT_CONFIG = "--psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+# Height the plate crop is scaled to; Tesseract likes characters of 30+ pixels
+_PLATE_HEIGHT = 100
+
+
+@lru_cache(maxsize=None)
+def tesseract_available(tesseract_cmd: Optional[str] = None) -> bool:
+    """Whether Pillow, pytesseract and the binary are there; looked up once per command."""
+    return (
+        PIL_AVAILABLE
+        and PYTESSERACT_AVAILABLE
+        and shutil.which(tesseract_cmd or "tesseract") is not None
+    )
+
+
+def _binarize(gray: np.ndarray) -> np.ndarray:
+    """Black characters on white, with Otsu's threshold."""
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight = np.cumsum(histogram)
+    mean = np.cumsum(histogram * levels)
+    total_weight, total_mean = weight[-1], mean[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (total_mean * weight - mean * total_weight) ** 2 / (
+            weight * (total_weight - weight)
+        )
+    threshold = int(np.nanargmax(between))
+    return np.where(gray > threshold, 255, 0).astype(np.uint8)
+
+
+def read_plate(
+    data: bytes, tesseract_cmd: Optional[str] = None, timeout: float = 2.0
+) -> Optional[str]:
+    """The Dutch plate on the photo, None when there is none or it can't be read with confidence."""
+    from PIL import Image, ImageOps
+    import pytesseract
+
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", (2048, 2048))
+    image = ImageOps.exif_transpose(image).convert("RGB")
+    box = find_plate(image)
+    if box is None:
+        logger.debug("No yellow plate found")
+        return None
+
+    crop = ImageOps.grayscale(image.crop(box))
+    crop = crop.resize(
+        (max(1, crop.width * _PLATE_HEIGHT // crop.height), _PLATE_HEIGHT), Image.LANCZOS
+    )
+    binary = Image.fromarray(_binarize(np.asarray(ImageOps.autocontrast(crop))))
+
+    text = pytesseract.image_to_string(binary, config=TESSERACT_CONFIG, timeout=timeout)
+    candidate = normalize_plate(text)
+    if is_dutch_plate(candidate):
+        return candidate
+    # The blue strip on the left is often read as "NL" ("NLAB12" is a valid sidecode itself)
+    if len(candidate) == 8 and candidate.startswith("NL") and is_dutch_plate(candidate[2:]):
+        return candidate[2:]
+    # Anything else (stray characters from screws, the frame, stickers) is not a confident
+    # read: picking a plate-shaped part of it would skip the remote model on a guess
+    logger.debug(f"Local OCR read {text!r}, not a Dutch plate")
+    return None
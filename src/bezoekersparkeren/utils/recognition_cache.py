@@ -0,0 +1,219 @@
+"""
+Cache of recognized plates, so a photo that was seen before costs no vision call.
+
+Entries are found by Telegram's `file_unique_id` (the same photo sent again or
+forwarded, found before anything is downloaded) or by a 128-bit difference hash
+(dHash) of the plate on the photo (the same plate sent as a new file, found
+after the download but before the API call). Only the plate is hashed: two
+photos of the same driveway with different cars must not match. The cache
+keeps at most `max_entries` entries, evicting the least recently used, and
+entries expire after `ttl` seconds. With a `path` it is kept in a small JSON
+file, written by save() or, from the event loop, save_async().
+"""
+
+import asyncio
+import io
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .image_prep import PIL_AVAILABLE, find_plate
+
+logger = logging.getLogger(__name__)
+
+# dHash grid: 16x8 bits, enough to tell plates apart that differ in one character
+_HASH_SIZE = (17, 8)
+
+
+def image_hash(data: bytes) -> Optional[int]:
+    """
+    128-bit dHash of the plate on a photo; None without Pillow, for unreadable
+    data or when no plate is found.
+    """
+    if not PIL_AVAILABLE:
+        return None
+    from PIL import Image, ImageOps
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("RGB", (1024, 1024))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        box = find_plate(image)
+        if box is None:
+            return None
+        plate = image.crop(box).convert("L")
+        pixels = np.asarray(plate.resize(_HASH_SIZE, Image.LANCZOS), dtype=np.int16)
+    except Exception as e:
+        logger.debug(f"Could not hash image: {e}")
+        return None
+    # One bit per pixel: brighter than its right neighbour
+    bits = (pixels[:, :-1] > pixels[:, 1:]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+@dataclass
+class _Entry:
+    plate: str
+    stored_at: float
+    image_hash: Optional[int] = None
+    file_ids: List[str] = field(default_factory=list)
+
+
+class RecognitionCache:
+    """LRU + TTL cache of plates by file_unique_id and image hash; see the module docstring."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 7 * 86400,
+        path: Optional[Path] = None,
+        max_distance: int = 1,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        # Hashes at most this many bits apart count as the same image
+        self.max_distance = max_distance
+        self._clock = clock
+        # One file write at a time (save_async() runs in a thread)
+        self._save_lock = asyncio.Lock()
+        # Least recently used first
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_file: Dict[str, int] = {}
+        self._next_key = 0
+        self.hits = {"file": 0, "hash": 0}
+        # Photos found by neither (counted at the hash lookup, the last one)
+        self.misses = 0
+        if self.path and self.path.exists():
+            self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _fresh(self, key: int) -> Optional[_Entry]:
+        entry = self._entries[key]
+        if entry.stored_at + self.ttl <= self._clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: int):
+        entry = self._entries.pop(key)
+        for file_id in entry.file_ids:
+            self._by_file.pop(file_id, None)
+
+    def get_by_file(self, file_ids: Iterable[str]) -> Optional[str]:
+        """Plate for any of these Telegram file_unique_ids."""
+        for file_id in file_ids:
+            key = self._by_file.get(file_id)
+            if key is not None:
+                entry = self._fresh(key)
+                if entry:
+                    self.hits["file"] += 1
+                    return entry.plate
+        return None
+
+    def get_by_hash(self, image_hash: Optional[int]) -> Optional[str]:
+        """Plate for the most similar cached image, if it's similar enough."""
+        if image_hash is None:
+            self.misses += 1
+            return None
+        best, best_distance = None, self.max_distance + 1
+        for key, entry in self._entries.items():
+            if entry.image_hash is not None:
+                distance = (entry.image_hash ^ image_hash).bit_count()
+                if distance < best_distance:
+                    best, best_distance = key, distance
+        entry = self._fresh(best) if best is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits["hash"] += 1
+        return entry.plate
+
+    def put(self, plate: str, file_ids: Iterable[str] = (), image_hash: Optional[int] = None):
+        """Remember a plate; in memory only, see save()."""
+        self._insert(_Entry(plate, self._clock(), image_hash, [f for f in file_ids if f]))
+
+    def _insert(self, entry: _Entry):
+        for file_id in entry.file_ids:
+            # A file belongs to one entry
+            old = self._by_file.get(file_id)
+            if old is not None:
+                self._remove(old)
+        key = self._next_key
+        self._next_key += 1
+        self._entries[key] = entry
+        for file_id in entry.file_ids:
+            self._by_file[file_id] = key
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "file_hits": self.hits["file"],
+            "hash_hits": self.hits["hash"],
+            "misses": self.misses,
+        }
+
+    # --- Persistence ---
+
+    def _load(self):
+        try:
+            data = json.loads(self.path.read_text())
+            for item in data:
+                self._insert(
+                    _Entry(
+                        item["plate"],
+                        item["stored_at"],
+                        item.get("image_hash"),
+                        item.get("file_ids", []),
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"Could not read recognition cache {self.path}: {e}")
+        # Drop what expired while we were away
+        for key in list(self._entries):
+            self._fresh(key)
+
+    def _snapshot(self) -> List[dict]:
+        return [
+            {
+                "plate": e.plate,
+                "stored_at": e.stored_at,
+                "image_hash": e.image_hash,
+                "file_ids": list(e.file_ids),
+            }
+            for e in self._entries.values()
+        ]
+
+    def save(self):
+        """Write the cache to `path` (if set)."""
+        if self.path:
+            self._write(self._snapshot())
+
+    async def save_async(self):
+        """save() without blocking the event loop: entries are copied here, written in a thread."""
+        if not self.path:
+            return
+        data = self._snapshot()
+        async with self._save_lock:
+            await asyncio.to_thread(self._write, data)
+
+    def _write(self, data: List[dict]):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            tmp.write_text(json.dumps(data))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write recognition cache {self.path}: {e}")
@@ -0,0 +1,96 @@
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import BrowserContext, Page, Request, Route
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class NavigationStats:
+    """Network usage of a single page navigation."""
+
+    url: str = ""
+    requests: int = 0
+    blocked: int = 0
+    bytes: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.url or '?'}: {self.requests} requests, "
+            f"{self.bytes / 1024:.0f} kB, {self.blocked} blocked"
+        )
+
+
+class ResourceBlocker:
+    """
+    Aborts requests the portal automation doesn't need (images, fonts, media, trackers)
+    and keeps per-navigation request/byte counts.
+
+    URLs containing one of `allowed_urls` are never blocked, so scripts the SPA depends
+    on can be whitelisted if a blocked domain turns out to be required.
+    """
+
+    def __init__(
+        self, blocked_types: List[str], blocked_domains: List[str], allowed_urls: List[str]
+    ):
+        self.blocked_types = set(blocked_types)
+        self.blocked_domains = [d.lower() for d in blocked_domains]
+        self.allowed_urls = allowed_urls
+        self.current = NavigationStats()
+        self.last: Optional[NavigationStats] = None
+
+    @classmethod
+    def from_config(cls, browser_config) -> Optional["ResourceBlocker"]:
+        if not browser_config.block_resources:
+            return None
+        return cls(
+            browser_config.blocked_resource_types,
+            browser_config.blocked_domains,
+            browser_config.allowed_urls,
+        )
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if any(pattern in url for pattern in self.allowed_urls):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+    async def attach(self, context: BrowserContext, page: Page):
+        """Install the route handler on the context and the statistics listeners on the page."""
+        await context.route("**/*", self._handle_route)
+        page.on("requestfinished", self._on_request_finished)
+        page.on("framenavigated", lambda frame: self._on_navigated(page, frame))
+
+    async def _handle_route(self, route: Route):
+        request = route.request
+        if self.should_block(request.url, request.resource_type):
+            self.current.blocked += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _on_request_finished(self, request: Request):
+        self.current.requests += 1
+        try:
+            sizes = await request.sizes()
+            self.current.bytes += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            # Page or request already gone
+            pass
+
+    def report(self):
+        """Log the statistics of the navigation in progress."""
+        if self.current.url:
+            logger.info(f"Navigation stats {self.current}")
+
+    def _on_navigated(self, page: Page, frame):
+        if frame != page.main_frame:
+            return
+        self.report()
+        self.last = self.current
+        self.current = NavigationStats(url=frame.url)
@@ -0,0 +1,194 @@
+"""
+Minute-resolution weekly index of a zone's paid parking hours.
+
+A zone's `ScheduleRule`s are compiled once into 10080 slots (one per minute,
+Monday 00:00 = slot 0) plus a few derived arrays, so "is it paid at t", "when
+does the next paid period start" and "when does this paid period end" are
+array lookups instead of rule scans and strptime calls. The `*_many` variants
+take numpy datetime64 arrays (second resolution).
+
+Like TimeUtils, the end of a rule is inclusive: with 09:00-22:00, 22:00:00
+itself still counts as paid. "24:00" runs until 23:59:59.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from ..models import ScheduleRule, Zone
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# 1970-01-01, where datetime64 counts from, was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _next_index(positions: np.ndarray, slots: np.ndarray, side: str) -> np.ndarray:
+    """For each slot, the first position at/after it (side="left") or after it ("right"), or -1."""
+    if positions.size == 0:
+        return np.full(slots.shape, -1, dtype=np.int64)
+    # Positions are repeated one week later so the lookup wraps around Sunday night
+    doubled = np.concatenate([positions, positions + MINUTES_PER_WEEK])
+    return doubled[np.searchsorted(doubled, slots, side=side)]
+
+
+class WeeklySchedule:
+    def __init__(self, rules: Sequence[ScheduleRule]):
+        # Like TimeUtils.get_rule_for_day: the first rule that lists a day applies
+        self.rule_for_day: List[Optional[ScheduleRule]] = [None] * 7
+        for rule in rules:
+            for day in rule.days:
+                if 0 <= day < 7 and self.rule_for_day[day] is None:
+                    self.rule_for_day[day] = rule
+
+        # Paid window per weekday in seconds of the day (inclusive); -1/-2 when free all day
+        self.start_seconds = np.full(7, -1, dtype=np.int64)
+        self.end_seconds = np.full(7, -2, dtype=np.int64)
+        # End of the paid window in minutes of the day, 24:00 = 1440
+        self.end_minutes = np.full(7, -1, dtype=np.int64)
+
+        self.paid = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+        for day, rule in enumerate(self.rule_for_day):
+            if rule is None:
+                continue
+            start, end = _minutes(rule.start_time), _minutes(rule.end_time)
+            self.start_seconds[day] = start * 60
+            self.end_seconds[day] = 86399 if rule.end_time == "24:00" else end * 60
+            self.end_minutes[day] = end
+            self.paid[day * MINUTES_PER_DAY + start : day * MINUTES_PER_DAY + end] = True
+
+        # Plain lists for the single-timestamp queries, numpy scalars are slow to index
+        self._start_list = self.start_seconds.tolist()
+        self._end_list = self.end_seconds.tolist()
+
+        # Paid minutes before each slot, for O(1) "paid minutes between a and b"
+        self.cumulative = np.concatenate([[0], np.cumsum(self.paid, dtype=np.int64)])
+
+        slots = np.arange(MINUTES_PER_WEEK)
+        previous = np.roll(self.paid, 1)
+        starts = np.flatnonzero(self.paid & ~previous)
+        ends = np.flatnonzero(~self.paid & previous)
+        # Minutes from each slot to the next period start / the end of the period it is in
+        next_start = _next_index(starts, slots, "left")
+        self.to_next_start = np.where(next_start >= 0, next_start - slots, -1)
+        next_end = _next_index(ends, slots, "right")
+        self.to_period_end = np.where(self.paid & (next_end >= 0), next_end - slots, -1)
+
+    @classmethod
+    def for_zone(cls, zone: Zone) -> "WeeklySchedule":
+        """The compiled schedule of `zone`, cached on the zone until its rules are replaced."""
+        # Private attributes live in this dict; zone._schedule goes through a slow __getattr__
+        private = zone.__pydantic_private__
+        cached = private.get("_schedule")
+        rules = zone.rules
+        if (
+            cached is None
+            or len(cached[0]) != len(rules)
+            or any(a is not b for a, b in zip(cached[0], rules))
+        ):
+            cached = (tuple(rules), cls(rules))
+            private["_schedule"] = cached
+        return cached[1]
+
+    # --- Single timestamps ---
+
+    @staticmethod
+    def slot(dt: datetime) -> int:
+        """Minute of the week, Monday 00:00 = 0."""
+        return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+    def is_paid(self, dt: datetime) -> bool:
+        day = dt.weekday()
+        seconds = dt.hour * 3600 + dt.minute * 60 + dt.second + dt.microsecond / 1e6
+        return self._start_list[day] <= seconds <= self._end_list[day]
+
+    def next_paid_start(self, dt: datetime) -> Optional[datetime]:
+        """Start of the first paid period beginning at or after `dt` (None if nothing is paid)."""
+        start = dt.replace(second=0, microsecond=0)
+        if start < dt:
+            start += timedelta(minutes=1)
+        offset = self.to_next_start[self.slot(start)]
+        return None if offset < 0 else start + timedelta(minutes=int(offset))
+
+    def paid_period_end(self, dt: datetime) -> Optional[datetime]:
+        """End of the paid period `dt` falls in, or None when parking is free at `dt`."""
+        if not self.is_paid(dt):
+            return None
+        minute = dt.replace(second=0, microsecond=0)
+        offset = self.to_period_end[self.slot(minute)]
+        if offset < 0:
+            # The inclusive end instant itself (e.g. exactly 22:00), or paid around the clock
+            return minute if not self.paid[self.slot(minute)] else None
+        return minute + timedelta(minutes=int(offset))
+
+    def paid_minutes_between(self, start: datetime, end: datetime) -> int:
+        """Paid minutes in [start, end), at minute resolution."""
+        return int(
+            self.paid_minutes_many(
+                np.array([start], dtype="datetime64[m]"), np.array([end], dtype="datetime64[m]")
+            )[0]
+        )
+
+    def end_of_day_minutes(self, dt: datetime) -> Optional[int]:
+        """Minute of the day the paid window of `dt`'s weekday ends (1440 for 24:00)."""
+        end = self.end_minutes[dt.weekday()]
+        return None if end < 0 else int(end)
+
+    # --- Arrays of timestamps ---
+
+    @staticmethod
+    def slots_many(times) -> np.ndarray:
+        minutes = np.asarray(times, dtype="datetime64[m]").astype(np.int64)
+        return (minutes + _EPOCH_WEEKDAY * MINUTES_PER_DAY) % MINUTES_PER_WEEK
+
+    def is_paid_many(self, times) -> np.ndarray:
+        seconds = np.asarray(times, dtype="datetime64[s]").astype(np.int64)
+        days, second_of_day = np.divmod(seconds, 86400)
+        weekday = (days + _EPOCH_WEEKDAY) % 7
+        return (self.start_seconds[weekday] <= second_of_day) & (
+            second_of_day <= self.end_seconds[weekday]
+        )
+
+    def next_paid_start_many(self, times) -> np.ndarray:
+        """Vectorized next_paid_start(); NaT where nothing is ever paid."""
+        seconds = np.asarray(times, dtype="datetime64[s]")
+        minutes = (seconds + np.timedelta64(59, "s")).astype("datetime64[m]")  # round up
+        offset = self.to_next_start[self.slots_many(minutes)]
+        result = minutes + offset.astype("timedelta64[m]")
+        return np.where(offset >= 0, result, np.datetime64("NaT"))
+
+    def paid_period_end_many(self, times) -> np.ndarray:
+        """Vectorized paid_period_end(); NaT where parking is free."""
+        minutes = np.asarray(times, dtype="datetime64[s]").astype("datetime64[m]")
+        slots = self.slots_many(minutes)
+        offset = self.to_period_end[slots]
+        # The inclusive end instant (paid, but the slot itself isn't) ends right there
+        offset = np.where((offset < 0) & ~self.paid[slots], 0, offset)
+        result = minutes + offset.astype("timedelta64[m]")
+        return np.where(self.is_paid_many(times) & (offset >= 0), result, np.datetime64("NaT"))
+
+    def paid_minutes_many(self, starts, ends) -> np.ndarray:
+        """Paid minutes in each [start, end) pair, at minute resolution."""
+        start = (
+            np.asarray(starts, dtype="datetime64[m]").astype(np.int64)
+            + _EPOCH_WEEKDAY * MINUTES_PER_DAY
+        )
+        end = (
+            np.asarray(ends, dtype="datetime64[m]").astype(np.int64)
+            + _EPOCH_WEEKDAY * MINUTES_PER_DAY
+        )
+        end = np.maximum(end, start)
+        per_week = int(self.cumulative[-1])
+
+        def before(minute):
+            # Paid minutes from the epoch's Monday up to `minute`
+            weeks, slot = np.divmod(minute, MINUTES_PER_WEEK)
+            return weeks * per_week + self.cumulative[slot]
+
+        return before(end) - before(start)
@@ -0,0 +1,178 @@
+"""
+Extraction of the session rows from the dashboard HTML.
+
+Every backend returns the same row dicts as the in-page extraction script in
+client.py: {"plate": ..., "start": ..., "end": ...} with the raw text of the
+cells, in DOM order. Turning that text into datetimes is left to the caller.
+
+Backends, fastest first: selectolax, lxml and BeautifulSoup's pure-Python
+html.parser. The optional ones are used automatically when installed
+(`pip install bezoekersparkeren[fast]`).
+"""
+
+import logging
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Optional[str]]
+
+
+def _join(parts, separator: str) -> str:
+    """Strip the text nodes and join the non-empty ones, like get_text(sep, strip=True)."""
+    return separator.join(p for p in (t.strip() for t in parts) if p)
+
+
+# --- html.parser (BeautifulSoup) ---
+
+
+def _rows_bs4(html: str) -> List[Row]:
+    soup = BeautifulSoup(html, "html.parser")
+    container = soup.find(id="parkActions")
+    if not container:
+        return []
+
+    rows = []
+    for item in container.find_all("div", class_="park-item-desktop"):
+        plate = item.find("span", class_="plate")
+        # Start time seems to be in a sibling div in some views
+        start = item.find("div", class_="start-time") or item.find_next_sibling(
+            "div", class_="start-time"
+        )
+        end = item.find("div", class_="end-time")
+        rows.append(
+            {
+                "plate": plate.get_text(strip=True) if plate else None,
+                "start": start.get_text(" ", strip=True) if start else None,
+                "end": end.get_text(" ", strip=True) if end else None,
+            }
+        )
+    return rows
+
+
+# --- lxml ---
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _rows_lxml(html: str) -> List[Row]:
+    import lxml.html
+
+    if not html.strip():
+        return []
+    tree = lxml.html.document_fromstring(html)
+    containers = tree.xpath('//*[@id="parkActions"]')
+    if not containers:
+        return []
+
+    def first(node, xpath):
+        found = node.xpath(xpath)
+        return found[0] if found else None
+
+    def text(node, separator):
+        return _join(node.xpath(".//text()"), separator) if node is not None else None
+
+    rows = []
+    for item in containers[0].xpath(f".//div[{_has_class('park-item-desktop')}]"):
+        start = first(item, f".//div[{_has_class('start-time')}]")
+        if start is None:
+            # Walk the siblings in Python, a following-sibling:: query rescans the list per row
+            start = next((s for s in item.itersiblings("div") if "start-time" in s.classes), None)
+        rows.append(
+            {
+                "plate": text(first(item, f".//span[{_has_class('plate')}]"), ""),
+                "start": text(start, " "),
+                "end": text(first(item, f".//div[{_has_class('end-time')}]"), " "),
+            }
+        )
+    return rows
+
+
+# --- selectolax ---
+
+
+def _rows_selectolax(html: str) -> List[Row]:
+    from selectolax.lexbor import LexborHTMLParser
+
+    container = LexborHTMLParser(html).css_first("#parkActions")
+    if container is None:
+        return []
+
+    def text(node, separator):
+        if node is None:
+            return None
+        return _join(
+            (n.text_content or "" for n in node.traverse(include_text=True) if n.tag == "-text"),
+            separator,
+        )
+
+    def next_start_time(node):
+        sibling = node.next
+        while sibling is not None:
+            if (
+                sibling.tag == "div"
+                and "start-time" in (sibling.attributes.get("class") or "").split()
+            ):
+                return sibling
+            sibling = sibling.next
+        return None
+
+    rows = []
+    for item in container.css("div.park-item-desktop"):
+        start = item.css_first("div.start-time")
+        if start is None:
+            start = next_start_time(item)
+        rows.append(
+            {
+                "plate": text(item.css_first("span.plate"), ""),
+                "start": text(start, " "),
+                "end": text(item.css_first("div.end-time"), " "),
+            }
+        )
+    return rows
+
+
+BACKENDS: Dict[str, Callable[[str], List[Row]]] = {
+    "selectolax": _rows_selectolax,
+    "lxml": _rows_lxml,
+    "html.parser": _rows_bs4,
+}
+
+
+def available_backends() -> List[str]:
+    """Installed backends, fastest first."""
+    available = []
+    for name in BACKENDS:
+        try:
+            if name == "selectolax":
+                import selectolax.lexbor  # noqa: F401
+            elif name == "lxml":
+                import lxml.html  # noqa: F401
+        except ImportError:
+            continue
+        available.append(name)
+    return available
+
+
+_best: Optional[str] = None
+
+
+def best_backend() -> str:
+    global _best
+    if _best is None:
+        _best = available_backends()[0]
+        logger.debug(f"Using HTML parser backend: {_best}")
+    return _best
+
+
+def parse_session_rows(html: str, backend: Optional[str] = None) -> List[Row]:
+    """Extract the session rows from dashboard HTML; `backend` None or "auto" picks the fastest."""
+    if backend in (None, "auto"):
+        backend = best_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    return BACKENDS[backend](html)
@@ -1,92 +1,196 @@
 import json
 import logging
-from pathlib import Path
-from typing import List, Optional
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
 
 from ..models import ParkingSession
 
 logger = logging.getLogger(__name__)
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    plate TEXT NOT NULL,
+    active INTEGER NOT NULL,
+    start_time TEXT,
+    end_time TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_plate ON sessions (plate);
+CREATE INDEX IF NOT EXISTS idx_sessions_end_time ON sessions (end_time);
+"""
+
+UPSERT = """
+INSERT INTO sessions (id, plate, active, start_time, end_time) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    plate = excluded.plate, active = excluded.active,
+    start_time = excluded.start_time, end_time = excluded.end_time
+"""
+
+# PRAGMA user_version once sessions.json has been imported
+MIGRATED_VERSION = 1
+
+
+def _iso(dt: Optional[datetime]) -> Optional[str]:
+    return dt.isoformat() if isinstance(dt, datetime) else None
+
+
+def default_storage_path() -> Path:
+    return Path(os.environ.get("PARKEER_SESSIONS_DB", "sessions.db"))
+
+
+def default_legacy_path(storage_path: Path) -> Path:
+    """The sessions.json to import: PARKEER_SESSIONS_JSON, else next to the database."""
+    return Path(os.environ.get("PARKEER_SESSIONS_JSON") or storage_path.with_name("sessions.json"))
+
+
 class SessionManager:
-    def __init__(self, storage_path: Path = None):
-        self.storage_path = storage_path or Path("sessions.json")
-        
-    def save_sessions(self, sessions: List[ParkingSession]):
-        """Save sessions to JSON file"""
-        try:
-            data = [session.model_dump() for session in sessions]
-            # Handle datetime JSON serialization if needed, but model_dump with mode='json' (pydantic v2) or manual
-            # For pydantic v2, model_dump(mode='json') works best.
-            # Assuming pydantic v2 based on requirements (>=2.0.0)
-            
-            with open(self.storage_path, 'w') as f:
-                # We can't dump directly if they contain datetimes that aren't serializable
-                # Pydantic v2 helper
-                import json
-                
-                # Custom serializer
-                def json_serial(obj):
-                    if isinstance(obj, datetime):
-                        return obj.isoformat()
-                    raise TypeError(f"Type {type(obj)} not serializable")
-                    
-                json.dump(data, f, default=json_serial, indent=2)
-                
-            logger.debug(f"Saved {len(sessions)} sessions to {self.storage_path}")
-        except Exception as e:
-            logger.error(f"Failed to save sessions: {e}")
+    """
+    Local record of registered sessions, stored in SQLite (WAL mode).
 
-    def load_sessions(self) -> List[ParkingSession]:
-        """Load sessions from JSON file"""
-        if not self.storage_path.exists():
-            return []
-            
-        try:
-            with open(self.storage_path, 'r') as f:
-                data = json.load(f)
-                
-            sessions = []
-            for item in data:
+    Every call is its own transaction, so the bot and CLI can use the same database
+    at the same time. A sessions.json next to the database (the old storage) is
+    imported once, the first time the database is opened; set PARKEER_SESSIONS_JSON
+    when it lives elsewhere (e.g. the old Docker mount).
+    """
+
+    def __init__(self, storage_path: Path = None, legacy_json_path: Path = None):
+        self.storage_path = Path(storage_path or default_storage_path())
+        if self.storage_path.suffix == ".json":
+            # Callers that still pass the old JSON location
+            legacy_json_path = legacy_json_path or self.storage_path
+            self.storage_path = self.storage_path.with_suffix(".db")
+        self.legacy_json_path = Path(legacy_json_path or default_legacy_path(self.storage_path))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.storage_path, timeout=10, isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate_json()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """BEGIN IMMEDIATE ... COMMIT, or ROLLBACK on error; serialized within the process."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _row(session: ParkingSession) -> tuple:
+        return (session.id, session.plate, int(session.active),
+                _iso(session.start_time), _iso(session.end_time))
+
+    @staticmethod
+    def _session(row: sqlite3.Row) -> ParkingSession:
+        return ParkingSession(id=row["id"], plate=row["plate"], active=bool(row["active"]),
+                              start_time=row["start_time"], end_time=row["end_time"])
+
+    def _migrate_json(self):
+        """Import sessions.json into an empty database (once)."""
+        with self._transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATED_VERSION:
+                return
+            imported = 0
+            # is_file(): Docker creates a directory for a bind-mounted file that doesn't exist
+            if self.legacy_json_path.is_file():
                 try:
-                    # Pydantic parses ISO strings back to datetime automatically
-                    sessions.append(ParkingSession(**item))
+                    with open(self.legacy_json_path) as f:
+                        data = json.load(f)
                 except Exception as e:
-                    logger.warning(f"Skipping invalid session in local storage: {e}")
-                    
-            return sessions
-        except Exception as e:
-            logger.error(f"Failed to load sessions: {e}")
-            return []
-            
+                    logger.error(f"Failed to read {self.legacy_json_path} for migration: {e}")
+                    data = []
+                sessions = []
+                for item in data:
+                    try:
+                        sessions.append(ParkingSession(**item))
+                    except Exception as e:
+                        logger.warning(f"Skipping invalid session in local storage: {e}")
+                conn.executemany(UPSERT, [self._row(s) for s in sessions])
+                imported = len(sessions)
+            conn.execute(f"PRAGMA user_version = {MIGRATED_VERSION}")
+        if imported:
+            logger.info(f"Migrated {imported} sessions from {self.legacy_json_path} "
+                        f"to {self.storage_path}")
+
+    def save_sessions(self, sessions: List[ParkingSession]):
+        """Replace all stored sessions"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sessions")
+            conn.executemany(UPSERT, [self._row(s) for s in sessions])
+        logger.debug(f"Saved {len(sessions)} sessions to {self.storage_path}")
+
+    def sync_active(self, sessions: List[ParkingSession]):
+        """
+        Store the portal's current list of active sessions: listed ones are added or
+        updated, stored ones that are no longer listed are kept (for `cost`) but
+        marked inactive.
+        """
+        with self._transaction() as conn:
+            conn.executemany(UPSERT, [self._row(s) for s in sessions])
+            listed = [s.id for s in sessions if s.id is not None]
+            placeholders = ", ".join("?" * len(listed))
+            conn.execute(
+                f"UPDATE sessions SET active = 0 WHERE active = 1 AND id NOT IN ({placeholders})",
+                listed,
+            )
+
+    def load_sessions(self) -> List[ParkingSession]:
+        """Load all stored sessions, in the order they were added"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM sessions ORDER BY rowid").fetchall()
+        return [self._session(row) for row in rows]
+
     def get_session(self, session_id: str) -> Optional[ParkingSession]:
         """Get a specific session by ID"""
-        sessions = self.load_sessions()
-        for session in sessions:
-            if session.id == session_id:
-                return session
-        return None
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM sessions WHERE id = ?",
+                                     (session_id,)).fetchone()
+        return self._session(row) if row else None
+
+    def get_sessions_for_plate(self, plate: str) -> List[ParkingSession]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM sessions WHERE plate = ? ORDER BY rowid",
+                                      (plate,)).fetchall()
+        return [self._session(row) for row in rows]
 
     def add_session(self, session: ParkingSession):
-        """Add a single session to storage"""
-        sessions = self.load_sessions()
-        # Check if already exists? (by ID)
-        # If ID is None (fresh register), we might need to generate one or wait for list refresh.
-        # But user wants update. 
-        # If register returns a session without ID, we should probably generate one same way list does.
-        
-        # If ID exists, update it?
-        existing_idx = next((i for i, s in enumerate(sessions) if s.id == session.id), -1)
-        
-        if existing_idx >= 0:
-            sessions[existing_idx] = session
-        else:
-            sessions.append(session)
-            
-        self.save_sessions(sessions)
+        """Add a single session to storage (replaces one with the same ID)"""
+        self.add_sessions([session])
+
+    def add_sessions(self, sessions: Iterable[ParkingSession]):
+        """Add several sessions in one transaction"""
+        with self._transaction() as conn:
+            conn.executemany(UPSERT, [self._row(s) for s in sessions])
 
     def remove_session(self, session_id: str):
         """Remove a session from storage"""
-        sessions = self.load_sessions()
-        sessions = [s for s in sessions if s.id != session_id]
-        self.save_sessions(sessions)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def apply_changes(self, upserts: Iterable[ParkingSession], removals: Iterable[str]):
+        """Add and remove sessions in one transaction"""
+        with self._transaction() as conn:
+            conn.executemany(UPSERT, [self._row(s) for s in upserts])
+            conn.executemany("DELETE FROM sessions WHERE id = ?", [(i,) for i in removals])
+
+    def remove_ended(self, before: Optional[datetime] = None) -> int:
+        """Remove sessions that ended before `before` (default: now). Returns the number removed."""
+        cutoff = (before or datetime.now()).isoformat()
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM sessions WHERE end_time < ?", (cutoff,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..models import ParkingSession
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSessionStore:
+    """
+    Async front for SessionManager that never blocks the event loop.
+
+    All disk work runs on one dedicated I/O thread. By default (flush_delay 0)
+    every add or remove is committed before the call returns, which is what the
+    CLI uses: a registration the portal has charged must not be lost when the
+    process is killed right after.
+
+    The bot, a long-running process, passes a flush_delay for write-behind: adds
+    and removes are collected for that many seconds and committed together in
+    one SQLite transaction, so a burst of add_session() calls costs one write.
+    Changes still pending are lost if the process dies before the flush. Reads
+    see pending changes. Call `close()` (or use `async with`) to flush on shutdown.
+    """
+
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        flush_delay: float = 0.0,
+        manager_factory: Callable[..., SessionManager] = SessionManager,
+    ):
+        self.flush_delay = flush_delay
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-store")
+        self._manager_factory = lambda: manager_factory(storage_path)
+        self._manager: Optional[SessionManager] = None
+        # Session ID -> session to upsert, or None to delete
+        self._pending: Dict[str, Optional[ParkingSession]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self.flushes = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _manager_sync(self) -> SessionManager:
+        # Only called on the I/O thread
+        if self._manager is None:
+            self._manager = self._manager_factory()
+        return self._manager
+
+    async def _run(self, method: str, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: getattr(self._manager_sync(), method)(*args)
+        )
+
+    async def _written(self):
+        """Commit the pending changes now, or schedule it (write-behind)."""
+        if self.flush_delay <= 0:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        # Changes made during a flush find this task still running, so pick them up here
+        while True:
+            await asyncio.sleep(self.flush_delay)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write sessions: {e}")
+                return
+            if not self._pending:
+                return
+
+    @staticmethod
+    def _key(session: ParkingSession) -> str:
+        # Sessions without an ID can't be replaced or removed, keep each one
+        return session.id if session.id is not None else f"<no id {id(session)}>"
+
+    # --- Writes (behind) ---
+
+    async def add_session(self, session: ParkingSession):
+        await self.add_sessions([session])
+
+    async def add_sessions(self, sessions: Iterable[ParkingSession]):
+        for session in sessions:
+            self._pending[self._key(session)] = session
+        await self._written()
+
+    async def end_sessions(self, sessions: Iterable[ParkingSession], at: Optional[datetime] = None):
+        """Mark stopped sessions inactive, ending at `at` (default: now); kept for `cost`."""
+        at = at or datetime.now()
+        ended = []
+        for session in sessions:
+            end = min(session.end_time, at) if session.end_time else at
+            if session.start_time and end < session.start_time:
+                # Stopped before it started: nothing was parked
+                end = session.start_time
+            ended.append(session.model_copy(update={"active": False, "end_time": end}))
+        await self.add_sessions(ended)
+
+    async def remove_session(self, session_id: str):
+        self._pending[session_id] = None
+        await self._written()
+
+    async def save_sessions(self, sessions: List[ParkingSession]):
+        """Replace all stored sessions (written right away)."""
+        async with self._flush_lock:
+            self._pending.clear()
+            await self._run("save_sessions", sessions)
+
+    async def sync_active(self, sessions: List[ParkingSession]):
+        """The portal's list of active sessions, see SessionManager.sync_active(); written now."""
+        # Pending adds first, so they can be marked inactive too
+        await self.flush()
+        async with self._flush_lock:
+            await self._run("sync_active", sessions)
+
+    async def flush(self):
+        """Write all pending changes in one transaction."""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            upserts = [s for s in pending.values() if s is not None]
+            removals = [key for key, s in pending.items() if s is None]
+            try:
+                await self._run("apply_changes", upserts, removals)
+            except BaseException:
+                # Keep them for the next flush, without overwriting newer changes
+                self._pending = {**pending, **self._pending}
+                raise
+            self.flushes += 1
+            logger.debug(f"Flushed {len(upserts)} added and {len(removals)} removed sessions")
+
+    # --- Reads ---
+
+    async def get_session(self, session_id: str) -> Optional[ParkingSession]:
+        if session_id in self._pending:
+            return self._pending[session_id]
+        return await self._run("get_session", session_id)
+
+    async def load_sessions(self) -> List[ParkingSession]:
+        await self.flush()
+        return await self._run("load_sessions")
+
+    async def close(self):
+        """Flush pending changes and stop the I/O thread."""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        try:
+            await self.flush()
+        finally:
+            if self._manager is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self._manager.close
+                )
+                self._manager = None
+            self._executor.shutdown(wait=True)
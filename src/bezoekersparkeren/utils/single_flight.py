@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls of the same operation.
+
+    The first caller of `do(key, ...)` runs the operation; callers arriving while it is
+    in flight wait for that result (or exception) instead of running it again. The
+    operation runs in the first caller's own task, so it keeps that caller's context
+    (e.g. the checked out page). If that caller is cancelled, a waiting caller takes over.
+
+    Callers pass the `generation` of the data they need (e.g. TTLCache.generation): a
+    call started before a write must not answer a caller that arrives after it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self.calls: Counter = Counter()
+        self.coalesced: Counter = Counter()
+
+    async def do(
+        self, key: str, operation: Callable[[], Awaitable[Any]], generation: Hashable = None
+    ) -> Any:
+        self.calls[key] += 1
+        flight = (key, generation)
+        while flight in self._inflight:
+            future = self._inflight[flight]
+            self.coalesced[key] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # we were cancelled ourselves
+                # The leading caller was cancelled, try again
+                self.coalesced[key] -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight] = future
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Nobody may be waiting; don't let asyncio log it as unretrieved
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[flight]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            key: {"calls": self.calls[key], "coalesced": self.coalesced[key]}
+            for key in sorted(self.calls)
+        }
@@ -0,0 +1,91 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+logger = logging.getLogger(__name__)
+
+
+class StorageStateCache:
+    """
+    Encrypted on-disk cache for the Playwright storage state (cookies + localStorage).
+
+    One file per municipality/account combination, so switching accounts never
+    restores someone else's session. The file is encrypted with a key derived from
+    PARKEER_STATE_KEY or, when that is not set, from the account credentials.
+    """
+
+    def __init__(self, directory: Path, municipality: str, email: str, secret: str):
+        self.directory = Path(directory)
+        self.key_id = hashlib.sha256(f"{municipality}:{email}".encode()).hexdigest()[:16]
+        self.path = self.directory / f"{self.key_id}.state"
+        self._secret = secret
+        self._fernet: Optional[Fernet] = None
+
+    @classmethod
+    def from_config(cls, config) -> Optional["StorageStateCache"]:
+        """Build a cache for the configured account, or None if caching is disabled."""
+        state_dir = config.browser.storage_state_dir
+        if not state_dir or not config.credentials:
+            return None
+        secret = (
+            os.environ.get("PARKEER_STATE_KEY")
+            or f"{config.credentials.email}:{config.credentials.password}"
+        )
+        return cls(Path(state_dir), config.municipality, config.credentials.email, secret)
+
+    def _get_fernet(self) -> Fernet:
+        # Key derivation is deliberately slow-ish, so only do it when we touch the file
+        if self._fernet is None:
+            key = hashlib.scrypt(
+                self._secret.encode(),
+                salt=f"bezoekersparkeren:{self.key_id}".encode(),
+                n=2**14,
+                r=8,
+                p=1,
+                dklen=32,
+            )
+            self._fernet = Fernet(base64.urlsafe_b64encode(key))
+        return self._fernet
+
+    def load(self) -> Optional[dict]:
+        """Load and decrypt the cached storage state. Returns None if missing or unreadable."""
+        if not self.path.exists():
+            return None
+        try:
+            token = self.path.read_bytes()
+            state = json.loads(self._get_fernet().decrypt(token))
+            logger.debug(f"Loaded cached browser state from {self.path}")
+            return state
+        except InvalidToken:
+            # Credentials or key changed, the old state is useless
+            logger.warning("Cached browser state could not be decrypted, discarding it")
+            self.clear()
+        except Exception as e:
+            logger.warning(f"Failed to load cached browser state: {e}")
+        return None
+
+    def save(self, state: dict):
+        """Encrypt and atomically write the storage state."""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            token = self._get_fernet().encrypt(json.dumps(state).encode())
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                f.write(token)
+            os.replace(tmp_path, self.path)
+            logger.debug(f"Saved browser state to {self.path}")
+        except Exception as e:
+            logger.warning(f"Failed to save browser state: {e}")
+
+    def clear(self):
+        """Remove the cached state (e.g. after the portal rejected it)."""
+        try:
+            self.path.unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"Failed to remove cached browser state: {e}")
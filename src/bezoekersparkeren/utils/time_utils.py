@@ -1,8 +1,11 @@
-from datetime import datetime, timedelta, time
-from typing import Optional, Tuple
+from datetime import datetime, time, timedelta
+from typing import List, Optional
 from ..models import Zone, ScheduleRule
+from .schedule import MINUTES_PER_DAY, WeeklySchedule
 
 class TimeUtils:
+    """Schedule helpers; the lookups use the zone's compiled WeeklySchedule."""
+
     @staticmethod
     def parse_time(time_str: str) -> time:
         """Parse HH:MM string to time object. Handles '24:00' as special case."""
@@ -13,11 +16,7 @@ class TimeUtils:
     @staticmethod
     def get_rule_for_day(zone: Zone, date: datetime) -> Optional[ScheduleRule]:
         """Get the schedule rule for a specific date (day of week)."""
-        day_of_week = date.weekday() # 0=Mon, 6=Sun
-        for rule in zone.rules:
-            if day_of_week in rule.days:
-                return rule
-        return None
+        return WeeklySchedule.for_zone(zone).rule_for_day[date.weekday()]
 
     @staticmethod
     def get_end_time_for_all_day(zone: Zone, date: datetime, offset_minutes: int = 0) -> str:
@@ -27,47 +26,70 @@ class TimeUtils:
         Special case: 24:00 becomes 23:59 to avoid invalid time errors.
         Returns HH:MM string.
         """
-        rule = TimeUtils.get_rule_for_day(zone, date)
-        if not rule:
-            # If no rule (free parking?), maybe just return end of day or current time?
-            # User implies paid parking times. If outside, maybe error or default.
+        end = WeeklySchedule.for_zone(zone).end_of_day_minutes(date)
+        if end is None:
+            # No rule (free parking), park until the end of the day
+            return "23:59"
+
+        if end == MINUTES_PER_DAY and offset_minutes == 0:
+            # Force to 23:59 as 24:00 invalid
             return "23:59"
 
-        end_str = rule.end_time
-        
-        # Handle 24:00 special case logic
-        if end_str == "24:00":
-             # Force to 23:59 as 24:00 invalid
-             # Apply offset if provided, but default is 0 now
-             if offset_minutes == 0:
-                 return "23:59"
-             
-             # If someone really wants an offset from 24:00 (e.g. 23:00)
-             dt = datetime.combine(date.date(), time(0, 0)) + timedelta(days=1)
-             final_dt = dt - timedelta(minutes=offset_minutes)
-             # If minute is 0, return HH:MM
-             # If user wanted 23:59 specifically for 24:00 with 0 offset, that is covered.
-             return final_dt.strftime("%H:%M")
-        
-        # Parse standard time
-        t = datetime.strptime(end_str, "%H:%M").time()
-        dt = datetime.combine(date.date(), t)
-        final_dt = dt - timedelta(minutes=offset_minutes)
-        return final_dt.strftime("%H:%M")
+        # An offset from 24:00 counts back from midnight (e.g. 60 -> 23:00)
+        final = (end - offset_minutes) % MINUTES_PER_DAY
+        return f"{final // 60:02d}:{final % 60:02d}"
 
     @staticmethod
     def is_within_paid_hours(zone: Zone, dt: datetime) -> bool:
-        """Check if a specific datetime is within paid parking hours."""
-        rule = TimeUtils.get_rule_for_day(zone, dt)
-        if not rule:
-            return False
-            
-        start = TimeUtils.parse_time(rule.start_time)
-        # Handle 24:00 for end time
-        if rule.end_time == "24:00":
-            end = time(23, 59, 59)
-        else:
-            end = TimeUtils.parse_time(rule.end_time)
-            
-        current = dt.time()
-        return start <= current <= end
+        """Check if a specific datetime is within paid parking hours (end inclusive)."""
+        return WeeklySchedule.for_zone(zone).is_paid(dt)
+
+    @staticmethod
+    def plan_days(zone: Optional[Zone], days: int, date: Optional[str] = None,
+                  start_time: Optional[str] = None, all_day: bool = True) -> List[dict]:
+        """
+        Start and end of each day of a multi-day registration, as register_visitor() arguments.
+        `date` is DD-MM-YYYY or 'tomorrow' (default: today, starting now).
+        """
+        base_date = datetime.now()
+        if date:
+            if date.lower() == 'tomorrow':
+                base_date = base_date + timedelta(days=1)
+            else:
+                try:
+                    base_date = datetime.strptime(date, "%d-%m-%Y")
+                except ValueError:
+                    # If date is already in some other format or just today?
+                    pass
+
+        plan = []
+        for i in range(days):
+            current_date = base_date + timedelta(days=i)
+            current_date_str = current_date.strftime("%d-%m-%Y")
+
+            # Determine Start Time
+            s_time = start_time
+            if not s_time:
+                if i == 0 and not date:
+                    # Today, starting now
+                    s_time = datetime.now().strftime("%H:%M")
+                else:
+                    # Future date, use zone start time
+                    if zone:
+                        rule = TimeUtils.get_rule_for_day(zone, current_date)
+                        s_time = rule.start_time if rule else "00:00"
+                    else:
+                        s_time = "00:00"
+
+            # Determine End Time
+            e_time = None
+            if all_day and zone:
+                e_time = TimeUtils.get_end_time_for_all_day(zone, current_date)
+
+            plan.append(dict(
+                start_date=current_date_str,
+                start_time=s_time,
+                end_date=current_date_str,
+                end_time=e_time,
+            ))
+        return plan
@@ -0,0 +1,56 @@
+import logging
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    In-memory cache with its own time-to-live per key and hit/miss counters.
+
+    Writes to the portal call `invalidate()`. Every invalidation bumps a generation
+    number; a read that started before the invalidation passes the generation it saw
+    to `set()` and its (possibly stale) result is then dropped instead of cached.
+    """
+
+    def __init__(self, ttls: Dict[str, float], clock: Callable[[], float] = time.monotonic):
+        self.ttls = ttls
+        self._clock = clock
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self.generation = 0
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, value) for a fresh entry, (False, None) otherwise."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._clock():
+            self.hits[key] += 1
+            return True, entry[1]
+        self.misses[key] += 1
+        return False, None
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None):
+        ttl = self.ttls.get(key, 0)
+        if ttl <= 0:
+            return
+        if generation is not None and generation != self.generation:
+            logger.debug(f"Not caching {key}: invalidated while it was fetched")
+            return
+        self._entries[key] = (self._clock() + ttl, value)
+
+    def invalidate(self, *keys: str):
+        """Drop the given keys, or everything when none are given."""
+        self.generation += 1
+        if not keys:
+            self._entries.clear()
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            key: {"hits": self.hits[key], "misses": self.misses[key]}
+            for key in sorted(set(self.hits) | set(self.misses))
+        }
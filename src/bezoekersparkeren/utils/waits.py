@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from playwright.async_api import Page, Response
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StepTiming:
+    step: str
+    seconds: float
+    outcome: str  # name of the signal that fired, "fallback" or "timeout"
+
+
+class WaitStrategy:
+    """
+    Waits on concrete page signals (DOM state, responses, enabled buttons) instead of
+    fixed sleeps and blanket `networkidle` waits.
+
+    A fixed delay is only used when a signal doesn't show up in time. Every step is
+    timed and kept in `timings` so slow steps are easy to spot in the log.
+    """
+
+    def __init__(self, page: Page, timings: Optional[Deque[StepTiming]] = None):
+        self.page = page
+        self.timings: Deque[StepTiming] = timings if timings is not None else deque(maxlen=200)
+
+    def _record(self, step: str, started: float, outcome: str):
+        timing = StepTiming(step, time.monotonic() - started, outcome)
+        self.timings.append(timing)
+        logger.info(f"Wait '{step}': {timing.seconds:.2f}s ({outcome})")
+
+    async def first_of(
+        self, step: str, signals: Dict[str, Callable[[], Awaitable]], timeout: float = 10.0
+    ) -> Optional[str]:
+        """
+        Wait until the first of several named signals fires.
+        Returns the name of that signal, or None if none fired within `timeout` seconds.
+        """
+        started = time.monotonic()
+        tasks = {asyncio.ensure_future(factory()): name for name, factory in signals.items()}
+        pending = set(tasks)
+        winner = None
+        try:
+            while pending and winner is None:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    # A signal that errored (e.g. its own timeout) doesn't count
+                    if not task.cancelled() and task.exception() is None:
+                        winner = tasks[task]
+                        break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        self._record(step, started, winner or "timeout")
+        return winner
+
+    async def page_ready(
+        self,
+        step: str,
+        selector: Optional[str] = None,
+        expression: Optional[str] = None,
+        timeout: float = 15.0,
+    ) -> Optional[str]:
+        """
+        Wait until the page shows its content signal (`selector` or JS `expression`), or
+        until the network goes idle, whichever comes first. Never slower than `networkidle`.
+        """
+        ms = int(timeout * 1000)
+        signals = {"networkidle": lambda: self.page.wait_for_load_state("networkidle", timeout=ms)}
+        if selector:
+            signals["selector"] = lambda: self.page.wait_for_selector(selector, timeout=ms)
+        if expression:
+            signals["dom"] = lambda: self.page.wait_for_function(expression, timeout=ms)
+        return await self.first_of(step, signals, timeout=timeout)
+
+    async def selector(
+        self,
+        step: str,
+        selector: str,
+        timeout: int = 5000,
+        state: str = "visible",
+        fallback_delay: float = 0,
+    ) -> bool:
+        """Wait for an element; sleep `fallback_delay` seconds if it doesn't show up."""
+        started = time.monotonic()
+        try:
+            await self.page.wait_for_selector(selector, timeout=timeout, state=state)
+            self._record(step, started, "selector")
+            return True
+        except Exception:
+            if fallback_delay:
+                await asyncio.sleep(fallback_delay)
+            self._record(step, started, "fallback" if fallback_delay else "timeout")
+            return False
+
+    async def condition(
+        self, step: str, expression: str, arg=None, timeout: int = 5000, fallback_delay: float = 0
+    ) -> bool:
+        """
+        Wait for a JS condition (DOM mutation, enabled button, ...); sleep
+        `fallback_delay` if it never holds.
+        """
+        started = time.monotonic()
+        try:
+            await self.page.wait_for_function(expression, arg=arg, timeout=timeout)
+            self._record(step, started, "dom")
+            return True
+        except Exception:
+            if fallback_delay:
+                await asyncio.sleep(fallback_delay)
+            self._record(step, started, "fallback" if fallback_delay else "timeout")
+            return False
+
+    async def enabled(self, step: str, selector: str, timeout: int = 5000) -> bool:
+        """Wait until a button is present and no longer disabled."""
+        return await self.condition(
+            step,
+            "sel => { const el = document.querySelector(sel); return !!el && !el.disabled; }",
+            arg=selector,
+            timeout=timeout,
+        )
+
+    @asynccontextmanager
+    async def response(
+        self,
+        step: str,
+        predicate: Callable[[Response], bool],
+        timeout: int = 10000,
+        fallback: Optional[Callable[[], Awaitable]] = None,
+    ):
+        """
+        Expect a response matching `predicate` to be triggered by the `async with` body.
+
+        Uses Playwright's `expect_response`, which listens before the body runs.
+        If no matching response arrives, `fallback` is awaited instead.
+        """
+        started = time.monotonic()
+        body_done = False
+        try:
+            async with self.page.expect_response(predicate, timeout=timeout):
+                yield
+                body_done = True
+            self._record(step, started, "response")
+        except Exception:
+            if not body_done:
+                raise
+            if fallback:
+                await fallback()
+            self._record(step, started, "fallback" if fallback else "timeout")
@@ -10,6 +10,8 @@ def mock_page():
     page.wait_for_selector = AsyncMock()
     page.wait_for_load_state = AsyncMock()
     page.query_selector = AsyncMock(return_value=True) # Mock successful login check
+    # `async with page.expect_response(...)`: the response arrives right away
+    page.expect_response = MagicMock(return_value=AsyncMock())
     return page
 
 @pytest.fixture
@@ -20,3 +22,30 @@ def config():
         credentials=Credentials(email="test@test.nl", password="test123"),
         browser=BrowserConfig(headless=True)
     )
+
+
+@pytest.fixture
+def make_zone():
+    """Zone factory: Filmwijk's tariff and schedule unless overridden."""
+    from bezoekersparkeren.models import Zone, ScheduleRule
+
+    def make(name="Filmwijk", code="36044", hourly_rate=0.25, max_daily_rate=1.00, rules=None):
+        if rules is None:
+            rules = [
+                ScheduleRule(days=[0, 1, 2], start_time="09:00", end_time="22:00"),  # Mon-Wed
+                ScheduleRule(days=[3, 4, 5], start_time="09:00", end_time="24:00"),  # Thu-Sat
+                ScheduleRule(days=[6], start_time="12:00", end_time="17:00"),  # Sun
+            ]
+        return Zone(name=name, code=code, hourly_rate=hourly_rate,
+                    max_daily_rate=max_daily_rate, rules=rules)
+    return make
+
+@pytest.fixture
+def zone(make_zone):
+    return make_zone()
+
+@pytest.fixture
+def zone_config(config, zone):
+    """The test config with `zone` as its only zone."""
+    config.zones = [zone]
+    return config
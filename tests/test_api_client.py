@@ -0,0 +1,262 @@
+import asyncio
+import httpx
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from bezoekersparkeren.api_client import ParkeerApiClient, PortalApiError, PortalWriteUnconfirmed
+from bezoekersparkeren.client import ParkeerClient
+from bezoekersparkeren.models import Balance, make_session_id
+
+LOGIN_PAGE = """
+<form method="post" action="/almere/login_check">
+  <input type="hidden" name="_csrf_token" value="tok">
+  <input id="username" name="_username"><input id="password" name="_password" type="password">
+  <button id="_submit">Inloggen</button>
+</form>
+"""
+
+
+def portal(handler_overrides=None):
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        key = (request.method, request.url.path)
+        if handler_overrides and key in handler_overrides:
+            return handler_overrides[key](request)
+        if key == ("GET", "/almere/login"):
+            return httpx.Response(200, text=LOGIN_PAGE)
+        if key == ("POST", "/almere/login_check"):
+            return httpx.Response(302, headers={"Location": "/almere/app/park"})
+        if key == ("GET", "/almere/app/park"):
+            return httpx.Response(200, text="<html></html>")
+        if key == ("GET", "/almere/api/park/actions"):
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "id": 42,
+                        "licensePlate": "AB-123-CD",
+                        "startTime": "2025-12-18T09:00:00",
+                        "endTime": "2025-12-18T22:00:00",
+                    },
+                ],
+            )
+        if key == ("POST", "/almere/api/park/actions/42/stop"):
+            return httpx.Response(204)
+        if key == ("GET", "/almere/api/user"):
+            return httpx.Response(200, json={"balance": "€ 19,10"})
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler), calls
+
+
+@pytest.mark.asyncio
+async def test_login_posts_form_with_csrf(config):
+    transport, calls = portal()
+    api = ParkeerApiClient(config, transport=transport)
+
+    assert await api.login() is True
+    post = next(c for c in calls if c.method == "POST")
+    body = post.content.decode()
+    assert "_csrf_token=tok" in body and "_username=test%40test.nl" in body
+
+
+@pytest.mark.asyncio
+async def test_login_keeps_browser_local_storage(config):
+    origins = [
+        {"origin": "https://bezoek.parkeer.nl", "localStorage": [{"name": "k", "value": "v"}]}
+    ]
+    state_cache = MagicMock()
+    state_cache.load.return_value = {"cookies": [], "origins": origins}
+    transport, _ = portal()
+    api = ParkeerApiClient(config, transport=transport, state_cache=state_cache)
+
+    assert await api.login() is True
+    saved = state_cache.save.call_args.args[0]
+    assert saved["origins"] == origins
+    assert isinstance(saved["cookies"], list)
+
+
+@pytest.mark.asyncio
+async def test_sessions_use_same_ids_as_browser_path(config):
+    transport, _ = portal()
+    api = ParkeerApiClient(config, transport=transport)
+
+    sessions = await api.get_active_sessions()
+    assert sessions[0].plate == "AB-123-CD"
+    assert sessions[0].id == make_session_id("AB-123-CD", datetime(2025, 12, 18, 9, 0))
+    assert sessions[0].end_time == datetime(2025, 12, 18, 22, 0)
+
+    assert await api.stop_session(sessions[0]) is True
+
+
+@pytest.mark.asyncio
+async def test_balance(config):
+    transport, _ = portal()
+    api = ParkeerApiClient(config, transport=transport)
+    assert (await api.get_balance()).amount == 19.10
+
+
+@pytest.mark.asyncio
+async def test_changed_payload_raises(config):
+    transport, _ = portal(
+        {("GET", "/almere/api/user"): lambda r: httpx.Response(200, json={"foo": 1})}
+    )
+    api = ParkeerApiClient(config, transport=transport)
+    with pytest.raises(PortalApiError):
+        await api.get_balance()
+
+
+@pytest.mark.asyncio
+async def test_client_falls_back_to_browser(mock_page, config):
+    client = ParkeerClient(config)
+    client.page = mock_page
+    client._api = AsyncMock()
+    client._api.get_balance.side_effect = PortalApiError("HTTP 500")
+    mock_page.get_attribute.return_value = "€ 5,00"
+
+    assert (await client.get_balance()).amount == 5.0
+    # The broken endpoint isn't tried again
+    assert (await client.get_balance()).amount == 5.0
+    client._api.get_balance.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_client_prefers_api(mock_page, config):
+    client = ParkeerClient(config)
+    client.page = mock_page
+    client._api = AsyncMock()
+    client._api.get_balance.return_value = Balance(amount=7.0)
+
+    assert (await client.get_balance()).amount == 7.0
+    mock_page.goto.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stop_all_sessions_lists_once(config):
+    transport, calls = portal()
+    api = ParkeerApiClient(config, transport=transport)
+
+    assert await api.stop_all_sessions("AB-123-CD") == 1
+    lists = [c for c in calls if c.url.path == "/almere/api/park/actions"]
+    assert len(lists) == 1
+
+
+@pytest.mark.asyncio
+async def test_parallel_fallbacks_share_one_browser(mock_page, config):
+    config.defaults.registration_interval = 0
+    client = ParkeerClient(config)
+    client._api = AsyncMock()
+    client._api.register_visitor.side_effect = PortalApiError("HTTP 500")
+    launches = []
+
+    async def init_browser():
+        launches.append(1)
+        await asyncio.sleep(0.01)
+        client.browser = MagicMock()
+        client.page = mock_page
+
+    active, peak = [0], [0]
+
+    async def goto(url):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+
+    client._init_browser = init_browser
+    mock_page.goto.side_effect = goto
+
+    summary = await client.register_days("AB-123-CD", days=4, date="15-12-2025", parallel=3)
+
+    assert len(summary.sessions) + len(summary.failures) == 4
+    assert len(launches) == 1
+    # browser.pool_size is 1: the fallbacks take turns on the one page
+    assert peak[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_accepted_registration_with_odd_answer(config):
+    transport, calls = portal(
+        {("POST", "/almere/api/park/actions"): lambda r: httpx.Response(200, text="OK")}
+    )
+    api = ParkeerApiClient(config, transport=transport)
+
+    session = await api.register_visitor("AB-123-CD", "18-12-2025", "09:00", "18-12-2025", "22:00")
+    assert session.id == make_session_id("AB-123-CD", datetime(2025, 12, 18, 9, 0))
+    assert (
+        len([c for c in calls if c.method == "POST" and c.url.path == "/almere/api/park/actions"])
+        == 1
+    )
+
+
+def no_answer(request):
+    raise httpx.ReadTimeout("no answer", request=request)
+
+
+@pytest.mark.asyncio
+async def test_unanswered_registration_is_confirmed_from_list(config):
+    transport, _ = portal({("POST", "/almere/api/park/actions"): no_answer})
+    api = ParkeerApiClient(config, transport=transport)
+
+    # The list (see portal()) has the session: it went through
+    session = await api.register_visitor("AB-123-CD", "18-12-2025", "09:00", "18-12-2025", "22:00")
+    assert session.end_time == datetime(2025, 12, 18, 22, 0)
+
+    with pytest.raises(PortalWriteUnconfirmed):
+        await api.register_visitor("XY-999-Z", "18-12-2025", "09:00")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [502, 504])
+async def test_server_error_on_registration_is_checked_against_list(mock_page, config, status):
+    transport, calls = portal(
+        {("POST", "/almere/api/park/actions"): lambda r: httpx.Response(status)}
+    )
+    api = ParkeerApiClient(config, transport=transport)
+
+    # The list (see portal()) has the session: the portal did process it
+    session = await api.register_visitor("AB-123-CD", "18-12-2025", "09:00", "18-12-2025", "22:00")
+    assert session.end_time == datetime(2025, 12, 18, 22, 0)
+
+    # Not in the list: unconfirmed, and not repeated in the browser
+    client = ParkeerClient(config)
+    client.page = mock_page
+    client._api = api
+    with pytest.raises(PortalWriteUnconfirmed):
+        await client.register_visitor("XY-999-Z", "18-12-2025", "09:00")
+    mock_page.goto.assert_not_called()
+    posts = [c for c in calls if c.method == "POST" and c.url.path == "/almere/api/park/actions"]
+    assert len(posts) == 2
+
+
+@pytest.mark.asyncio
+async def test_unanswered_stop_is_checked_against_list(config):
+    lists = iter(
+        [
+            [{"id": 42, "licensePlate": "AB-123-CD", "startTime": "2025-12-18T09:00:00"}],
+            [],
+        ]
+    )
+    transport, _ = portal(
+        {
+            ("GET", "/almere/api/park/actions"): lambda r: httpx.Response(200, json=next(lists)),
+            ("POST", "/almere/api/park/actions/42/stop"): no_answer,
+        }
+    )
+    api = ParkeerApiClient(config, transport=transport)
+    assert await api.stop_all_sessions("AB-123-CD") == 1
+
+
+@pytest.mark.asyncio
+async def test_unconfirmed_write_is_not_repeated_in_browser(mock_page, config):
+    client = ParkeerClient(config)
+    client.page = mock_page
+    client._api = AsyncMock()
+    client._api.register_visitor.side_effect = PortalWriteUnconfirmed("no answer")
+
+    with pytest.raises(PortalWriteUnconfirmed):
+        await client.register_visitor("AB-123-CD")
+    mock_page.goto.assert_not_called()
+    assert "register_visitor" not in client._api_failed
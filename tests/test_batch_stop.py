@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bezoekersparkeren.client import ParkeerClient
+
+
+def row(plate, start):
+    return (
+        f'<div class="park-item-desktop"><span class="plate">{plate}</span>'
+        f'<div class="end-time">Eindtijd vandaag 22:00</div></div>'
+        f'<div class="start-time">Start tijd vandaag {start}</div>'
+    )
+
+
+def dashboard(*rows):
+    return f'<div id="parkActions">{"".join(rows)}</div>'
+
+
+@pytest.fixture
+def client(mock_page, config):
+    client = ParkeerClient(config)
+    client.page = mock_page
+    mock_page.url = "https://bezoek.parkeer.nl/almere/app/park"
+    mock_page.locator = MagicMock()
+    mock_page.locator.return_value.nth.return_value.locator.return_value.click = AsyncMock()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_stop_all_sessions_single_pass(client, mock_page):
+    before = dashboard(
+        row("AB-123-CD", "09:00"), row("XY-999-Z", "09:00"), row("AB-123-CD", "10:00")
+    )
+    after = dashboard(row("XY-999-Z", "09:00"))
+    mock_page.content = AsyncMock(side_effect=[before, after])
+
+    count = await client.stop_all_sessions("AB-123-CD")
+
+    assert count == 2
+    rows = mock_page.locator.return_value
+    # Bottom-up, so the first row's index is still valid when it's clicked
+    assert [c.args[0] for c in rows.nth.call_args_list] == [2, 0]
+    # One read to find the rows, one reload to verify
+    assert mock_page.content.await_count == 2
+    mock_page.reload.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stop_all_reports_sessions_still_listed(client, mock_page):
+    before = dashboard(row("AB-123-CD", "09:00"), row("AB-123-CD", "10:00"))
+    mock_page.content = AsyncMock(side_effect=[before, dashboard(row("AB-123-CD", "10:00"))])
+
+    assert await client.stop_all_sessions("AB-123-CD") == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_all_nothing_to_stop(client, mock_page):
+    mock_page.content = AsyncMock(return_value=dashboard(row("XY-999-Z", "09:00")))
+
+    assert await client.stop_all_sessions("AB-123-CD") == 0
+    mock_page.locator.return_value.nth.assert_not_called()
+    mock_page.reload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stop_session_targets_row_directly(client, mock_page):
+    rows = [
+        {"plate": "AB-123-CD", "start": "Start tijd vandaag 09:00", "end": None},
+        {"plate": "AB-123-CD", "start": "Start tijd vandaag 10:00", "end": None},
+        {"plate": "XY-999-Z", "start": "Start tijd vandaag 09:00", "end": None},
+    ]
+    mock_page.evaluate = AsyncMock(return_value=rows)
+    target = client._session_from_row(rows[1])
+
+    assert await client.stop_session(target) is True
+
+    # A single extraction call, however many rows are listed
+    mock_page.evaluate.assert_awaited_once()
+    mock_page.content.assert_not_called()
+    row = mock_page.locator.return_value.nth
+    row.assert_called_once_with(1)
+    row.return_value.locator.return_value.click.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stop_session_unknown_id(client, mock_page):
+    mock_page.evaluate = AsyncMock(
+        return_value=[{"plate": "XY-999-Z", "start": "vandaag 09:00", "end": None}]
+    )
+    target = client._session_from_row({"plate": "AB-123-CD", "start": "vandaag 09:00"})
+
+    assert await client.stop_session(target) is False
+    mock_page.locator.return_value.nth.assert_not_called()
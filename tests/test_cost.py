@@ -0,0 +1,123 @@
+import random
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from bezoekersparkeren.models import ScheduleRule, ParkingSession
+from bezoekersparkeren.utils.cost import (
+    estimate_plan,
+    estimate_sessions,
+    format_euros,
+    total,
+    unknown_count,
+)
+from bezoekersparkeren.utils.time_utils import TimeUtils
+
+
+@pytest.fixture
+def zone(make_zone):
+    # A pricier zone with weekday hours, so caps and free days are easy to tell apart
+    return make_zone(
+        hourly_rate=0.60,
+        max_daily_rate=3.00,
+        rules=[
+            ScheduleRule(days=[0, 1, 2, 3, 4], start_time="09:00", end_time="18:00"),  # Mon-Fri
+            ScheduleRule(days=[5], start_time="12:00", end_time="24:00"),  # Sat
+        ],
+    )
+
+
+def session(start, end, plate="AB-123-CD"):
+    return ParkingSession(plate=plate, active=True, start_time=start, end_time=end)
+
+
+def reference_cost(zone, start, end):
+    """Minute by minute, with the daily cap."""
+    per_day = {}
+    t = start
+    while t < end:
+        if TimeUtils.is_within_paid_hours(zone, t) and TimeUtils.is_within_paid_hours(
+            zone, t + timedelta(seconds=59)
+        ):
+            per_day[t.date()] = per_day.get(t.date(), 0) + zone.hourly_rate / 60
+        t += timedelta(minutes=1)
+    return sum(min(v, zone.max_daily_rate) for v in per_day.values())
+
+
+def test_single_day(zone):
+    # Monday 2026-01-05: 10:00-12:00 paid, 2 hours at 0.60
+    costs = estimate_sessions(zone, [session(datetime(2026, 1, 5, 10), datetime(2026, 1, 5, 12))])
+    assert costs[0] == pytest.approx(1.20)
+
+
+def test_free_hours_cost_nothing(zone):
+    costs = estimate_sessions(
+        zone,
+        [
+            session(datetime(2026, 1, 5, 18), datetime(2026, 1, 5, 23)),  # after paid hours
+            session(datetime(2026, 1, 11, 9), datetime(2026, 1, 11, 20)),  # Sunday
+        ],
+    )
+    assert costs.tolist() == [0, 0]
+
+
+def test_daily_cap_per_day(zone):
+    # Mon 08:00 to Wed 10:00: capped Monday and Tuesday, one hour on Wednesday
+    costs = estimate_sessions(zone, [session(datetime(2026, 1, 5, 8), datetime(2026, 1, 7, 10))])
+    assert costs[0] == pytest.approx(3.00 + 3.00 + 0.60)
+
+
+def test_unknown_times(zone):
+    costs = estimate_sessions(
+        zone,
+        [
+            session(datetime(2026, 1, 5, 10), None),
+            session(datetime(2026, 1, 5, 10), datetime(2026, 1, 5, 11)),
+        ],
+    )
+    assert np.isnan(costs[0])
+    assert total(costs) == pytest.approx(0.60)
+    assert unknown_count(costs) == 1
+    assert format_euros(costs[0]) == "?"
+    assert format_euros(costs[1]) == "€ 0,60"
+
+
+def test_plan(zone):
+    plan = TimeUtils.plan_days(zone, 3, date="09-01-2026")  # Friday to Sunday
+    assert [(d["start_time"], d["end_time"]) for d in plan] == [
+        ("09:00", "18:00"),
+        ("12:00", "23:59"),
+        ("00:00", "23:59"),
+    ]
+    costs = estimate_plan(zone, plan)
+    assert costs.tolist() == pytest.approx([3.00, 3.00, 0.00])
+
+
+def test_matches_reference(zone):
+    rnd = random.Random(1)
+    base = datetime(2026, 1, 5)
+    sessions = []
+    for _ in range(200):
+        start = base + timedelta(minutes=rnd.randrange(14 * 1440))
+        sessions.append(session(start, start + timedelta(minutes=rnd.randrange(4 * 1440))))
+    costs = estimate_sessions(zone, sessions)
+    expected = [reference_cost(zone, s.start_time, s.end_time) for s in sessions[:20]]
+    assert costs[:20].tolist() == pytest.approx(expected)
+    assert (costs >= 0).all()
+
+
+def test_large_batch_matches_small_batches(zone):
+    # Timing is in benchmarks/cost.py
+    base = np.datetime64("2025-01-01T00:00", "m")
+    rng = np.random.default_rng(0)
+    from bezoekersparkeren.utils.cost import session_costs
+
+    starts = base + rng.integers(0, 365 * 1440, 20_000).astype("timedelta64[m]")
+    ends = starts + rng.integers(0, 3 * 1440, 20_000).astype("timedelta64[m]")
+    costs = session_costs(zone, starts, ends)
+    chunks = np.concatenate(
+        [session_costs(zone, starts[i : i + 7], ends[i : i + 7]) for i in range(0, 20_000, 7)]
+    )
+    assert costs == pytest.approx(chunks)
+    # At most the daily maximum for every calendar day touched
+    days = (ends.astype("datetime64[D]") - starts.astype("datetime64[D]")).astype(int) + 1
+    assert ((costs >= 0) & (costs <= days * zone.max_daily_rate + 1e-9)).all()
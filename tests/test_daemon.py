@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import bezoekersparkeren.daemon as daemon_module
+from bezoekersparkeren.daemon import (
+    ParkeerDaemon,
+    DaemonError,
+    DaemonUnavailable,
+    send_command,
+    is_running,
+)
+from bezoekersparkeren.models import ParkingSession, Balance, RegistrationSummary
+
+
+@pytest.fixture
+async def daemon(config, tmp_path):
+    client = AsyncMock()
+    client.page = MagicMock()
+    client.page.is_closed.return_value = False
+    client.browser = MagicMock()
+    client.browser.is_connected.return_value = True
+    client.get_active_sessions.return_value = [
+        ParkingSession(id="s1", plate="AB-123-CD", active=True)
+    ]
+    client.get_balance.return_value = Balance(amount=12.5)
+    client.stop_session.return_value = True
+
+    daemon = ParkeerDaemon(config, socket_path=tmp_path / "d.sock")
+    daemon._client = client
+    await daemon.start()
+    yield daemon
+    await daemon.stop()
+
+
+@pytest.mark.asyncio
+async def test_commands_roundtrip(daemon):
+    sessions = await send_command(daemon.socket_path, "list")
+    assert sessions[0]["plate"] == "AB-123-CD"
+
+    balance = await send_command(daemon.socket_path, "balance")
+    assert Balance(**balance).amount == 12.5
+
+    session = ParkingSession(id="s1", plate="AB-123-CD", active=True)
+    assert (
+        await send_command(daemon.socket_path, "stop", session=session.model_dump(mode="json"))
+        is True
+    )
+    args, _ = daemon._client.stop_session.call_args
+    assert args[0] == session
+
+
+@pytest.mark.asyncio
+async def test_errors_are_reported(daemon):
+    with pytest.raises(DaemonError):
+        await send_command(daemon.socket_path, "bogus")
+
+    daemon._client.get_balance.side_effect = Exception("portal down")
+    with pytest.raises(DaemonError, match="portal down"):
+        await send_command(daemon.socket_path, "balance")
+
+
+@pytest.mark.asyncio
+async def test_not_running(tmp_path):
+    with pytest.raises(DaemonUnavailable):
+        await send_command(tmp_path / "missing.sock", "list")
+    assert await is_running(tmp_path / "missing.sock") is False
+
+
+@pytest.mark.asyncio
+async def test_socket_is_owner_only(daemon):
+    assert daemon.socket_path.stat().st_mode & 0o077 == 0
+
+
+@pytest.mark.asyncio
+async def test_register_plan(daemon):
+    daemon._client.register_plan.return_value = RegistrationSummary()
+    plan = [
+        {
+            "start_date": "12-01-2026",
+            "start_time": "09:00",
+            "end_date": "12-01-2026",
+            "end_time": "18:00",
+        }
+    ]
+    assert await send_command(
+        daemon.socket_path, "register_plan", plate="AB-123-CD", plan=plan
+    ) == {"sessions": [], "failures": []}
+    daemon._client.register_plan.assert_awaited_once_with(plate="AB-123-CD", plan=plan)
+    # The old multi-day command is gone, the CLI plans itself
+    with pytest.raises(DaemonError, match="Unknown command"):
+        await send_command(daemon.socket_path, "register", plate="AB-123-CD", days=2)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("crash", ["page_closed", "browser_disconnected"])
+async def test_crashed_browser_is_restarted(daemon, monkeypatch, crash):
+    crashed = daemon._client
+    if crash == "page_closed":
+        crashed.page.is_closed.return_value = True
+    else:
+        crashed.browser.is_connected.return_value = False
+    fresh = AsyncMock()
+    fresh.login.return_value = True
+    monkeypatch.setattr(daemon_module, "ParkeerClient", MagicMock(return_value=fresh))
+
+    assert await daemon._get_client() is fresh
+    crashed.close.assert_awaited_once()
+    fresh.start.assert_awaited_once()
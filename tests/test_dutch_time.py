@@ -0,0 +1,105 @@
+import random
+import re
+import pytest
+from datetime import date, datetime, timedelta
+from bezoekersparkeren.utils.dutch_time import (
+    MONTHS,
+    parse_portal_time,
+    parse_stats,
+    reset_parse_stats,
+)
+
+
+def legacy_parse(text, now):
+    """The parser this module replaced (from ParkeerClient._parse_single_session_from_soup)."""
+    full_str = text.lower()
+    for label in [
+        "eindtijd",
+        "start tijd",
+        "start actie",
+        "deze actie start",
+        "verstreken",
+        "product",
+    ]:
+        full_str = full_str.replace(label, "")
+    today = now.date()
+    target_date = today
+    if "morgen" in full_str:
+        target_date = today + timedelta(days=1)
+        full_str = full_str.replace("morgen", "").strip()
+    elif "vandaag" in full_str:
+        full_str = full_str.replace("vandaag", "").strip()
+    elif any(m in full_str for m in MONTHS):
+        date_match = re.search(r"(\d{1,2})\s+([a-z]{3})", full_str)
+        if date_match:
+            month = MONTHS.get(date_match.group(2))
+            if month:
+                year = now.year
+                if now.month == 12 and month == 1:
+                    year += 1
+                target_date = datetime(year, month, int(date_match.group(1))).date()
+                full_str = full_str.replace(date_match.group(0), "").replace(".", "").strip()
+    time_match = re.search(r"(\d{1,2}:\d{2})", full_str)
+    if not time_match:
+        return None
+    h, m = map(int, time_match.group(1).split(":"))
+    return datetime.combine(target_date, datetime.min.time().replace(hour=h, minute=m))
+
+
+def portal_text(rnd):
+    label = rnd.choice(
+        ["", "Eindtijd ", "Start tijd ", "Start actie ", "Deze actie start ", "Verstreken "]
+    )
+    day = rnd.choice(
+        [
+            "",
+            "vandaag ",
+            "Morgen ",
+            f"{rnd.randint(1, 28)} {rnd.choice(list(MONTHS))}. ",
+            f"{rnd.randint(1, 28)}  {rnd.choice(list(MONTHS)).upper()} ",
+        ]
+    )
+    clock = rnd.choice(
+        [
+            "",
+            f"{rnd.randint(0, 23)}:{rnd.randint(0, 59):02d}",
+            f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}",
+        ]
+    )
+    suffix = rnd.choice(["", " uur", " (Product: bezoek)"])
+    return f"{label}{day}{clock}{suffix}"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_legacy_parser(seed):
+    rnd = random.Random(seed)
+    for _ in range(500):
+        text = portal_text(rnd)
+        today = date(2025, rnd.choice([1, 6, 12]), rnd.randint(1, 28))
+        now = datetime.combine(today, datetime.min.time())
+        assert parse_portal_time(text, today) == legacy_parse(text, now), text
+
+
+def test_examples():
+    today = date(2025, 12, 17)
+    assert parse_portal_time("morgen 09:00", today) == datetime(2025, 12, 18, 9, 0)
+    assert parse_portal_time("Start tijd 18 dec. 14:30", today) == datetime(2025, 12, 18, 14, 30)
+    assert parse_portal_time("Eindtijd 2 jan. 22:00", today) == datetime(2026, 1, 2, 22, 0)
+    assert parse_portal_time("vandaag", today) is None
+
+
+def test_failures_are_counted():
+    reset_parse_stats()
+    today = date(2025, 12, 17)
+    parse_portal_time("vandaag 09:00", today)
+    parse_portal_time("vandaag 09:00", today)
+    parse_portal_time("vandaag", today)
+    parse_portal_time("31 feb. 10:00", today)
+    parse_portal_time(None)
+
+    stats = parse_stats()
+    assert stats["ok"] == 2
+    assert stats["no_time"] == 1
+    assert stats["invalid"] == 1
+    assert stats["empty"] == 1
+    assert stats["cache_hits"] == 1
@@ -72,3 +72,51 @@ async def test_quick_stop(mock_update_command, mock_context, mock_client):
         args, _ = mock_client.stop_session.call_args
         assert isinstance(args[0], ParkingSession)
         assert args[0].plate == "TEST-PLATE"
+
+
+@pytest.fixture
+def store():
+    store = AsyncMock()
+    with patch.object(handlers, "_store", store):
+        yield store
+
+
+@pytest.mark.asyncio
+async def test_quick_stop_records_the_stop(
+    mock_update_command, mock_context, mock_client, store
+):
+    with patch.object(handlers, "get_client", new=AsyncMock(return_value=mock_client)):
+        await quick_stop(mock_update_command, mock_context)
+
+    store.end_sessions.assert_awaited_once_with(mock_client.get_active_sessions.return_value)
+    store.remove_session.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_quick_stop_failure_keeps_the_session(
+    mock_update_command, mock_context, mock_client, store
+):
+    mock_client.stop_session.return_value = False
+    with patch.object(handlers, "get_client", new=AsyncMock(return_value=mock_client)):
+        await quick_stop(mock_update_command, mock_context)
+
+    store.end_sessions.assert_not_called()
+    store.remove_session.assert_not_called()
+    assert "mislukt" in mock_update_command.message.reply_text.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_stop_button_records_only_stopped_sessions(
+    mock_update_callback, mock_context, store
+):
+    s1 = ParkingSession(id="s1", plate="TEST-PLATE", active=True)
+    s2 = ParkingSession(id="s2", plate="TEST-PLATE", active=True)
+    client = AsyncMock()
+    # Before the stop both run, afterwards s2 is still listed
+    client.get_active_sessions.side_effect = [[s1, s2], [s2]]
+    client.stop_sessions.return_value = 1
+    with patch.object(handlers, "get_client", new=AsyncMock(return_value=client)):
+        await button_callback(mock_update_callback, mock_context)
+
+    client.stop_sessions.assert_awaited_once_with([s1, s2])
+    store.end_sessions.assert_awaited_once_with([s1])
@@ -0,0 +1,102 @@
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image, ImageDraw
+
+from bezoekersparkeren.utils.image_prep import (
+    find_plate,
+    pick_photo,
+    prepare_image,
+    prepare_image_async,
+)
+
+
+def photo_sizes():
+    return [
+        SimpleNamespace(file_id=f"id{w}", width=w, height=w * 3 // 4)
+        for w in (90, 320, 800, 1280, 2560)
+    ]
+
+
+def camera_photo(size=(4000, 3000), plate=(1500, 1800, 2500, 2020)):
+    """Noisy JPEG (hard to compress) with a yellow plate on it."""
+    rng = np.random.default_rng(0)
+    image = Image.fromarray(rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8))
+    ImageDraw.Draw(image).rectangle(plate, fill=(240, 190, 20))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=95)
+    return out.getvalue()
+
+
+def test_pick_photo():
+    assert pick_photo(photo_sizes(), 720).width == 1280
+    assert pick_photo(photo_sizes(), 200).width == 320
+    # Nothing big enough: the largest
+    assert pick_photo(photo_sizes(), 5000).width == 2560
+    assert pick_photo([], 720) is None
+
+
+def test_prepare_image_fits_budget():
+    data = camera_photo()
+    out, mime = prepare_image(data, max_side=1024, max_bytes=100_000)
+    assert mime == "image/jpeg"
+    assert len(out) <= 100_000
+    assert max(Image.open(io.BytesIO(out)).size) <= 1024
+
+
+@pytest.mark.parametrize("quality", [30, 1])
+def test_prepare_image_low_quality(quality):
+    out, mime = prepare_image(camera_photo(size=(800, 600)), max_bytes=20_000, quality=quality)
+    assert mime == "image/jpeg"
+    assert len(out) <= 20_000
+
+
+def test_quality_is_validated():
+    from pydantic import ValidationError
+
+    from bezoekersparkeren.config import RecognitionConfig
+
+    for quality in (0, 101):
+        with pytest.raises(ValidationError):
+            RecognitionConfig(quality=quality)
+
+
+def test_prepare_image_webp():
+    out, mime = prepare_image(
+        camera_photo(size=(800, 600), plate=(300, 400, 500, 440)), image_format="webp"
+    )
+    assert mime == "image/webp"
+    assert Image.open(io.BytesIO(out)).format == "WEBP"
+
+
+def test_crop_to_plate():
+    data = camera_photo()
+    box = find_plate(Image.open(io.BytesIO(data)))
+    left, top, right, bottom = box
+    assert left <= 1500 and right >= 2500 and top <= 1800 and bottom >= 2020
+    assert (right - left) * (bottom - top) < 0.1 * 4000 * 3000
+
+    out, _ = prepare_image(data, crop_plate=True)
+    width, height = Image.open(io.BytesIO(out)).size
+    assert width / height > 2
+
+
+def test_no_plate_no_crop():
+    image = Image.new("RGB", (800, 600), (40, 60, 200))
+    assert find_plate(image) is None
+
+
+def test_unreadable_image_is_sent_as_is():
+    assert prepare_image(b"not an image") == (b"not an image", "image/jpeg")
+
+
+@pytest.mark.asyncio
+async def test_prepare_image_async():
+    out, mime = await prepare_image_async(
+        camera_photo(size=(800, 600), plate=(300, 400, 500, 440)), max_side=400
+    )
+    assert max(Image.open(io.BytesIO(out)).size) == 400
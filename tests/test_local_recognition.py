@@ -0,0 +1,160 @@
+import io
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from bezoekersparkeren.license_plate_recognition import LocalRecognizer, PlateRecognizer, Recognizer
+from bezoekersparkeren.utils.dutch_plates import is_dutch_plate, normalize_plate, sidecode
+from bezoekersparkeren.utils.plate_ocr import read_plate
+
+
+class FakeBackend(Recognizer):
+    def __init__(self, name, plate=None, available=True):
+        self.name = name
+        self._available = available
+        self.calls = AsyncMock(return_value=plate)
+
+    @property
+    def available(self):
+        return self._available
+
+    async def recognize(self, image_bytes, mime_type="image/jpeg"):
+        return await self.calls(image_bytes, mime_type)
+
+
+def test_backend_must_implement_recognize():
+    class Incomplete(Recognizer):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_sidecodes():
+    assert sidecode("AB-12-CD") == 4
+    assert sidecode("12-ABC-3") == 7
+    assert sidecode("XX-999-X") == 9
+    assert normalize_plate("gv - 123 - b") == "GV123B"
+    assert is_dutch_plate("1-KBB-00")
+    assert not is_dutch_plate("AB1234CD")
+    assert not is_dutch_plate("ABCDEF")
+
+
+@pytest.mark.asyncio
+async def test_local_first_falls_back_to_remote(config):
+    config.recognition.strategy = "local_first"
+    local, remote = FakeBackend("local", None), FakeBackend("remote", "AB12CD")
+    recognizer = PlateRecognizer(config, backends={"local": local, "remote": remote})
+
+    assert await recognizer.recognize(b"img") == "AB12CD"
+    local.calls.assert_awaited_once()
+    assert recognizer.stats()["answers"] == {"remote": 1}
+
+
+@pytest.mark.asyncio
+async def test_local_answer_skips_remote(config):
+    config.recognition.strategy = "local_first"
+    local, remote = FakeBackend("local", "AB12CD"), FakeBackend("remote", "XX99XX")
+    recognizer = PlateRecognizer(config, backends={"local": local, "remote": remote})
+
+    assert await recognizer.recognize(b"img") == "AB12CD"
+    remote.calls.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unavailable_backends_are_skipped(config):
+    config.recognition.strategy = "remote_first"
+    # API down / no key: the local backend still answers
+    remote, local = FakeBackend("remote", "XX99XX", available=False), FakeBackend("local", "AB12CD")
+    recognizer = PlateRecognizer(config, backends={"local": local, "remote": remote})
+
+    assert await recognizer.recognize(b"img") == "AB12CD"
+    remote.calls.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_strategy_remote_only(config):
+    config.recognition.strategy = "remote"
+    local, remote = FakeBackend("local", "AB12CD"), FakeBackend("remote", None)
+    recognizer = PlateRecognizer(config, backends={"local": local, "remote": remote})
+
+    assert await recognizer.recognize(b"img") is None
+    local.calls.assert_not_awaited()
+    assert recognizer.stats()["answers"] == {"none": 1}
+
+
+def test_unknown_strategy(config):
+    config.recognition.strategy = "fastest"
+    with pytest.raises(ValueError, match="Unknown recognition strategy"):
+        PlateRecognizer(config)
+
+
+def plate_photo():
+    pytest.importorskip("PIL")
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (1600, 1200), (90, 90, 100))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((500, 700, 1020, 815), fill=(245, 190, 15))
+    for i in range(6):
+        draw.rectangle((560 + i * 75, 725, 600 + i * 75, 790), fill=(10, 10, 10))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=90)
+    return out.getvalue()
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    """Stands in for pytesseract; records the image it was given."""
+    seen = {}
+
+    def image_to_string(image, config, timeout):
+        seen["image"], seen["config"] = image, config
+        return seen.get("text", "")
+
+    module = SimpleNamespace(
+        image_to_string=image_to_string, pytesseract=SimpleNamespace(tesseract_cmd="tesseract")
+    )
+    monkeypatch.setitem(sys.modules, "pytesseract", module)
+    return seen
+
+
+def test_read_plate_crops_and_binarizes(fake_tesseract):
+    fake_tesseract["text"] = "NL AB-12-CD\n"
+    assert read_plate(plate_photo()) == "AB12CD"
+
+    image = fake_tesseract["image"]
+    assert image.height == 100 and 3 < image.width / image.height < 7
+    assert set(np.unique(np.asarray(image))) <= {0, 255}
+    assert "--psm 7" in fake_tesseract["config"]
+
+
+def test_read_plate_rejects_non_dutch_text(fake_tesseract):
+    fake_tesseract["text"] = "A8I2"
+    assert read_plate(plate_photo()) is None
+
+
+def test_read_plate_rejects_extra_characters(fake_tesseract):
+    # A plate-shaped part of a noisy read is a guess, left to the remote model
+    fake_tesseract["text"] = "IAB12CDJ"
+    assert read_plate(plate_photo()) is None
+
+
+def test_read_plate_without_plate(fake_tesseract):
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", (640, 480), (90, 90, 100)).save(out, "JPEG")
+    assert read_plate(out.getvalue()) is None
+    assert "image" not in fake_tesseract
+
+
+@pytest.mark.asyncio
+async def test_local_recognizer_handles_errors(config):
+    recognizer = LocalRecognizer(config)
+    assert await recognizer.recognize(b"not an image") is None
+    assert recognizer.stats() == {"attempts": 1, "recognized": 0}
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock
+from bezoekersparkeren.client import ParkeerClient, RegistrationError
+from bezoekersparkeren.models import ParkingSession
+
+
+def make_client(config, pool_size=None):
+    config.defaults.registration_interval = 0
+    client = ParkeerClient(config)
+    if pool_size:
+        client._pool = MagicMock(size=pool_size)
+    return client
+
+
+def fake_register(active, peak, fail_dates=()):
+    async def register_visitor(plate, start_date, start_time, end_date, end_time):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        if start_date in fail_dates:
+            raise Exception("Timeout")
+        start = datetime.strptime(f"{start_date} {start_time}", "%d-%m-%Y %H:%M")
+        return ParkingSession(id=start_date, plate=plate, active=True, start_time=start)
+
+    return register_visitor
+
+
+@pytest.mark.asyncio
+async def test_days_run_in_parallel_up_to_pool_size(config):
+    client = make_client(config, pool_size=2)
+    active, peak = [0], [0]
+    client.register_visitor = fake_register(active, peak)
+
+    summary = await client.register_days("AB-123-CD", days=5, date="15-12-2025", parallel=3)
+
+    assert peak[0] == 2
+    assert [s.id for s in summary.sessions] == [f"{d}-12-2025" for d in range(15, 20)]
+    assert summary.failures == []
+
+
+@pytest.mark.asyncio
+async def test_single_page_stays_sequential(config):
+    client = make_client(config)
+    active, peak = [0], [0]
+    client.register_visitor = fake_register(active, peak)
+
+    await client.register_days("AB-123-CD", days=3, date="15-12-2025", parallel=3)
+    assert peak[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_are_collected(config):
+    client = make_client(config, pool_size=3)
+    client.register_visitor = fake_register([0], [0], fail_dates={"16-12-2025"})
+
+    with pytest.raises(RegistrationError) as exc:
+        await client.register_multiple_days("AB-123-CD", days=3, date="15-12-2025")
+
+    summary = exc.value.summary
+    assert len(summary.sessions) == 2
+    assert summary.failures[0].date == "16-12-2025"
+    assert "1 of 3 days failed" in str(exc.value)
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bezoekersparkeren.client import ParkeerClient, _uses_page
+from bezoekersparkeren.models import Balance
+from bezoekersparkeren.utils.page_pool import PagePool, PooledPage
+
+
+def make_slot(logged_in=True):
+    page = AsyncMock()
+    page.is_closed = MagicMock(return_value=False)
+    return PooledPage(context=AsyncMock(), page=page, logged_in=logged_in)
+
+
+@pytest.mark.asyncio
+async def test_pool_creates_lazily_up_to_size():
+    factory = AsyncMock(side_effect=lambda: make_slot())
+    pool = PagePool(2, factory)
+
+    async with pool.checkout() as a:
+        async with pool.checkout() as b:
+            assert a is not b
+            assert pool.in_use == 2
+
+            # Third caller waits for a page to come back
+            waiter = asyncio.create_task(pool.checkout().__aenter__())
+            await asyncio.sleep(0)
+            assert not waiter.done()
+        slot = await asyncio.wait_for(waiter, 1)
+        assert slot is b
+
+    assert factory.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_drops_closed_pages():
+    pool = PagePool(1, AsyncMock(side_effect=lambda: make_slot()))
+    async with pool.checkout() as slot:
+        slot.page.is_closed.return_value = True
+    async with pool.checkout() as fresh:
+        assert fresh is not slot
+    # Its context isn't left open for the life of the process
+    slot.context.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_client_operations_run_on_separate_pages(config):
+    client = ParkeerClient(config)
+    slots = [make_slot(), make_slot()]
+    client._pool = PagePool(2, AsyncMock(side_effect=slots))
+
+    seen = []
+    release = asyncio.Event()
+
+    async def fake_balance(self):
+        seen.append(self.page)
+        await release.wait()
+        return Balance(amount=1.0)
+
+    wrapped = _uses_page(fake_balance)
+    tasks = [asyncio.create_task(wrapped(client)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert {id(p) for p in seen} == {id(slots[0].page), id(slots[1].page)}
+    # Outside a checkout the primary page is used again
+    assert client.page is None
+
+
+@pytest.mark.asyncio
+async def test_pooled_page_logs_in_before_first_use(config):
+    client = ParkeerClient(config)
+    slot = make_slot(logged_in=False)
+    client._pool = PagePool(1, AsyncMock(return_value=slot))
+    client.login = AsyncMock(return_value=True)
+
+    op = _uses_page(AsyncMock(return_value="ok"))
+    assert await op(client) == "ok"
+    client.login.assert_awaited_once()
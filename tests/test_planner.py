@@ -0,0 +1,72 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from bezoekersparkeren.models import ParkingSession
+from bezoekersparkeren.utils.planner import paid_intervals, merge_intervals, plan_visit
+from bezoekersparkeren.utils.cost import estimate_plan, session_costs
+
+
+def test_only_paid_periods(zone):
+    # Monday 2026-01-05 20:00 to Wednesday 10:00
+    intervals = paid_intervals(zone, datetime(2026, 1, 5, 20), datetime(2026, 1, 7, 10))
+    assert intervals == [
+        (datetime(2026, 1, 5, 20), datetime(2026, 1, 5, 22)),
+        (datetime(2026, 1, 6, 9), datetime(2026, 1, 6, 22)),
+        (datetime(2026, 1, 7, 9), datetime(2026, 1, 7, 10)),
+    ]
+
+
+def test_free_visit(zone):
+    assert plan_visit(zone, datetime(2026, 1, 11, 18), datetime(2026, 1, 12, 8)) == []
+    # Arriving exactly at the (inclusive) end of a paid period
+    assert plan_visit(zone, datetime(2026, 1, 5, 22), datetime(2026, 1, 6, 8)) == []
+
+
+def test_merges_within_max_span(zone):
+    intervals = [
+        (datetime(2026, 1, 10, 18), datetime(2026, 1, 11, 0)),
+        (datetime(2026, 1, 11, 12), datetime(2026, 1, 11, 17)),
+        (datetime(2026, 1, 12, 9), datetime(2026, 1, 12, 22)),
+    ]
+    assert merge_intervals(intervals, timedelta(hours=24)) == [
+        (datetime(2026, 1, 10, 18), datetime(2026, 1, 11, 17)),
+        (datetime(2026, 1, 12, 9), datetime(2026, 1, 12, 22)),
+    ]
+    assert len(merge_intervals(intervals, None)) == 1
+    assert merge_intervals(intervals, timedelta(0)) == intervals
+
+
+def test_midnight_end(zone):
+    # Thursday until 24:00 ends at 23:59, like the all-day registrations
+    plan = plan_visit(zone, datetime(2026, 1, 8, 20), datetime(2026, 1, 9, 2))
+    assert plan == [
+        dict(start_date="08-01-2026", start_time="20:00", end_date="08-01-2026", end_time="23:59")
+    ]
+
+
+def test_plan_costs_no_more_than_the_visit(zone):
+    arrive, depart = datetime(2026, 1, 5, 7, 30), datetime(2026, 1, 12, 11)
+    plan = plan_visit(zone, arrive, depart)
+    visit_cost = session_costs(zone, [arrive], [depart])[0]
+    assert sum(estimate_plan(zone, plan)) <= visit_cost
+    # Eight paid periods; only Sunday afternoon and Monday morning fit in one 24 hour registration
+    assert len(plan) == 7
+
+
+@pytest.mark.asyncio
+async def test_register_visit(zone_config):
+    from bezoekersparkeren.client import ParkeerClient
+
+    zone_config.defaults.registration_interval = 0
+    client = ParkeerClient(zone_config)
+    client.register_visitor = AsyncMock(
+        side_effect=lambda plate, **day: ParkingSession(plate=plate, active=True)
+    )
+
+    summary = await client.register_visit(
+        "AB-123-CD", datetime(2026, 1, 5, 20), datetime(2026, 1, 7, 10)
+    )
+
+    assert len(summary.sessions) == 3 and not summary.failures
+    days = [call.kwargs for call in client.register_visitor.call_args_list]
+    assert sorted(d["start_date"] for d in days) == ["05-01-2026", "06-01-2026", "07-01-2026"]
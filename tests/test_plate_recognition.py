@@ -0,0 +1,253 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from bezoekersparkeren import license_plate_recognition as lpr
+from bezoekersparkeren.license_plate_recognition import (
+    OpenRouterRecognizer,
+    PlateRecognizer,
+    parse_plate,
+    recognize_plate,
+)
+from bezoekersparkeren.utils.latency import BOUNDS, LatencyHistogram
+
+
+def answer(content, status=200):
+    return httpx.Response(status, json={"choices": [{"message": {"content": content}}]})
+
+
+@pytest.fixture
+def lpr_config(config):
+    config.openrouter.api_key = "test-key"
+    return config
+
+
+def test_parse_plate():
+    assert parse_plate(" ab-123-cd ") == "AB123CD"
+    assert parse_plate("```XX99YY```") == "XX99YY"
+    assert parse_plate("NONE") is None
+    assert parse_plate("A1") is None
+
+
+@pytest.mark.asyncio
+async def test_recognize(lpr_config):
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return answer("AB-123-CD")
+
+    async with OpenRouterRecognizer(
+        lpr_config, transport=httpx.MockTransport(handler)
+    ) as recognizer:
+        assert await recognizer.recognize(b"\xff\xd8jpeg") == "AB123CD"
+        assert (
+            await recognize_plate(b"\xff\xd8jpeg", lpr_config, recognizer=recognizer) == "AB123CD"
+        )
+
+    request = seen[0]
+    assert str(request.url) == "https://openrouter.ai/api/v1/chat/completions"
+    assert request.headers["Authorization"] == "Bearer test-key"
+    body = json.loads(request.content)
+    assert body["model"] == lpr_config.openrouter.model
+    assert body["messages"][1]["content"][0]["image_url"]["url"].startswith(
+        "data:image/jpeg;base64,"
+    )
+
+
+@pytest.mark.asyncio
+async def test_errors_give_none(lpr_config):
+    responses = iter(
+        [
+            httpx.Response(429, text="rate limited"),
+            answer("NONE"),
+            httpx.Response(200, json={"choices": []}),
+        ]
+    )
+    async with OpenRouterRecognizer(
+        lpr_config, transport=httpx.MockTransport(lambda r: next(responses))
+    ) as recognizer:
+        for _ in range(3):
+            assert await recognizer.recognize(b"img") is None
+
+
+@pytest.mark.asyncio
+async def test_no_api_key(config):
+    async with OpenRouterRecognizer(
+        config, transport=httpx.MockTransport(lambda r: answer("AB123CD"))
+    ) as recognizer:
+        assert await recognizer.recognize(b"img") is None
+        assert recognizer.requests == 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({"choices": [{"message": {"content": "AB123CD"}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_connection_is_reused(lpr_config, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        lpr, "OPENROUTER_URL", f"http://127.0.0.1:{server.server_address[1]}/api/v1"
+    )
+    try:
+        async with OpenRouterRecognizer(lpr_config) as recognizer:
+            for _ in range(5):
+                assert await recognizer.recognize(b"img") == "AB123CD"
+            assert recognizer.stats() == {
+                "requests": 5,
+                "connections": 1,
+                "tls_handshakes": 0,
+                "reused": 4,
+                "hedges": 0,
+                "hedge_wins": 0,
+            }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.asyncio
+async def test_bot_owns_recognizer(lpr_config):
+    from bezoekersparkeren.bot.telegram_bot import ParkeerBot
+    from bezoekersparkeren.config import TelegramConfig
+
+    lpr_config.telegram = TelegramConfig(bot_token="123:abc", allowed_users="1")
+    recognizer = PlateRecognizer(
+        lpr_config, transport=httpx.MockTransport(lambda r: answer("AB123CD"))
+    )
+    bot = ParkeerBot(lpr_config, recognizer=recognizer)
+    with patch("bezoekersparkeren.bot.telegram_bot.init_handlers") as init:
+        with patch("bezoekersparkeren.bot.telegram_bot.Application") as application:
+            app = AsyncMock()
+            app.add_handler = MagicMock()
+            app.updater = AsyncMock()
+            builder = application.builder.return_value.token.return_value
+            builder.concurrent_updates.return_value.build.return_value = app
+            await bot.start()
+        assert init.call_args.kwargs["recognizer"] is recognizer
+        await bot.stop()
+    assert bot.recognizer is None
+    assert recognizer.backends["remote"]._http.is_closed
+
+
+def slow_models(delays, answers):
+    """Transport answering per model after a delay; records the models asked."""
+    asked = []
+
+    async def handler(request):
+        model = json.loads(request.content)["model"]
+        asked.append(model)
+        await asyncio.sleep(delays[model])
+        return answer(answers[model])
+
+    return httpx.MockTransport(handler), asked
+
+
+@pytest.fixture
+def hedged_config(lpr_config):
+    lpr_config.openrouter.model = "primary"
+    lpr_config.openrouter.models = ["secondary"]
+    lpr_config.openrouter.hedge_delay = 0.05
+    return lpr_config
+
+
+@pytest.mark.asyncio
+async def test_hedge_answers_when_primary_is_slow(hedged_config):
+    transport, asked = slow_models(
+        {"primary": 5, "secondary": 0}, {"primary": "XX99XX", "secondary": "AB12CD"}
+    )
+    async with OpenRouterRecognizer(hedged_config, transport=transport) as recognizer:
+        started = time.monotonic()
+        assert await recognizer.recognize(b"img") == "AB12CD"
+        assert time.monotonic() - started < 1
+        stats = recognizer.stats()
+    assert asked == ["primary", "secondary"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_when_primary_is_fast(hedged_config):
+    transport, asked = slow_models(
+        {"primary": 0, "secondary": 0}, {"primary": "AB12CD", "secondary": "XX99XX"}
+    )
+    async with OpenRouterRecognizer(hedged_config, transport=transport) as recognizer:
+        assert await recognizer.recognize(b"img") == "AB12CD"
+        assert recognizer.stats()["hedges"] == 0
+    assert asked == ["primary"]
+
+
+@pytest.mark.asyncio
+async def test_non_dutch_answer_hedges_right_away(hedged_config):
+    hedged_config.openrouter.hedge_delay = 5
+    # A foreign (or misread) plate is only used when no model finds a Dutch one
+    transport, asked = slow_models(
+        {"primary": 0, "secondary": 0.01}, {"primary": "AB1234CD", "secondary": "AB12CD"}
+    )
+    async with OpenRouterRecognizer(hedged_config, transport=transport) as recognizer:
+        started = time.monotonic()
+        assert await recognizer.recognize(b"img") == "AB12CD"
+        assert time.monotonic() - started < 1
+
+    transport, _ = slow_models(
+        {"primary": 0, "secondary": 0}, {"primary": "AB1234CD", "secondary": "NONE"}
+    )
+    async with OpenRouterRecognizer(hedged_config, transport=transport) as recognizer:
+        assert await recognizer.recognize(b"img") == "AB1234CD"
+
+
+@pytest.mark.asyncio
+async def test_latency_budget(hedged_config):
+    hedged_config.openrouter.latency_budget = 0.1
+    transport, asked = slow_models(
+        {"primary": 5, "secondary": 5}, {"primary": "AB12CD", "secondary": "AB12CD"}
+    )
+    async with OpenRouterRecognizer(hedged_config, transport=transport) as recognizer:
+        started = time.monotonic()
+        assert await recognizer.recognize(b"img") is None
+        assert time.monotonic() - started < 1
+    assert asked == ["primary", "secondary"]
+
+
+def test_hedge_delay_follows_latency(hedged_config):
+    hedged_config.openrouter.hedge_min_samples = 10
+    recognizer = OpenRouterRecognizer(hedged_config)
+    for seconds in [0.5] * 9:
+        recognizer.latency["primary"].add(seconds)
+    assert recognizer.hedge_delay("primary") == 0.05  # too few samples
+    recognizer.latency["primary"].add(8.0)
+    # 90% of the answers came within a bucket's width of 0.5s
+    assert 0.5 <= recognizer.hedge_delay("primary") < 0.6
+    hedged_config.openrouter.hedge_percentile = 99
+    assert recognizer.hedge_delay("primary") >= 8.0
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(max_count=100)
+    assert histogram.percentile(50) is None
+    for seconds in [0.2, 0.3, 1.0, 2.0, 60.0]:
+        histogram.add(seconds)
+    assert 1.0 <= histogram.percentile(50) < 1.2
+    assert histogram.percentile(100) == BOUNDS[-1]
+    for _ in range(200):
+        histogram.add(1.0)
+    assert len(histogram) <= 100
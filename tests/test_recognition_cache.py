@@ -0,0 +1,159 @@
+import io
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+import pytest
+
+from bezoekersparkeren.utils.recognition_cache import RecognitionCache, image_hash
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def jpeg(chars="AB12CD", seed=0, noise=0, quality=90):
+    """A street scene (random blocks) with a yellow plate; each character is a different glyph."""
+    pytest.importorskip("PIL")
+    from PIL import Image, ImageDraw
+
+    rng = np.random.default_rng(seed)
+    pixels = np.kron(rng.integers(0, 120, (12, 16, 3)), np.ones((40, 40, 1))).astype(np.int16)
+    pixels += np.random.default_rng(seed + 100).integers(-noise, noise + 1, pixels.shape)
+    image = Image.fromarray(pixels.clip(0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((160, 300, 480, 370), fill=(245, 190, 15))
+    for i, char in enumerate(chars):
+        glyph = np.random.default_rng(ord(char)).integers(0, 2, (4, 3))
+        for y, x in zip(*np.nonzero(glyph)):
+            left, top = 180 + i * 48 + x * 10, 310 + y * 12
+            draw.rectangle((left, top, left + 9, top + 11), fill=(10, 10, 10))
+    out = io.BytesIO()
+    image.save(out, "JPEG", quality=quality)
+    return out.getvalue()
+
+
+def test_by_file_id():
+    cache = RecognitionCache()
+    cache.put("AB123CD", ["small", "large"])
+    assert cache.get_by_file(["other", "large"]) == "AB123CD"
+    assert cache.get_by_file(["other"]) is None
+    assert cache.stats()["file_hits"] == 1
+
+
+def test_by_similar_hash():
+    cache = RecognitionCache()
+    cache.put("AB123CD", image_hash=0b1011_0000)
+    assert cache.get_by_hash(0b1011_0001) == "AB123CD"  # 1 bit apart
+    assert cache.get_by_hash(0b1011_0011) is None  # 2 bits apart
+    assert cache.get_by_hash(None) is None
+    assert cache.stats() == {"entries": 1, "file_hits": 0, "hash_hits": 1, "misses": 2}
+
+
+def test_image_hash_of_recompressed_photo():
+    original = image_hash(jpeg())
+    assert (original ^ image_hash(jpeg(noise=6, quality=70))).bit_count() <= 1
+    assert image_hash(b"not an image") is None
+
+
+def test_image_hash_is_of_the_plate():
+    # Same driveway, another car: must not match
+    assert (image_hash(jpeg("AB12CD")) ^ image_hash(jpeg("AB12CX"))).bit_count() > 1
+    # No plate on the photo, nothing to go by
+    pytest.importorskip("PIL")
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", (640, 480), (90, 90, 100)).save(out, "JPEG")
+    assert image_hash(out.getvalue()) is None
+
+
+def test_lru_eviction():
+    cache = RecognitionCache(max_entries=2)
+    cache.put("AAAAAA", ["a"])
+    cache.put("BBBBBB", ["b"])
+    cache.get_by_file(["a"])  # a is now the most recently used
+    cache.put("CCCCCC", ["c"])
+    assert len(cache) == 2
+    assert cache.get_by_file(["b"]) is None
+    assert cache.get_by_file(["a"]) == "AAAAAA"
+
+
+def test_ttl():
+    clock = Clock()
+    cache = RecognitionCache(ttl=60, clock=clock)
+    cache.put("AB123CD", ["a"], image_hash=1)
+    clock.now += 59
+    assert cache.get_by_file(["a"]) == "AB123CD"
+    clock.now += 1
+    assert cache.get_by_file(["a"]) is None
+    assert cache.get_by_hash(1) is None
+    assert len(cache) == 0
+
+
+def test_file_id_moves_to_newest_entry():
+    cache = RecognitionCache()
+    cache.put("AAAAAA", ["a"])
+    cache.put("BBBBBB", ["a", "b"])
+    assert cache.get_by_file(["a"]) == "BBBBBB"
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_persistence(tmp_path):
+    clock = Clock()
+    path = tmp_path / "plates.json"
+    cache = RecognitionCache(ttl=60, path=path, clock=clock)
+    cache.put("AAAAAA", ["a"], image_hash=7)
+    clock.now += 30
+    cache.put("BBBBBB", ["b"])
+    assert not path.exists()  # put() doesn't write
+    await cache.save_async()
+
+    clock.now += 40  # the first one has expired by now
+    reloaded = RecognitionCache(ttl=60, path=path, clock=clock)
+    assert len(reloaded) == 1
+    assert reloaded.get_by_file(["b"]) == "BBBBBB"
+
+
+def test_corrupt_file_is_ignored(tmp_path):
+    path = tmp_path / "plates.json"
+    path.write_text("{not json")
+    assert len(RecognitionCache(path=path)) == 0
+
+
+@pytest.mark.asyncio
+async def test_photo_handler_uses_cache(config):
+    from bezoekersparkeren.bot import handlers
+
+    handlers.init_handlers(config)
+    photos = [
+        SimpleNamespace(file_id="f1", file_unique_id="u1", width=320, height=240),
+        SimpleNamespace(file_id="f2", file_unique_id="u2", width=1280, height=960),
+    ]
+    data = jpeg()
+
+    async def download(out):
+        out.write(data)
+
+    context = MagicMock()
+    context.bot.get_file = AsyncMock(return_value=SimpleNamespace(download_to_memory=download))
+    recognize = AsyncMock(return_value="AB123CD")
+    try:
+        with patch("bezoekersparkeren.bot.handlers.recognize_plate", recognize):
+            # First time: download and API call
+            assert await handlers._recognize_photo(photos, context) == "AB123CD"
+            # Forwarded: same file_unique_id, nothing downloaded
+            assert await handlers._recognize_photo(photos, context) == "AB123CD"
+            assert context.bot.get_file.await_count == 1
+            # Same plate as a new file: downloaded, but no API call
+            new_file = [SimpleNamespace(file_id="f3", file_unique_id="u3", width=1280, height=960)]
+            assert await handlers._recognize_photo(new_file, context) == "AB123CD"
+            assert context.bot.get_file.await_count == 2
+        assert recognize.await_count == 1
+    finally:
+        await handlers.close_handlers()
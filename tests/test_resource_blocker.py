@@ -0,0 +1,55 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from bezoekersparkeren.config import BrowserConfig
+from bezoekersparkeren.utils.resource_blocker import ResourceBlocker
+
+
+@pytest.fixture
+def blocker():
+    return ResourceBlocker.from_config(BrowserConfig(allowed_urls=["cdn.example.com/app.js"]))
+
+
+def test_blocks_heavy_resource_types(blocker):
+    assert blocker.should_block("https://bezoek.parkeer.nl/img/logo.png", "image")
+    assert blocker.should_block("https://bezoek.parkeer.nl/fonts/a.woff2", "font")
+    assert not blocker.should_block("https://bezoek.parkeer.nl/almere/app/park", "document")
+    assert not blocker.should_block("https://bezoek.parkeer.nl/build/app.js", "script")
+
+
+def test_blocks_trackers_including_subdomains(blocker):
+    assert blocker.should_block("https://www.google-analytics.com/g/collect", "xhr")
+    assert blocker.should_block("https://static.hotjar.com/c/hotjar.js", "script")
+    assert not blocker.should_block("https://notgoogle-analytics.com/x.js", "script")
+
+
+def test_allowlist_wins(blocker):
+    assert not blocker.should_block("https://cdn.example.com/app.js", "script")
+
+
+def test_disabled_by_config():
+    assert ResourceBlocker.from_config(BrowserConfig(block_resources=False)) is None
+
+
+@pytest.mark.asyncio
+async def test_route_counts_per_navigation(blocker):
+    route = AsyncMock()
+    route.request = MagicMock(url="https://bezoek.parkeer.nl/img/a.png", resource_type="image")
+    await blocker._handle_route(route)
+    route.abort.assert_awaited_once()
+
+    request = AsyncMock()
+    request.sizes.return_value = {"responseBodySize": 1000, "responseHeadersSize": 24}
+    await blocker._on_request_finished(request)
+    assert (blocker.current.blocked, blocker.current.requests, blocker.current.bytes) == (
+        1,
+        1,
+        1024,
+    )
+
+    page = MagicMock()
+    frame = MagicMock(url="https://bezoek.parkeer.nl/almere/app/user")
+    page.main_frame = frame
+    blocker._on_navigated(page, frame)
+    assert blocker.last.bytes == 1024
+    assert blocker.current.url.endswith("/app/user")
+    assert blocker.current.requests == 0
@@ -0,0 +1,90 @@
+import random
+import numpy as np
+from datetime import datetime, time, timedelta
+from bezoekersparkeren.models import ScheduleRule
+from bezoekersparkeren.utils.schedule import WeeklySchedule
+from bezoekersparkeren.utils.time_utils import TimeUtils
+
+
+def legacy_is_paid(zone, dt):
+    """TimeUtils.is_within_paid_hours before the index."""
+    rule = next((r for r in zone.rules if dt.weekday() in r.days), None)
+    if not rule:
+        return False
+    end = (
+        time(23, 59, 59)
+        if rule.end_time == "24:00"
+        else datetime.strptime(rule.end_time, "%H:%M").time()
+    )
+    return datetime.strptime(rule.start_time, "%H:%M").time() <= dt.time() <= end
+
+
+def random_times(n, seed=0):
+    rnd = random.Random(seed)
+    base = datetime(2025, 12, 15)
+    times = [base + timedelta(seconds=rnd.randrange(14 * 86400)) for _ in range(n)]
+    # Boundaries, where off-by-one errors live
+    for day in range(14):
+        for hhmm in ("09:00", "12:00", "17:00", "22:00", "23:59"):
+            t = datetime.combine(
+                (base + timedelta(days=day)).date(), datetime.strptime(hhmm, "%H:%M").time()
+            )
+            times += [t - timedelta(seconds=1), t, t + timedelta(seconds=1)]
+    return times
+
+
+def test_matches_previous_behaviour(zone):
+    schedule = WeeklySchedule.for_zone(zone)
+    times = random_times(2000)
+    expected = [legacy_is_paid(zone, t) for t in times]
+    assert [TimeUtils.is_within_paid_hours(zone, t) for t in times] == expected
+    assert schedule.is_paid_many(np.array(times, dtype="datetime64[s]")).tolist() == expected
+
+
+def test_next_start_and_period_end(zone):
+    schedule = WeeklySchedule.for_zone(zone)
+    mon = datetime(2025, 12, 15)
+    assert schedule.next_paid_start(mon.replace(hour=8)) == mon.replace(hour=9)
+    assert schedule.next_paid_start(mon.replace(hour=9, second=1)) == datetime(2025, 12, 16, 9, 0)
+    # Sunday evening wraps to Monday morning
+    assert schedule.next_paid_start(datetime(2025, 12, 21, 18, 0)) == datetime(2025, 12, 22, 9, 0)
+
+    assert schedule.paid_period_end(mon.replace(hour=10, minute=30, second=15)) == mon.replace(
+        hour=22
+    )
+    assert schedule.paid_period_end(mon.replace(hour=22)) == mon.replace(hour=22)
+    assert schedule.paid_period_end(mon.replace(hour=23)) is None
+    assert schedule.paid_period_end(datetime(2025, 12, 18, 20, 0)) == datetime(2025, 12, 19, 0, 0)
+
+
+def test_vectorized_queries_match_scalar(zone):
+    schedule = WeeklySchedule.for_zone(zone)
+    times = random_times(500, seed=1)
+    array = np.array(times, dtype="datetime64[s]")
+
+    starts = schedule.next_paid_start_many(array)
+    ends = schedule.paid_period_end_many(array)
+    for t, start, end in zip(times, starts, ends):
+        expected_end = schedule.paid_period_end(t)
+        assert start == np.datetime64(schedule.next_paid_start(t), "m")
+        assert (np.isnat(end) and expected_end is None) or end == np.datetime64(expected_end, "m")
+
+
+def test_paid_minutes(zone):
+    schedule = WeeklySchedule.for_zone(zone)
+    mon = datetime(2025, 12, 15)
+    assert schedule.paid_minutes_between(mon, mon + timedelta(days=1)) == 13 * 60
+    assert (
+        schedule.paid_minutes_between(mon, mon + timedelta(days=7))
+        == 3 * 13 * 60 + 3 * 15 * 60 + 5 * 60
+    )
+    assert schedule.paid_minutes_between(mon.replace(hour=21), mon.replace(hour=23)) == 60
+
+
+def test_index_is_cached_until_rules_change(zone):
+    first = WeeklySchedule.for_zone(zone)
+    assert WeeklySchedule.for_zone(zone) is first
+
+    zone.rules[2] = ScheduleRule(days=[6], start_time="10:00", end_time="17:00")
+    assert WeeklySchedule.for_zone(zone) is not first
+    assert TimeUtils.is_within_paid_hours(zone, datetime(2025, 12, 21, 11, 0))
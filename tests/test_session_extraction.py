@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock
+from bezoekersparkeren.client import ParkeerClient
+
+HTML = """
+<div id="parkActions">
+  <div class="park-item-desktop"><span class="plate">AB-123-CD</span>
+    <div class="end-time"><span>Eindtijd</span> <span>morgen 22:00</span></div></div>
+  <div class="start-time"><span>Start tijd</span> <span>vandaag 09:00</span></div>
+</div>
+"""
+
+
+@pytest.fixture
+def client(mock_page, config):
+    client = ParkeerClient(config)
+    client.page = mock_page
+    mock_page.url = "https://bezoek.parkeer.nl/almere/app/park"
+    mock_page.content = AsyncMock(return_value=HTML)
+    return client
+
+
+@pytest.mark.asyncio
+async def test_sessions_from_page_script(client, mock_page):
+    mock_page.evaluate = AsyncMock(
+        return_value=[
+            {
+                "plate": "AB-123-CD",
+                "start": "Start tijd vandaag 09:00",
+                "end": "Eindtijd morgen 22:00",
+            },
+        ]
+    )
+
+    sessions = await client.get_active_sessions()
+
+    mock_page.content.assert_not_called()
+    # Same result as parsing the full HTML
+    assert sessions == client._parse_sessions_from_html(HTML)
+
+
+@pytest.mark.asyncio
+async def test_script_failure_falls_back_to_html(client, mock_page):
+    mock_page.evaluate = AsyncMock(side_effect=Exception("Execution context was destroyed"))
+
+    sessions = await client.get_active_sessions()
+
+    assert [s.plate for s in sessions] == ["AB-123-CD"]
+    assert sessions[0].start_time.hour == 9
+
+
+@pytest.mark.asyncio
+async def test_html_mode_skips_script(client, mock_page, config):
+    config.browser.session_extraction = "html"
+    mock_page.evaluate = AsyncMock()
+
+    assert len(await client.get_active_sessions()) == 1
+    mock_page.evaluate.assert_not_called()
+
+
+def test_unparseable_start_time_is_not_now(client):
+    row = {"plate": "AB-123-CD", "start": "Start tijd onbekend", "end": None}
+
+    first, second = client._session_from_row(row), client._session_from_row(row)
+
+    assert first.start_time is None
+    assert first.id == second.id
@@ -0,0 +1,42 @@
+import pytest
+from bezoekersparkeren.utils.session_html import available_backends, parse_session_rows
+
+HTML = """
+<html><body><div id="parkActions">
+  <div class="row park-item-desktop"><span class="plate"> AB-<b>123</b>-CD </span>
+    <div class="end-time"><span>Eindtijd</span> <span>morgen 22:00</span><!-- verborgen -->
+    </div></div>
+  <div class="start-time"><span>Start tijd</span>
+    <span>vandaag 09:00</span></div>
+  <div class="park-item-desktop"><span class="plate">XY-999-Z</span>
+    <div class="start-time">Start tijd 18 dec. 14:30</div></div>
+  <div class="park-item-desktop"></div>
+</div></body></html>
+"""
+
+EXPECTED = [
+    {"plate": "AB-123-CD", "start": "Start tijd vandaag 09:00", "end": "Eindtijd morgen 22:00"},
+    {"plate": "XY-999-Z", "start": "Start tijd 18 dec. 14:30", "end": None},
+    {"plate": None, "start": None, "end": None},
+]
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_extract_the_same_rows(backend):
+    assert parse_session_rows(HTML, backend) == EXPECTED
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_backends_without_dashboard(backend):
+    assert parse_session_rows("", backend) == []
+    assert parse_session_rows("<html><body><p>Inloggen</p></body></html>", backend) == []
+
+
+def test_auto_picks_fastest_installed():
+    assert parse_session_rows(HTML) == EXPECTED
+    assert available_backends()[-1] == "html.parser"
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        parse_session_rows(HTML, "regex")
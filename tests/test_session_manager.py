@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import pytest
+from datetime import datetime
+from bezoekersparkeren.models import ParkingSession
+from bezoekersparkeren.utils.session_manager import SessionManager
+
+
+def session(id, plate="AB-123-CD", end=None):
+    return ParkingSession(
+        id=id, plate=plate, active=True, start_time=datetime(2025, 12, 18, 9, 0), end_time=end
+    )
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = SessionManager(tmp_path / "sessions.db", legacy_json_path=tmp_path / "sessions.json")
+    yield manager
+    manager.close()
+
+
+def test_add_get_remove(manager):
+    manager.add_sessions([session("a"), session("b", plate="XY-999-Z")])
+    manager.add_session(session("a", end=datetime(2025, 12, 18, 22, 0)))
+
+    assert [s.id for s in manager.load_sessions()] == ["a", "b"]
+    assert manager.get_session("a").end_time == datetime(2025, 12, 18, 22, 0)
+    assert [s.id for s in manager.get_sessions_for_plate("XY-999-Z")] == ["b"]
+
+    manager.remove_session("a")
+    assert manager.get_session("a") is None
+    assert manager.get_session("missing") is None
+
+
+def test_save_replaces_everything(manager):
+    manager.add_sessions([session("a"), session("b")])
+    manager.save_sessions([session("c")])
+    assert [s.id for s in manager.load_sessions()] == ["c"]
+
+
+def test_sync_active_keeps_ended_sessions(manager):
+    manager.add_sessions([session("ended"), session("running")])
+    manager.sync_active([session("running", end=datetime(2025, 12, 18, 22, 0)), session("new")])
+
+    stored = {s.id: s for s in manager.load_sessions()}
+    assert list(stored) == ["ended", "running", "new"]
+    assert not stored["ended"].active
+    assert stored["running"].active and stored["running"].end_time == datetime(2025, 12, 18, 22, 0)
+
+
+def test_batch_insert_is_atomic(manager):
+    manager.add_session(session("a"))
+    bad = ParkingSession.model_construct(id="b", plate=None, active=True)
+    with pytest.raises(sqlite3.IntegrityError):
+        manager.add_sessions([session("c"), bad])
+    assert [s.id for s in manager.load_sessions()] == ["a"]
+
+
+def test_remove_ended(manager):
+    manager.add_sessions(
+        [
+            session("old", end=datetime(2025, 12, 1, 22, 0)),
+            session("new", end=datetime(2025, 12, 30, 22, 0)),
+            session("open"),
+        ]
+    )
+    assert manager.remove_ended(datetime(2025, 12, 18)) == 1
+    assert [s.id for s in manager.load_sessions()] == ["new", "open"]
+
+
+def test_migrates_json_once(tmp_path):
+    legacy = tmp_path / "sessions.json"
+    legacy.write_text(
+        json.dumps(
+            [
+                {
+                    "id": "a",
+                    "plate": "AB-123-CD",
+                    "active": True,
+                    "start_time": "2025-12-18T09:00:00",
+                    "end_time": None,
+                },
+                {"plate": None},
+            ]
+        )
+    )
+
+    first = SessionManager(legacy)  # old-style JSON path
+    assert first.storage_path == tmp_path / "sessions.db"
+    assert [s.id for s in first.load_sessions()] == ["a"]
+    first.remove_session("a")
+    first.close()
+
+    second = SessionManager(tmp_path / "sessions.db", legacy_json_path=legacy)
+    assert second.load_sessions() == []
+    second.close()
+
+
+def test_two_managers_share_the_database(tmp_path):
+    bot = SessionManager(tmp_path / "sessions.db", legacy_json_path=tmp_path / "none.json")
+    cli = SessionManager(tmp_path / "sessions.db", legacy_json_path=tmp_path / "none.json")
+    cli.add_session(session("a"))
+    assert bot.get_session("a").plate == "AB-123-CD"
+    bot.close()
+    cli.close()
+
+
+def test_migrates_json_from_env_path(tmp_path, monkeypatch):
+    legacy = tmp_path / "old" / "sessions.json"
+    legacy.parent.mkdir()
+    legacy.write_text(
+        json.dumps(
+            [
+                {
+                    "id": "a",
+                    "plate": "AB-123-CD",
+                    "active": True,
+                    "start_time": "2025-12-18T09:00:00",
+                    "end_time": None,
+                },
+            ]
+        )
+    )
+    monkeypatch.setenv("PARKEER_SESSIONS_JSON", str(legacy))
+    (tmp_path / "data").mkdir()
+    manager = SessionManager(tmp_path / "data" / "sessions.db")
+    assert [s.id for s in manager.load_sessions()] == ["a"]
+    manager.close()
+
+
+def test_mounted_directory_is_not_imported(tmp_path):
+    # What Docker leaves behind for a bind mount of a missing file
+    (tmp_path / "sessions.json").mkdir()
+    manager = SessionManager(tmp_path / "sessions.db")
+    assert manager.load_sessions() == []
+    manager.close()
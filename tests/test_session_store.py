@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import pytest
+from bezoekersparkeren.models import ParkingSession
+from bezoekersparkeren.utils.session_manager import SessionManager
+from bezoekersparkeren.utils.session_store import AsyncSessionStore
+
+
+def session(id):
+    return ParkingSession(id=id, plate="AB-123-CD", active=True)
+
+
+class RecordingManager(SessionManager):
+    def __init__(self, path):
+        super().__init__(path)
+        self.batches = []
+        self.threads = set()
+
+    def apply_changes(self, upserts, removals):
+        self.threads.add(threading.current_thread().name)
+        self.batches.append((len(upserts), len(removals)))
+        super().apply_changes(upserts, removals)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AsyncSessionStore(
+        tmp_path / "sessions.db", flush_delay=0.01, manager_factory=RecordingManager
+    )
+
+
+@pytest.mark.asyncio
+async def test_burst_is_written_once_off_the_loop(store):
+    for i in range(7):
+        await store.add_session(session(str(i)))
+    await store.remove_session("3")
+
+    # Pending changes are visible before they're written
+    assert (await store.get_session("2")).id == "2"
+    assert await store.get_session("3") is None
+
+    await asyncio.sleep(0.05)
+    assert store._manager.batches == [(6, 1)]
+    assert store._manager.threads == {"session-store_0"}
+    assert [s.id for s in await store.load_sessions()] == ["0", "1", "2", "4", "5", "6"]
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_close_flushes(tmp_path, store):
+    await store.add_sessions([session("a"), session("b")])
+    await store.close()
+
+    manager = SessionManager(tmp_path / "sessions.db")
+    assert [s.id for s in manager.load_sessions()] == ["a", "b"]
+    manager.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_changes(store, monkeypatch):
+    await store.add_session(session("a"))
+    await store.get_session("x")  # creates the manager
+
+    def broken(upserts, removals):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store._manager, "apply_changes", broken)
+    with pytest.raises(OSError):
+        await store.flush()
+    await store.add_session(session("b"))
+
+    monkeypatch.undo()
+    await store.flush()
+    assert [s.id for s in await store.load_sessions()] == ["a", "b"]
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_default_writes_through(tmp_path):
+    # The CLI's store: a killed process must not lose what was added
+    store = AsyncSessionStore(tmp_path / "sessions.db")
+    await store.add_session(session("a"))
+
+    other = SessionManager(tmp_path / "sessions.db")
+    assert [s.id for s in other.load_sessions()] == ["a"]
+    other.close()
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_add_during_flush_is_written(tmp_path):
+    class SlowManager(RecordingManager):
+        def apply_changes(self, upserts, removals):
+            started.set()
+            release.wait(1)
+            super().apply_changes(upserts, removals)
+
+    started, release = threading.Event(), threading.Event()
+    store = AsyncSessionStore(
+        tmp_path / "sessions.db", flush_delay=0.01, manager_factory=SlowManager
+    )
+    await store.add_session(session("a"))
+    await asyncio.to_thread(started.wait, 1)
+    await store.add_session(session("b"))
+    release.set()
+
+    await asyncio.sleep(0.1)
+    assert store._pending == {}
+    assert store._manager.batches == [(1, 0), (1, 0)]
+    other = SessionManager(tmp_path / "sessions.db")
+    assert [s.id for s in other.load_sessions()] == ["a", "b"]
+    other.close()
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_end_sessions_keeps_history(store):
+    from datetime import datetime
+
+    now = datetime(2025, 1, 6, 12, 0)
+    running = ParkingSession(
+        id="a", plate="AB-123-CD", active=True,
+        start_time=datetime(2025, 1, 6, 9, 0), end_time=datetime(2025, 1, 6, 22, 0),
+    )
+    tomorrow = ParkingSession(
+        id="b", plate="AB-123-CD", active=True,
+        start_time=datetime(2025, 1, 7, 9, 0), end_time=datetime(2025, 1, 7, 22, 0),
+    )
+    await store.add_sessions([running, tomorrow])
+    await store.end_sessions([running, tomorrow], at=now)
+
+    a, b = await store.load_sessions()
+    assert (a.active, a.end_time) == (False, now)
+    assert (b.active, b.end_time) == (False, tomorrow.start_time)
+    await store.close()
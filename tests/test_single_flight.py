@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from bezoekersparkeren.client import ParkeerClient
+from bezoekersparkeren.models import Balance, ParkingSession
+from bezoekersparkeren.utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    runs = []
+
+    async def fetch():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return len(runs)
+
+    results = await asyncio.gather(*(flight.do("balance", fetch) for _ in range(5)))
+
+    assert results == [1] * 5
+    assert flight.stats() == {"balance": {"calls": 5, "coalesced": 4}}
+    # Once finished, the next call runs again
+    assert await flight.do("balance", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("portal down")
+
+    results = await asyncio.gather(
+        flight.do("x", fail), flight.do("x", fail), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_leader_is_cancelled():
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "ok"
+
+    leader = asyncio.ensure_future(flight.do("x", slow))
+    await started.wait()
+    follower = asyncio.ensure_future(flight.do("x", fast))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "ok"
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_balance_reads(config):
+    config.cache.balance_ttl = 0
+    client = ParkeerClient(config)
+    client._api = AsyncMock()
+
+    async def get_balance():
+        await asyncio.sleep(0.01)
+        return Balance(amount=5.0)
+
+    client._api.get_balance.side_effect = get_balance
+
+    results = await asyncio.gather(*(client.get_balance() for _ in range(3)))
+
+    assert [b.amount for b in results] == [5.0] * 3
+    assert client._api.get_balance.await_count == 1
+    assert client.single_flight_stats["get_balance"] == {"calls": 3, "coalesced": 2}
+
+
+@pytest.mark.asyncio
+async def test_read_after_write_does_not_join_older_read(config):
+    config.cache.sessions_ttl = 0
+    client = ParkeerClient(config)
+    client._api = AsyncMock()
+    session = ParkingSession(id="s1", plate="AB-123-CD", active=True)
+    listed, release = [], asyncio.Event()
+
+    async def get_active_sessions():
+        snapshot = list(listed)
+        await release.wait()
+        return snapshot
+
+    async def register_visitor(plate):
+        listed.append(session)
+        return session
+
+    client._api.get_active_sessions.side_effect = get_active_sessions
+    client._api.register_visitor.side_effect = register_visitor
+
+    before = asyncio.ensure_future(client.get_active_sessions())
+    await asyncio.sleep(0)
+    await client.register_visitor("AB-123-CD")
+    after = asyncio.ensure_future(client.get_active_sessions())
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await before == []
+    assert await after == [session]
+    assert client._api.get_active_sessions.await_count == 2
@@ -0,0 +1,110 @@
+import pytest
+from unittest.mock import AsyncMock
+from bezoekersparkeren.client import ParkeerClient
+from bezoekersparkeren.utils.state_cache import StorageStateCache
+
+STATE = {
+    "cookies": [{"name": "PHPSESSID", "value": "abc", "domain": "bezoek.parkeer.nl", "path": "/"}],
+    "origins": [],
+}
+
+
+def test_roundtrip_is_encrypted(tmp_path):
+    cache = StorageStateCache(tmp_path, "almere", "test@test.nl", "secret")
+    cache.save(STATE)
+
+    assert cache.path.exists()
+    assert b"PHPSESSID" not in cache.path.read_bytes()
+    assert cache.load() == STATE
+
+
+def test_keyed_by_account(tmp_path):
+    a = StorageStateCache(tmp_path, "almere", "a@test.nl", "secret")
+    b = StorageStateCache(tmp_path, "almere", "b@test.nl", "secret")
+    c = StorageStateCache(tmp_path, "lelystad", "a@test.nl", "secret")
+    assert len({a.path, b.path, c.path}) == 3
+
+
+def test_wrong_key_discards_state(tmp_path):
+    StorageStateCache(tmp_path, "almere", "test@test.nl", "old").save(STATE)
+    cache = StorageStateCache(tmp_path, "almere", "test@test.nl", "new")
+
+    assert cache.load() is None
+    assert not cache.path.exists()
+
+
+@pytest.mark.asyncio
+async def test_login_uses_cached_state(mock_page, config, tmp_path):
+    config.browser.storage_state_dir = str(tmp_path)
+    client = ParkeerClient(config)
+    client.page = mock_page
+    client._state_restored = True
+
+    mock_page.url = "https://bezoek.parkeer.nl/almere/app/park"
+    mock_page.query_selector.return_value = None  # no login form
+
+    assert await client.login() is True
+    mock_page.goto.assert_called_once_with("https://bezoek.parkeer.nl/almere/app/park")
+    mock_page.fill.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_login_falls_back_when_state_rejected(mock_page, config, tmp_path):
+    config.browser.storage_state_dir = str(tmp_path)
+    client = ParkeerClient(config)
+    client.page = mock_page
+    client.context = AsyncMock()
+    client.context.storage_state.return_value = STATE
+    client._state_restored = True
+
+    # Redirected to the login page: cached state rejected
+    mock_page.url = "https://bezoek.parkeer.nl/almere/login"
+
+    async def submit(*args, **kwargs):
+        mock_page.url = "https://bezoek.parkeer.nl/almere/app/park"
+
+    mock_page.click.side_effect = submit
+
+    assert await client.login() is True
+    mock_page.fill.assert_any_call("input#username", config.credentials.email)
+    # Fresh state is stored for the next run
+    assert client._state_cache.load() == STATE
+
+
+@pytest.mark.asyncio
+async def test_rejected_state_is_kept_for_other_pages(mock_page, config, tmp_path):
+    config.browser.storage_state_dir = str(tmp_path)
+    client = ParkeerClient(config)
+    client._state_cache.save(STATE)
+    client.page = mock_page
+    client.context = AsyncMock()
+    client.context.storage_state.return_value = STATE
+    client._state_restored = True
+    mock_page.url = "https://bezoek.parkeer.nl/almere/login"
+    cached_during_login = []
+
+    async def submit(*args, **kwargs):
+        cached_during_login.append(client._state_cache.load())
+        mock_page.url = "https://bezoek.parkeer.nl/almere/app/park"
+
+    mock_page.click.side_effect = submit
+
+    assert await client.login() is True
+    assert cached_during_login == [STATE]
+
+
+@pytest.mark.asyncio
+async def test_failed_login_clears_state(mock_page, config, tmp_path):
+    config.browser.storage_state_dir = str(tmp_path)
+    client = ParkeerClient(config)
+    client._state_cache.save(STATE)
+    client.page = mock_page
+    client._state_restored = True
+    mock_page.url = "https://bezoek.parkeer.nl/almere/login"
+    mock_page.wait_for_url.side_effect = TimeoutError("still on the login page")
+    error = AsyncMock()
+    error.text_content.return_value = "Onjuiste inloggegevens"
+    mock_page.query_selector.return_value = error
+
+    assert await client.login() is False
+    assert client._state_cache.load() is None
@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import AsyncMock
+from bezoekersparkeren.client import ParkeerClient
+from bezoekersparkeren.models import Balance, ParkingSession
+from bezoekersparkeren.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_per_key():
+    clock = FakeClock()
+    cache = TTLCache({"sessions": 30, "balance": 60}, clock=clock)
+    cache.set("sessions", [1])
+    cache.set("balance", 2)
+
+    clock.now = 45
+    assert cache.get("sessions") == (False, None)
+    assert cache.get("balance") == (True, 2)
+    assert cache.stats() == {
+        "balance": {"hits": 1, "misses": 0},
+        "sessions": {"hits": 0, "misses": 1},
+    }
+
+
+def test_zero_ttl_disables():
+    cache = TTLCache({"sessions": 0})
+    cache.set("sessions", [1])
+    assert cache.get("sessions") == (False, None)
+
+
+def test_read_started_before_invalidation_is_not_cached():
+    cache = TTLCache({"sessions": 30})
+    generation = cache.generation
+    cache.invalidate()
+    cache.set("sessions", ["stale"], generation)
+    assert cache.get("sessions") == (False, None)
+
+
+@pytest.fixture
+def client(config):
+    client = ParkeerClient(config)
+    client._api = AsyncMock()
+    client._api.get_balance.return_value = Balance(amount=19.10)
+    client._api.get_active_sessions.return_value = [
+        ParkingSession(id="s1", plate="AB-123-CD", active=True)
+    ]
+    return client
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_until_a_write(client):
+    assert (await client.get_balance()).amount == 19.10
+    await client.get_balance()
+    await client.get_active_sessions()
+    sessions = await client.get_active_sessions()
+    sessions.clear()  # callers get their own list
+
+    assert client._api.get_balance.await_count == 1
+    assert client._api.get_active_sessions.await_count == 1
+    assert len(await client.get_active_sessions()) == 1
+
+    await client.stop_all_sessions("AB-123-CD")
+    await client.get_active_sessions()
+    await client.get_balance()
+
+    assert client._api.get_active_sessions.await_count == 2
+    assert client._api.get_balance.await_count == 2
+    assert client.cache_stats["sessions"] == {"hits": 2, "misses": 2}
+
+
+@pytest.mark.asyncio
+async def test_failed_write_still_invalidates(client):
+    await client.get_active_sessions()
+    client._api.register_visitor.side_effect = RuntimeError("portal down")
+
+    with pytest.raises(RuntimeError):
+        await client.register_visitor("AB-123-CD")
+
+    await client.get_active_sessions()
+    assert client._api.get_active_sessions.await_count == 2
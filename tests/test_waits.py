@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from bezoekersparkeren.utils.waits import WaitStrategy
+
+
+async def never():
+    await asyncio.sleep(10)
+
+
+async def fail():
+    raise Exception("Timeout")
+
+
+@pytest.mark.asyncio
+async def test_first_of_returns_first_successful_signal(mock_page):
+    waits = WaitStrategy(mock_page)
+    winner = await waits.first_of(
+        "step", {"slow": never, "broken": fail, "fast": AsyncMock()}, timeout=1
+    )
+    assert winner == "fast"
+    assert waits.timings[-1].step == "step"
+    assert waits.timings[-1].outcome == "fast"
+
+
+@pytest.mark.asyncio
+async def test_first_of_times_out(mock_page):
+    waits = WaitStrategy(mock_page)
+    assert await waits.first_of("step", {"slow": never, "broken": fail}, timeout=0.05) is None
+    assert waits.timings[-1].outcome == "timeout"
+
+
+@pytest.mark.asyncio
+async def test_page_ready_races_signal_against_networkidle(mock_page):
+    mock_page.wait_for_load_state.side_effect = never
+    waits = WaitStrategy(mock_page)
+    assert await waits.page_ready("dashboard", selector="#parkActions", timeout=1) == "selector"
+
+
+@pytest.mark.asyncio
+async def test_condition_falls_back_to_delay(mock_page, mocker):
+    sleep = mocker.patch("bezoekersparkeren.utils.waits.asyncio.sleep", new=AsyncMock())
+    mock_page.wait_for_function.side_effect = Exception("Timeout")
+    waits = WaitStrategy(mock_page)
+
+    assert await waits.condition("brand", "() => false", fallback_delay=1) is False
+    sleep.assert_awaited_with(1)
+    assert waits.timings[-1].outcome == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_response_uses_fallback_without_signal(mock_page):
+    mock_page.expect_response.return_value.__aexit__.side_effect = Exception("Timeout")
+    fallback = AsyncMock()
+    waits = WaitStrategy(mock_page)
+
+    async with waits.response("confirm", lambda r: True, fallback=fallback):
+        await mock_page.click("button.confirmAction")
+
+    fallback.assert_awaited_once()
+    assert waits.timings[-1].outcome == "fallback"
+
+
+@pytest.mark.asyncio
+async def test_response_signal(mock_page):
+    waits = WaitStrategy(mock_page)
+    async with waits.response("confirm", lambda r: True):
+        pass
+    assert waits.timings[-1].outcome == "response"
+
+
+@pytest.mark.asyncio
+async def test_response_does_not_hide_errors_of_the_body(mock_page):
+    fallback = AsyncMock()
+    waits = WaitStrategy(mock_page)
+
+    with pytest.raises(RuntimeError):
+        async with waits.response("confirm", lambda r: True, fallback=fallback):
+            raise RuntimeError("click failed")
+    fallback.assert_not_awaited()
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+from bezoekersparkeren.models import ScheduleRule, Favorite, ParkingSession
+from bezoekersparkeren.utils.cost import estimate_sessions_by_zone
+from bezoekersparkeren.utils.schedule import WeeklySchedule
+
+
+@pytest.fixture
+def zones(make_zone):
+    return [
+        make_zone(
+            rules=[ScheduleRule(days=[0, 1, 2, 3, 4, 5], start_time="09:00", end_time="22:00")],
+        ),
+        make_zone(
+            name="Centrum",
+            code="36001",
+            hourly_rate=1.00,
+            max_daily_rate=5.00,
+            rules=[ScheduleRule(days=[0, 1, 2, 3, 4, 5, 6], start_time="08:00", end_time="24:00")],
+        ),
+    ]
+
+
+@pytest.fixture
+def multi_config(config, zones):
+    config.zones = zones
+    config.favorites = [Favorite(plate="AB-123-CD", name="Partner", zone="centrum")]
+    config.plate_zones = {"EF-456-GH": "36001", "IJ-789-KL": "Filmwijk"}
+    return config
+
+
+def test_get_zone_by_code_or_name(multi_config, zones):
+    assert multi_config.get_zone("36001") is zones[1]
+    assert multi_config.get_zone(" centrum ") is zones[1]
+    assert multi_config.get_zone("FILMWIJK") is zones[0]
+    with pytest.raises(ValueError, match="Unknown zone 'Noord'"):
+        multi_config.get_zone("Noord")
+
+
+def test_zone_for(multi_config, zones):
+    # Explicit zone beats everything
+    assert multi_config.zone_for("AB-123-CD", zone="36044") is zones[0]
+    # Favorite, matched without dashes and case
+    assert multi_config.zone_for("ab123cd") is zones[1]
+    # Plate mapping
+    assert multi_config.zone_for("EF-456-GH") is zones[1]
+    # Anything else: the first zone
+    assert multi_config.zone_for("XX-000-XX") is zones[0]
+    assert multi_config.zone_for() is zones[0]
+
+
+def test_favorite_beats_plate_mapping(multi_config, zones):
+    multi_config.plate_zones = {"AB-123-CD": "Filmwijk"}
+    assert multi_config.zone_for("AB-123-CD") is zones[1]
+
+
+def test_index_follows_replaced_zones(multi_config, zones):
+    assert multi_config.get_zone("36001") is zones[1]
+    multi_config.zones = [zones[1]]
+    with pytest.raises(ValueError):
+        multi_config.get_zone("Filmwijk")
+
+
+def test_schedule_cached_per_zone(zones):
+    assert WeeklySchedule.for_zone(zones[0]) is WeeklySchedule.for_zone(zones[0])
+    assert WeeklySchedule.for_zone(zones[0]) is not WeeklySchedule.for_zone(zones[1])
+
+
+def test_plan_days_uses_plate_zone(multi_config):
+    from bezoekersparkeren.client import ParkeerClient
+
+    client = ParkeerClient(multi_config)
+    # Sunday: free in Filmwijk, paid from 08:00 in Centrum
+    assert client.plan_days(1, date="11-01-2026", plate="AB-123-CD")[0]["start_time"] == "08:00"
+    assert client.plan_days(1, date="11-01-2026", plate="XX-000-XX")[0]["start_time"] == "00:00"
+    assert (
+        client.plan_days(1, date="11-01-2026", plate="AB-123-CD", zone="36044")[0]["start_time"]
+        == "00:00"
+    )
+
+
+@pytest.mark.asyncio
+async def test_register_days_in_plate_zone(multi_config):
+    from bezoekersparkeren.client import ParkeerClient
+
+    multi_config.defaults.registration_interval = 0
+    client = ParkeerClient(multi_config)
+    client.register_visitor = AsyncMock(
+        side_effect=lambda plate, **day: ParkingSession(plate=plate, active=True)
+    )
+
+    await client.register_days("EF-456-GH", 1, date="11-01-2026")
+
+    assert client.register_visitor.call_args.kwargs["start_time"] == "08:00"
+
+
+def test_costs_by_zone(zones):
+    day = dict(start_time=datetime(2026, 1, 5, 10), end_time=datetime(2026, 1, 5, 12))
+    sessions = [ParkingSession(plate=p, active=False, **day) for p in ("A", "B", "C")]
+    costs = estimate_sessions_by_zone(sessions, [zones[0], zones[1], None])
+    assert costs[:2].tolist() == pytest.approx([0.50, 2.00])
+    assert np.isnan(costs[2])
+
+
+def test_cost_reports_unknown_zone(multi_config, tmp_path, monkeypatch):
+    from click.testing import CliRunner
+    from bezoekersparkeren import main
+    from bezoekersparkeren.utils.session_manager import SessionManager
+
+    monkeypatch.setenv("PARKEER_SESSIONS_DB", str(tmp_path / "sessions.db"))
+    manager = SessionManager()
+    manager.add_session(
+        ParkingSession(
+            id="a",
+            plate="AB-123-CD",
+            active=True,
+            start_time=datetime(2026, 1, 12, 9, 0),
+            end_time=datetime(2026, 1, 12, 17, 0),
+        )
+    )
+    manager.close()
+    # The favorite's zone is no longer configured
+    multi_config.zones = multi_config.zones[:1]
+    monkeypatch.setattr(main.Config, "load", classmethod(lambda cls, *args: multi_config))
+    monkeypatch.setattr(main, "setup_logging", lambda config: None)
+
+    result = CliRunner().invoke(main.cli, ["cost"])
+    assert result.exception is None
+    assert "Unknown zone 'centrum'" in result.output
+    result = CliRunner().invoke(main.cli, ["cost", "--zone", "nowhere"])
+    assert result.exception is None
+    assert "Unknown zone 'nowhere'" in result.output